@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark render.py on synthetic plans of increasing size.
+
+Each size scales every list in example_plan.yaml (features, personas, pricing tiers, hires...) by a factor,
+and every (size, engine, mode) is rendered in a fresh process with `render.py --no-cache --profile`. The
+median of --repeat runs is reported per stage, so results are comparable between commits.
+
+Usage examples:
+  - Quick run:  python docs/plan/bench.py
+  - Tracking:   python docs/plan/bench.py --sizes 1,100,1000 --engines md,html,pdf --history bench/history.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import datetime
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+import yaml
+
+
+HERE = pathlib.Path(__file__).resolve().parent
+RENDER_SCRIPT = HERE / "render.py"
+BASE_DATA = HERE / "example_plan.yaml"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the business plan renderer")
+    parser.add_argument(
+        "--sizes",
+        default="1,50,500",
+        help="Comma-separated scale factors applied to every list in the example plan"
+    )
+    parser.add_argument(
+        "--engines",
+        default=None,
+        help="Comma-separated engines (default: md,html, plus pdf when WeasyPrint is installed)"
+    )
+    parser.add_argument(
+        "--modes",
+        default="buffered,stream",
+        help="Comma-separated render modes: buffered (default path) and/or stream (--stream)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per case; the median is reported"
+    )
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="Write the results as JSON to this path"
+    )
+    parser.add_argument(
+        "--history",
+        default=None,
+        help="Append the results as one JSON line to this file, to track performance across commits"
+    )
+    return parser.parse_args()
+
+
+def scale(value: Any, factor: int) -> Any:
+    """Repeat every list `factor` times. Lists inside repeated items are not scaled again."""
+    if isinstance(value, dict):
+        return {key: scale(item, factor) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_variant(item, copy_index) for copy_index in range(factor) for item in value]
+    return value
+
+
+def _variant(item: Any, copy_index: int) -> Any:
+    if copy_index == 0:
+        return copy.deepcopy(item)
+    if isinstance(item, str):
+        return f"{item} ({copy_index + 1})"
+    return copy.deepcopy(item)
+
+
+def write_synthetic_plan(factor: int, work_dir: pathlib.Path) -> pathlib.Path:
+    with BASE_DATA.open("rb") as f:
+        data = yaml.safe_load(f)
+    path = work_dir / f"plan_x{factor}.yaml"
+    with path.open("w", encoding="utf-8") as f:
+        yaml.safe_dump(scale(data, factor), f, sort_keys=False, allow_unicode=True)
+    return path
+
+
+def default_engines() -> list[str]:
+    engines = ["md", "html"]
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        print("WeasyPrint not installed, skipping the pdf engine", file=sys.stderr)
+    else:
+        engines.append("pdf")
+    return engines
+
+
+def run_once(data_path: pathlib.Path, engine: str, stream: bool, work_dir: pathlib.Path) -> Dict[str, Any]:
+    summary_path = work_dir / "profile.json"
+    command = [
+        sys.executable, str(RENDER_SCRIPT),
+        "--engine", engine,
+        "--data", str(data_path),
+        "--out", str(work_dir / f"out.{engine}"),
+        "--no-cache",
+        "--profile", str(summary_path),
+    ]
+    if stream:
+        command.append("--stream")
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return json.loads(summary_path.read_text(encoding="utf-8"))
+
+
+def aggregate(runs: list[Dict[str, Any]]) -> Dict[str, Any]:
+    stage_names = [stage["name"] for stage in runs[0]["stages"]]
+    stages = {}
+    for name in stage_names:
+        samples = [stage for run in runs for stage in run["stages"] if stage["name"] == name]
+        stages[name] = {
+            "wall_s": statistics.median(stage["wall_s"] for stage in samples),
+            "cpu_s": statistics.median(stage["cpu_s"] for stage in samples),
+        }
+    peaks = [run["max_rss_mb"] for run in runs if run["max_rss_mb"] is not None]
+    return {
+        "runs": len(runs),
+        "data_bytes": runs[0]["data_bytes"],
+        "output_bytes": runs[0]["output_bytes"],
+        "wall_s": statistics.median(run["wall_s"] for run in runs),
+        "cpu_s": statistics.median(run["cpu_s"] for run in runs),
+        "max_rss_mb": max(peaks) if peaks else None,
+        "stages": stages,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def format_results(cases: list[Dict[str, Any]]) -> str:
+    lines = [f"{'size':>6} {'engine':<6} {'mode':<9} {'input KB':>9} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}  slowest stages"]
+    for case in cases:
+        slowest = sorted(case["stages"].items(), key=lambda item: -item[1]["wall_s"])[:3]
+        peak = "-" if case["max_rss_mb"] is None else f"{case['max_rss_mb']:.1f}"
+        lines.append(
+            f"{case['size']:>6} {case['engine']:<6} {case['mode']:<9} {case['data_bytes'] / 1024:>9.1f} "
+            f"{case['wall_s']:>8.3f} {case['cpu_s']:>8.3f} {peak:>8}  "
+            + ", ".join(f"{name} {timing['wall_s']:.3f}s" for name, timing in slowest)
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engines = args.engines.split(",") if args.engines else default_engines()
+    modes = args.modes.split(",")
+
+    cases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = pathlib.Path(tmp)
+        for size in sizes:
+            data_path = write_synthetic_plan(size, work_dir)
+            for engine in engines:
+                for mode in modes:
+                    runs = [run_once(data_path, engine, mode == "stream", work_dir) for _ in range(args.repeat)]
+                    case = {"size": size, "engine": engine, "mode": mode, **aggregate(runs)}
+                    cases.append(case)
+                    print(format_results([case]).splitlines()[-1], flush=True)
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "cases": cases,
+    }
+    print()
+    print(format_results(cases))
+    if args.out:
+        out_path = pathlib.Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.history:
+        history_path = pathlib.Path(args.history)
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with history_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(results) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,21 +6,57 @@ Usage examples:
   - Markdown: python docs/plan/render.py --engine md
   - HTML:     python docs/plan/render.py --engine html
   - PDF:      python docs/plan/render.py --engine pdf
+  - Batch:    python docs/plan/render.py --engine pdf --batch 'plans/*.yaml' --out-dir out/ --jobs 8
+  - Preview:  python docs/plan/render.py --engine html --watch --serve 8765
+
+--profile [JSON_PATH] prints wall/CPU time and peak memory for each stage (YAML, Jinja, Markdown and each of
+its processors, PDF) and can write them as JSON; --profile-dump adds a cProfile or collapsed-stack file.
+
+--stream renders with bounded memory for very large plans: Jinja output is written to disk chunk by
+chunk and Markdown is converted to HTML section by section (split before headings).
+
+Each stage (Markdown, HTML, PDF) is cached in --cache-dir under a hash of its inputs (data file, templates,
+render options), so re-running with unchanged inputs only copies the cached output. Use --no-cache to
+force a full render.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import cProfile
+import functools
+import glob
+import hashlib
+import html
+import http.server
+import json
+import os
+import platform
+import shutil
 import sys
 import pathlib
-from typing import Any, Dict
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 import yaml
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 
 
 DEFAULT_TEMPLATE = "plan.md.j2"
 DEFAULT_DATA = "example_plan.yaml"
+DEFAULT_CACHE_DIR = ".cache"
+
+# Bump when a change to this script alters the output for the same inputs
+CACHE_VERSION = "2"
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,24 +87,111 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Override document title for HTML/PDF wrapper"
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(pathlib.Path(__file__).with_name(DEFAULT_CACHE_DIR)),
+        help="Directory for cached stage outputs"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every stage from scratch (cache is neither read nor written)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream each stage to disk instead of building whole documents in memory (large plans)"
+    )
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="Render many data files: a glob ('plans/*.yaml') or @manifest (one YAML path per line)"
+    )
+    parser.add_argument(
+        "--out-dir",
+        default=None,
+        help="Batch output directory (default: docs/plan/out). Files are named <data stem>.{md|html|pdf}"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Batch worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="Write per-document batch timings as JSON to this path"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Re-render whenever the data file or a template changes"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="Seconds without further changes before a watch re-render starts"
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        nargs="?",
+        const=8765,
+        default=None,
+        metavar="PORT",
+        help="With --watch: serve the output on localhost (default port 8765), reloading the browser on change"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="JSON_PATH",
+        help="Print wall/CPU time and peak memory per stage to stderr; with a path, also write them as JSON"
+    )
+    parser.add_argument(
+        "--profile-dump",
+        default=None,
+        metavar="PATH",
+        help="With --profile: write cProfile stats (.prof), or sampled collapsed stacks for *.folded/*.collapsed"
+    )
     return parser.parse_args()
 
 
+# libyaml's C loader is several times faster than the pure-Python one on large files
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def load_yaml_data(yaml_path: pathlib.Path) -> Dict[str, Any]:
-    with yaml_path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    with yaml_path.open("rb") as f:
+        return yaml.load(f, Loader=YAML_LOADER)
 
 
-def render_markdown_from_template(template_path: pathlib.Path, data: Dict[str, Any]) -> str:
-    env = Environment(
-        loader=FileSystemLoader(str(template_path.parent)),
-        autoescape=select_autoescape(["md", "md.j2"])  # no autoescape for md by default
+def build_environment(template_dir: pathlib.Path, bytecode_dir: Optional[pathlib.Path] = None) -> Environment:
+    # With a bytecode cache, a template is compiled once and later processes load the compiled module
+    bytecode_cache = None
+    if bytecode_dir is not None:
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
+    return Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=select_autoescape(["md", "md.j2"]),  # no autoescape for md by default
+        bytecode_cache=bytecode_cache,
     )
+
+
+def render_markdown_from_template(
+    template_path: pathlib.Path, data: Dict[str, Any], env: Optional[Environment] = None
+) -> str:
+    if env is None:
+        env = build_environment(template_path.parent)
     template = env.get_template(template_path.name)
     return template.render(**data)
 
 
-def convert_markdown_to_html(markdown_text: str, page_title: str) -> str:
+def make_markdown_converter():
     try:
         import markdown as md
     except ImportError as exc:
@@ -76,8 +199,7 @@ def convert_markdown_to_html(markdown_text: str, page_title: str) -> str:
             "Missing dependency: markdown. Install with `pip install markdown` or `conda install -c conda-forge markdown`."
         ) from exc
 
-    body = md.markdown(
-        markdown_text,
+    return md.Markdown(
         extensions=[
             "extra",
             "tables",
@@ -88,13 +210,15 @@ def convert_markdown_to_html(markdown_text: str, page_title: str) -> str:
         output_format="html5",
     )
 
-    html = f"""
+
+def html_document_head(page_title: str) -> str:
+    return f"""
 <!doctype html>
 <html lang=\"en\">
   <head>
     <meta charset=\"utf-8\" />
     <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-    <title>{page_title}</title>
+    <title>{html.escape(page_title)}</title>
     <style>
       :root {{
         --text: #1f2937;
@@ -128,11 +252,22 @@ def convert_markdown_to_html(markdown_text: str, page_title: str) -> str:
     </style>
   </head>
   <body>
-    {body}
+    """
+
+
+HTML_DOCUMENT_TAIL = """
   </body>
 </html>
 """
-    return html
+
+
+def convert_markdown_to_html(markdown_text: str, page_title: str, converter=None) -> str:
+    # A converter built once can be reused across documents; reset() clears per-document state (toc, ids)
+    if converter is None:
+        converter = make_markdown_converter()
+    body = converter.reset().convert(markdown_text)
+
+    return html_document_head(page_title) + body + HTML_DOCUMENT_TAIL
 
 
 def write_text(path: pathlib.Path, content: str) -> None:
@@ -141,7 +276,86 @@ def write_text(path: pathlib.Path, content: str) -> None:
         f.write(content)
 
 
-def write_pdf_from_html(html_text: str, output_path: pathlib.Path, base_url: str | None = None) -> None:
+def render_markdown_to_file(
+    template_path: pathlib.Path, data: Dict[str, Any], out_path: pathlib.Path, env: Optional[Environment] = None
+) -> None:
+    if env is None:
+        env = build_environment(template_path.parent)
+    template = env.get_template(template_path.name)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        # generate() yields the output piece by piece instead of joining it into one string
+        for chunk in template.generate(**data):
+            f.write(chunk)
+
+
+def iter_markdown_sections(md_path: pathlib.Path):
+    """Yield the Markdown file in sections that start at a heading, never splitting a fenced code block.
+
+    Tables and lists cannot contain headings, so each section is valid Markdown on its own. Constructs that
+    span sections (reference links, footnotes, abbreviations) only resolve within their own section.
+    """
+    fence: Optional[str] = None
+    section: list[str] = []
+    with md_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            stripped = line.lstrip()
+            if fence is None and stripped.startswith(("```", "~~~")):
+                fence = stripped[:3]
+            elif fence is not None and stripped.startswith(fence):
+                fence = None
+            elif fence is None and line.startswith("#") and section:
+                yield "".join(section)
+                section = []
+            section.append(line)
+    if section:
+        yield "".join(section)
+
+
+def write_html_from_markdown_file(
+    md_path: pathlib.Path, out_path: pathlib.Path, page_title: str, converter=None
+) -> None:
+    if converter is None:
+        converter = make_markdown_converter()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        f.write(html_document_head(page_title))
+        for index, section in enumerate(iter_markdown_sections(md_path)):
+            if index:
+                f.write("\n")
+            f.write(converter.reset().convert(section))
+        f.write(HTML_DOCUMENT_TAIL)
+
+
+def make_font_config():
+    try:
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError as exc:
+        raise SystemExit(
+            "Missing dependency: weasyprint. Install with `pip install weasyprint` or `conda install -c conda-forge weasyprint`."
+        ) from exc
+
+    return FontConfiguration()
+
+
+def write_pdf_from_html(
+    html_text: str, output_path: pathlib.Path, base_url: str | None = None, font_config=None
+) -> None:
+    try:
+        from weasyprint import HTML
+    except ImportError as exc:
+        raise SystemExit(
+            "Missing dependency: weasyprint. Install with `pip install weasyprint` or `conda install -c conda-forge weasyprint`."
+        ) from exc
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Sharing a FontConfiguration between documents avoids re-running fontconfig setup for each PDF
+    HTML(string=html_text, base_url=base_url).write_pdf(str(output_path), font_config=font_config)
+
+
+def write_pdf_from_html_file(
+    html_path: pathlib.Path, output_path: pathlib.Path, base_url: str | None = None, font_config=None
+) -> None:
     try:
         from weasyprint import HTML
     except ImportError as exc:
@@ -149,8 +363,689 @@ def write_pdf_from_html(html_text: str, output_path: pathlib.Path, base_url: str
             "Missing dependency: weasyprint. Install with `pip install weasyprint` or `conda install -c conda-forge weasyprint`."
         ) from exc
 
+    # WeasyPrint lays out the whole document in memory; reading from the file at least avoids an extra copy
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    HTML(string=html_text, base_url=base_url).write_pdf(str(output_path))
+    HTML(filename=str(html_path), base_url=base_url, encoding="utf-8").write_pdf(str(output_path), font_config=font_config)
+
+
+class RenderContext:
+    """Toolchain kept warm between documents: Jinja environment, Markdown converter, WeasyPrint fonts."""
+
+    def __init__(self, template_path: pathlib.Path, bytecode_dir: Optional[pathlib.Path] = None) -> None:
+        self.template_path = template_path
+        self.env = build_environment(template_path.parent, bytecode_dir)
+        self._converter = None
+        self._font_config = None
+
+    @property
+    def converter(self):
+        if self._converter is None:
+            self._converter = make_markdown_converter()
+        return self._converter
+
+    @property
+    def font_config(self):
+        if self._font_config is None:
+            self._font_config = make_font_config()
+        return self._font_config
+
+
+def max_rss_mb() -> Optional[float]:
+    """Process peak resident set size so far (a high-water mark), or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageProfiler:
+    """Wall time, CPU time and peak RSS per render stage, plus timings for Markdown processors.
+
+    Peak memory is the process RSS high-water mark, so it includes C allocations (libyaml, WeasyPrint's
+    Pango/Cairo). `rss_growth_mb` is how far a stage raised that mark: a stage that allocates less than an
+    earlier one shows 0.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.processors: Dict[str, Dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        rss_before = max_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            rss_after = max_rss_mb()
+            # A stage can run more than once (e.g. cache reads); repeated entries are summed
+            entry = self.stages.setdefault(name, {"name": name, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rss_growth_mb": 0.0})
+            entry["calls"] += 1
+            entry["wall_s"] += wall
+            entry["cpu_s"] += cpu
+            entry["max_rss_mb"] = rss_after
+            if rss_before is not None and rss_after is not None:
+                entry["rss_growth_mb"] += rss_after - rss_before
+
+    def timed(self, name: str, fn):
+        entry = self.processors.setdefault(name, {"name": name, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry["calls"] += 1
+                entry["wall_s"] += time.perf_counter() - wall
+                entry["cpu_s"] += time.process_time() - cpu
+
+        return wrapper
+
+    def summary(self, **info: Any) -> Dict[str, Any]:
+        return {
+            **info,
+            "python": platform.python_version(),
+            "libyaml": YAML_LOADER is not yaml.SafeLoader,
+            "wall_s": time.perf_counter() - self.started,
+            "cpu_s": time.process_time() - self.started_cpu,
+            "max_rss_mb": max_rss_mb(),
+            "stages": list(self.stages.values()),
+            "markdown_processors": sorted(
+                (entry for entry in self.processors.values() if entry["calls"]), key=lambda entry: -entry["wall_s"]
+            ),
+        }
+
+    def format_table(self, summary: Dict[str, Any]) -> str:
+        def mb(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.1f}"
+
+        lines = [f"{'stage':<24} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'+MB':>7}"]
+        for entry in summary["stages"]:
+            lines.append(
+                f"{entry['name']:<24} {entry['calls']:>5} {entry['wall_s']:>9.4f} {entry['cpu_s']:>9.4f} "
+                f"{mb(entry.get('max_rss_mb')):>9} {entry['rss_growth_mb']:>7.1f}"
+            )
+        lines.append(f"{'total':<24} {'':>5} {summary['wall_s']:>9.4f} {summary['cpu_s']:>9.4f} {mb(summary['max_rss_mb']):>9}")
+        if summary["markdown_processors"]:
+            lines.append("")
+            lines.append(f"{'markdown processor':<38} {'calls':>5} {'wall s':>9} {'cpu s':>9}")
+            for entry in summary["markdown_processors"]:
+                lines.append(f"{entry['name']:<38} {entry['calls']:>5} {entry['wall_s']:>9.4f} {entry['cpu_s']:>9.4f}")
+        return "\n".join(lines)
+
+
+def instrument_markdown(converter, profiler: StageProfiler) -> None:
+    """Time each pre/tree/postprocessor, the block parser and the serializer of a Markdown converter.
+
+    Extensions register processors under their own names (`toc`, `smarty`, `footnote`, `abbr`...), which is
+    what the timings are reported under.
+    """
+    for kind in ("preprocessors", "treeprocessors", "postprocessors"):
+        registry = getattr(converter, kind)
+        # Registry has no public way to list names; _data maps each registered name to its processor
+        # (_priority can hold stale duplicates after an extension re-registers a name)
+        for name, processor in registry._data.items():
+            processor.run = profiler.timed(f"{kind[:-1]}:{name}", processor.run)
+    converter.parser.parseDocument = profiler.timed("parser:blocks", converter.parser.parseDocument)
+    converter.serializer = profiler.timed("serializer", converter.serializer)
+
+
+class StackSampler:
+    """Samples the calling thread's stack into collapsed-stack lines (`a;b;c count`) for flame graphs."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({pathlib.Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: pathlib.Path) -> None:
+        write_text(path, "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items())))
+
+
+@contextlib.contextmanager
+def profile_dump(path: pathlib.Path):
+    """Profile the enclosed code: sampled collapsed stacks for `.folded`/`.collapsed` paths, else cProfile stats."""
+    if path.suffix in (".folded", ".collapsed"):
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write(path)
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(path))
+
+
+def content_hash(*parts: bytes | str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def template_fingerprint(template_path: pathlib.Path) -> str:
+    # Every template in the directory counts, since the main one may include/extend the others
+    parts: list[bytes | str] = []
+    for path in sorted(template_path.parent.glob("*.j2")):
+        parts.extend([path.name, path.read_bytes()])
+    return content_hash(template_path.name, *parts)
+
+
+class BuildCache:
+    """Stage outputs stored as <cache_dir>/<stage>/<key>.<ext>."""
+
+    def __init__(self, cache_dir: Optional[pathlib.Path]) -> None:
+        self.cache_dir = cache_dir
+
+    def path(self, stage: str, key: str) -> Optional[pathlib.Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / stage / f"{key}.{stage}"
+
+    def get(self, stage: str, key: str) -> Optional[pathlib.Path]:
+        path = self.path(stage, key)
+        return path if path is not None and path.is_file() else None
+
+    def put_file(self, stage: str, key: str, source: pathlib.Path) -> None:
+        path = self.path(stage, key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Copy then rename, so a concurrent reader never sees a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(source, tmp_name)
+        os.replace(tmp_name, path)
+
+    def put_text(self, stage: str, key: str, content: str) -> None:
+        path = self.path(stage, key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_name, path)
+
+
+def copy_output(source: pathlib.Path, out_path: pathlib.Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, out_path)
+
+
+def stage_keys(
+    template_path: pathlib.Path, yaml_path: pathlib.Path, title: Optional[str], stream: bool = False
+) -> Dict[str, str]:
+    data_bytes = yaml_path.read_bytes()
+    md_key = content_hash("md", CACHE_VERSION, template_fingerprint(template_path), data_bytes)
+    # Streamed HTML converts section by section (footnotes, reference links and toc ids are per section),
+    # so it is not the same document as the buffered one and must not be served in its place
+    html_key = content_hash("html", md_key, title or "", "stream" if stream else "buffered")
+    pdf_key = content_hash("pdf", html_key, str(template_path.parent))
+    return {"md": md_key, "html": html_key, "pdf": pdf_key}
+
+
+def resolve_page_title(data: Any, title: Optional[str]) -> str:
+    meta = data.get("meta", {}) if isinstance(data, dict) else {}
+    return title or meta.get("title") or "Business Plan"
+
+
+def render_document(
+    template_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    engine: str,
+    out_path: pathlib.Path,
+    title: Optional[str],
+    cache: BuildCache,
+    context: Optional[RenderContext] = None,
+    profiler: Optional[StageProfiler] = None,
+) -> bool:
+    """Render one document. Returns True when the output came straight from the cache."""
+    if context is None:
+        context = RenderContext(template_path)
+    if profiler is None:
+        profiler = StageProfiler()
+    with profiler.stage("cache"):
+        keys = stage_keys(template_path, yaml_path, title)
+        cached = cache.get(engine, keys[engine])
+        if cached is not None:
+            copy_output(cached, out_path)
+    if cached is not None:
+        return True
+    md_key, html_key, pdf_key = keys["md"], keys["html"], keys["pdf"]
+
+    # Load and render, reusing any intermediate stage that is still cached
+    data: Any = None
+    cached_md = cache.get("md", md_key)
+    if cached_md is not None:
+        with profiler.stage("cache"):
+            markdown_text = cached_md.read_text(encoding="utf-8")
+    else:
+        with profiler.stage("yaml"):
+            data = load_yaml_data(yaml_path)
+        with profiler.stage("jinja"):
+            markdown_text = render_markdown_from_template(template_path, data, env=context.env)
+        with profiler.stage("cache"):
+            cache.put_text("md", md_key, markdown_text)
+
+    if engine == "md":
+        with profiler.stage("write"):
+            write_text(out_path, markdown_text)
+        return False
+
+    cached_html = cache.get("html", html_key)
+    if cached_html is not None:
+        with profiler.stage("cache"):
+            html_text = cached_html.read_text(encoding="utf-8")
+    else:
+        # Determine title
+        if data is None and title is None:
+            with profiler.stage("yaml"):
+                data = load_yaml_data(yaml_path)
+        page_title = resolve_page_title(data, title)
+        with profiler.stage("markdown"):
+            html_text = convert_markdown_to_html(markdown_text, page_title, converter=context.converter)
+        with profiler.stage("cache"):
+            cache.put_text("html", html_key, html_text)
+
+    if engine == "html":
+        with profiler.stage("write"):
+            write_text(out_path, html_text)
+        return False
+
+    if engine == "pdf":
+        base_url = str(template_path.parent)
+        with profiler.stage("pdf_setup"):
+            font_config = context.font_config
+        with profiler.stage("pdf"):
+            write_pdf_from_html(html_text, out_path, base_url=base_url, font_config=font_config)
+        with profiler.stage("cache"):
+            cache.put_file("pdf", pdf_key, out_path)
+        return False
+
+    raise SystemExit(f"Unknown engine: {engine}")
+
+
+def render_document_streaming(
+    template_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    engine: str,
+    out_path: pathlib.Path,
+    title: Optional[str],
+    cache: BuildCache,
+    context: Optional[RenderContext] = None,
+    profiler: Optional[StageProfiler] = None,
+) -> bool:
+    """Like render_document, but every stage goes file to file so no full document is held in memory."""
+    if context is None:
+        context = RenderContext(template_path)
+    if profiler is None:
+        profiler = StageProfiler()
+    with profiler.stage("cache"):
+        keys = stage_keys(template_path, yaml_path, title, stream=True)
+        cached = cache.get(engine, keys[engine])
+        if cached is not None:
+            copy_output(cached, out_path)
+    if cached is not None:
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = pathlib.Path(tmp)
+        data: Any = None
+
+        md_path = cache.get("md", keys["md"])
+        if md_path is None:
+            with profiler.stage("yaml"):
+                data = load_yaml_data(yaml_path)
+            md_path = out_path if engine == "md" else work_dir / "plan.md"
+            with profiler.stage("jinja"):
+                render_markdown_to_file(template_path, data, md_path, env=context.env)
+            with profiler.stage("cache"):
+                cache.put_file("md", keys["md"], md_path)
+        if engine == "md":
+            if md_path != out_path:
+                with profiler.stage("write"):
+                    copy_output(md_path, out_path)
+            return False
+
+        html_path = cache.get("html", keys["html"])
+        if html_path is None:
+            if data is None and title is None:
+                with profiler.stage("yaml"):
+                    data = load_yaml_data(yaml_path)
+            html_path = out_path if engine == "html" else work_dir / "plan.html"
+            with profiler.stage("markdown"):
+                write_html_from_markdown_file(md_path, html_path, resolve_page_title(data, title), context.converter)
+            with profiler.stage("cache"):
+                cache.put_file("html", keys["html"], html_path)
+        if engine == "html":
+            if html_path != out_path:
+                with profiler.stage("write"):
+                    copy_output(html_path, out_path)
+            return False
+
+        if engine == "pdf":
+            base_url = str(template_path.parent)
+            with profiler.stage("pdf_setup"):
+                font_config = context.font_config
+            with profiler.stage("pdf"):
+                write_pdf_from_html_file(html_path, out_path, base_url=base_url, font_config=font_config)
+            with profiler.stage("cache"):
+                cache.put_file("pdf", keys["pdf"], out_path)
+            return False
+
+    raise SystemExit(f"Unknown engine: {engine}")
+
+
+def expand_batch(spec: str) -> list[pathlib.Path]:
+    if spec.startswith("@"):
+        manifest = pathlib.Path(spec[1:]).resolve()
+        lines = manifest.read_text(encoding="utf-8").splitlines()
+        entries = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+        # Manifest entries are relative to the manifest itself
+        return [(manifest.parent / entry).resolve() for entry in entries]
+    return [pathlib.Path(path).resolve() for path in sorted(glob.glob(spec, recursive=True))]
+
+
+# Per-process state for batch workers, set up once by _init_batch_worker
+_worker_context: Optional[RenderContext] = None
+_worker_cache: Optional[BuildCache] = None
+
+
+def _init_batch_worker(template_path: pathlib.Path, cache_dir: Optional[pathlib.Path]) -> None:
+    global _worker_context, _worker_cache
+    _worker_context = RenderContext(template_path, cache_dir / "jinja" if cache_dir else None)
+    _worker_context.env.get_template(template_path.name)
+    _worker_cache = BuildCache(cache_dir)
+
+
+def _render_batch_item(item: tuple[pathlib.Path, str, pathlib.Path, Optional[str], bool]) -> Dict[str, Any]:
+    yaml_path, engine, out_path, title, stream = item
+    render = render_document_streaming if stream else render_document
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"data": str(yaml_path), "out": str(out_path), "cached": False, "error": None}
+    try:
+        result["cached"] = render(
+            _worker_context.template_path, yaml_path, engine, out_path, title, _worker_cache, _worker_context
+        )
+    except (Exception, SystemExit) as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def render_batch(
+    template_path: pathlib.Path,
+    yaml_paths: list[pathlib.Path],
+    engine: str,
+    out_dir: pathlib.Path,
+    title: Optional[str],
+    cache_dir: Optional[pathlib.Path],
+    jobs: int,
+    stream: bool = False,
+) -> list[Dict[str, Any]]:
+    items = [(path, engine, out_dir / f"{path.stem}.{engine}", title, stream) for path in yaml_paths]
+    # Compile the template once up front; workers then load it from the bytecode cache
+    _init_batch_worker(template_path, cache_dir)
+    if jobs <= 1 or len(items) <= 1:
+        return [_render_batch_item(item) for item in items]
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(items)),
+        initializer=_init_batch_worker,
+        initargs=(template_path, cache_dir),
+    ) as pool:
+        return list(pool.map(_render_batch_item, items, chunksize=max(1, len(items) // (jobs * 4))))
+
+
+def run_batch(args: argparse.Namespace, template_path: pathlib.Path, cache_dir: Optional[pathlib.Path]) -> int:
+    yaml_paths = expand_batch(args.batch)
+    if not yaml_paths:
+        raise SystemExit(f"No data files matched {args.batch}")
+    out_dir = pathlib.Path(args.out_dir).resolve() if args.out_dir else template_path.parent / "out"
+
+    started = time.perf_counter()
+    results = render_batch(
+        template_path, yaml_paths, args.engine, out_dir, args.title, cache_dir, args.jobs, stream=args.stream
+    )
+    total = time.perf_counter() - started
+
+    for result in results:
+        status = "error" if result["error"] else ("cached" if result["cached"] else "rendered")
+        print(f"{result['seconds']:8.3f}s  {status:8}  {result['data']} -> {result['out']}")
+        if result["error"]:
+            print(f"           {result['error']}")
+    failed = sum(1 for result in results if result["error"])
+    print(f"{len(results)} documents in {total:.2f}s ({failed} failed, jobs={args.jobs})")
+
+    if args.report:
+        report = {"engine": args.engine, "jobs": args.jobs, "total_seconds": round(total, 4), "documents": results}
+        write_text(pathlib.Path(args.report), json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+
+RELOAD_SCRIPT = """
+<script>
+  new EventSource("/__reload").onmessage = () => location.reload();
+</script>
+"""
+
+CONTENT_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+
+class PreviewServer:
+    """Serves the rendered output at / and pushes a reload to open pages (SSE on /__reload) after each render."""
+
+    def __init__(self, out_path: pathlib.Path, engine: str, port: int) -> None:
+        self.out_path = out_path
+        self.engine = engine
+        self.version = 0
+        self._changed = threading.Condition()
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def notify_reload(self) -> None:
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, seen: int, timeout: float) -> int:
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen, timeout=timeout)
+            return self.version
+
+    def start(self) -> None:
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:  # keep the console for render output
+                pass
+
+            def do_GET(self) -> None:
+                if self.path == "/__reload":
+                    self._stream_reloads()
+                elif self.path in ("/", "/index.html"):
+                    self._send_output()
+                else:
+                    self.send_error(404)
+
+            def _send_output(self) -> None:
+                try:
+                    body = server.out_path.read_bytes()
+                except FileNotFoundError:
+                    self.send_error(503, "Not rendered yet")
+                    return
+                if server.engine == "html":
+                    body = body.replace(b"</body>", RELOAD_SCRIPT.encode() + b"</body>", 1)
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPES[server.engine])
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_reloads(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                seen = server.version
+                try:
+                    while True:
+                        current = server.wait_for_change(seen, timeout=15)
+                        self.wfile.write(b"data: reload\n\n" if current != seen else b": keepalive\n\n")
+                        self.wfile.flush()
+                        seen = current
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+def watched_files(template_path: pathlib.Path, yaml_path: pathlib.Path) -> list[pathlib.Path]:
+    return [yaml_path, *sorted(template_path.parent.glob("*.j2"))]
+
+
+def _mtimes(paths: list[pathlib.Path]) -> dict[pathlib.Path, int]:
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass  # editors often replace files by delete + rename
+    return stamps
+
+
+def watch(
+    template_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    engine: str,
+    out_path: pathlib.Path,
+    title: Optional[str],
+    cache: BuildCache,
+    debounce: float,
+    server: Optional[PreviewServer] = None,
+    poll_interval: float = 0.1,
+    stream: bool = False,
+) -> None:
+    # One warm context for the whole session; Jinja's auto_reload recompiles only templates that changed,
+    # and the stage cache skips every stage whose inputs are the same as before
+    context = RenderContext(template_path)
+    render = render_document_streaming if stream else render_document
+
+    def rebuild() -> None:
+        started = time.perf_counter()
+        try:
+            from_cache = render(template_path, yaml_path, engine, out_path, title, cache, context)
+        except Exception as exc:  # keep watching through template/YAML errors
+            print(f"Render failed: {type(exc).__name__}: {exc}", file=sys.stderr)
+            return
+        status = " (cached)" if from_cache else ""
+        print(f"Wrote {out_path}{status} in {time.perf_counter() - started:.3f}s")
+        if server is not None:
+            server.notify_reload()
+
+    rebuild()
+    last_seen = _mtimes(watched_files(template_path, yaml_path))
+    changed_at: Optional[float] = None
+    while True:
+        time.sleep(poll_interval)
+        # Re-glob each time so new template files are picked up
+        current = _mtimes(watched_files(template_path, yaml_path))
+        if current != last_seen:
+            last_seen = current
+            changed_at = time.monotonic()
+        elif changed_at is not None and time.monotonic() - changed_at >= debounce:
+            changed_at = None
+            rebuild()
+
+
+def run_profiled(
+    args: argparse.Namespace,
+    template_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    out_path: pathlib.Path,
+    cache: BuildCache,
+) -> int:
+    profiler = StageProfiler()
+    context = RenderContext(template_path)
+    dump = profile_dump(pathlib.Path(args.profile_dump).resolve()) if args.profile_dump else contextlib.nullcontext()
+    render = render_document_streaming if args.stream else render_document
+    with dump:
+        if args.engine != "md":
+            # Building the converter imports Markdown and loads every extension
+            with profiler.stage("markdown_setup"):
+                instrument_markdown(context.converter, profiler)
+        from_cache = render(template_path, yaml_path, args.engine, out_path, args.title, cache, context, profiler)
+    print(f"Wrote {out_path}" + (" (cached)" if from_cache else ""))
+
+    summary = profiler.summary(
+        engine=args.engine,
+        data=str(yaml_path),
+        data_bytes=yaml_path.stat().st_size,
+        output_bytes=out_path.stat().st_size,
+        stream=args.stream,
+        cached=from_cache,
+        profile_dump=args.profile_dump,
+    )
+    print(profiler.format_table(summary), file=sys.stderr)
+    if from_cache:
+        print("Output came from the cache; use --no-cache to profile a full render", file=sys.stderr)
+    if args.profile:
+        write_text(pathlib.Path(args.profile), json.dumps(summary, indent=2) + "\n")
+    return 0
 
 
 def main() -> int:
@@ -159,6 +1054,13 @@ def main() -> int:
     template_path = pathlib.Path(args.template).resolve()
     yaml_path = pathlib.Path(args.data).resolve()
     base_dir = template_path.parent
+    cache_dir = None if args.no_cache else pathlib.Path(args.cache_dir).resolve()
+
+    if (args.profile is not None or args.profile_dump is not None) and (args.batch or args.watch):
+        raise SystemExit("--profile covers a single render; use --report for batch timings")
+
+    if args.batch:
+        return run_batch(args, template_path, cache_dir)
 
     # Determine output path
     if args.out is not None:
@@ -171,33 +1073,34 @@ def main() -> int:
         }[args.engine]
         out_path = base_dir / default_name
 
-    # Load and render
-    data = load_yaml_data(yaml_path)
-    markdown_text = render_markdown_from_template(template_path, data)
+    cache = BuildCache(cache_dir)
 
-    if args.engine == "md":
-        write_text(out_path, markdown_text)
-        print(f"Wrote {out_path}")
+    if args.watch:
+        server = None
+        if args.serve is not None:
+            server = PreviewServer(out_path, args.engine, args.serve)
+            server.start()
+            print(f"Previewing {out_path.name} at {server.url}")
+        print("Watching for changes, Ctrl+C to stop")
+        try:
+            watch(
+                template_path, yaml_path, args.engine, out_path, args.title, cache, args.debounce, server,
+                stream=args.stream,
+            )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if server is not None:
+                server.stop()
         return 0
 
-    # Determine title
-    meta = data.get("meta", {}) if isinstance(data, dict) else {}
-    page_title = args.title or meta.get("title") or "Business Plan"
-
-    html_text = convert_markdown_to_html(markdown_text, page_title)
-
-    if args.engine == "html":
-        write_text(out_path, html_text)
-        print(f"Wrote {out_path}")
-        return 0
-
-    if args.engine == "pdf":
-        base_url = str(base_dir)
-        write_pdf_from_html(html_text, out_path, base_url=base_url)
-        print(f"Wrote {out_path}")
-        return 0
+    if args.profile is not None or args.profile_dump is not None:
+        return run_profiled(args, template_path, yaml_path, out_path, cache)
 
-    raise SystemExit(f"Unknown engine: {args.engine}")
+    render = render_document_streaming if args.stream else render_document
+    from_cache = render(template_path, yaml_path, args.engine, out_path, args.title, cache)
+    print(f"Wrote {out_path}" + (" (cached)" if from_cache else ""))
+    return 0
 
 
 if __name__ == "__main__":
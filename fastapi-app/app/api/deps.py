@@ -1,13 +1,14 @@
-from typing import Generator
+from typing import Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.read_your_writes import last_write
 from app.db import crud, models
-from app.db.session import SessionLocal
+from app.db.session import ReadSessionLocal, SessionLocal, get_read_engine
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -21,30 +22,54 @@ def get_db() -> Generator[Session, None, None]:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def get_user_from_token(db: Session, token: str) -> Optional[models.User]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         subject = payload.get("sub")
         if subject is None:
-            raise credentials_exception
+            return None
         user_id = int(subject)
     except (JWTError, ValueError):
-        raise credentials_exception
+        return None
+    return crud.get_user(db, user_id=user_id)
+
 
-    user = crud.get_user(db, user_id=user_id)
+def _authenticate(db: Session, token: str) -> models.User:
+    user = get_user_from_token(db, token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    return _authenticate(db, token)
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    # Read-only session for GET routes: a replica, or the primary if this client wrote recently
+    db = ReadSessionLocal(bind=get_read_engine(last_write(request)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_current_read_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db),
+):
+    # For routes that read through get_read_db: the user is loaded by the same session, so the request
+    # does not also open one on the primary
+    return _authenticate(db, token)
+
+
 from app.db.models import User
 
 def require_superuser(current_user: User = Depends(get_current_user)):
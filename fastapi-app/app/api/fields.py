@@ -0,0 +1,44 @@
+"""
+Sparse fieldsets: `?fields=id,title` on read routes.
+
+The selected fields become the SQL column list (crud functions take `fields=`), so columns a client does
+not display, such as long project descriptions, are neither fetched nor sent. Sparse responses carry only
+the requested fields (plus any the route always includes) and are not validated against the full
+response model.
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def sparse_fields(schema: type[BaseModel], always: Iterable[str] = ()) -> Callable[..., Optional[tuple[str, ...]]]:
+    """Dependency returning the requested fields of `schema` in declaration order, or None for all of them."""
+    allowed = tuple(schema.model_fields)
+    always = frozenset(always)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        if not requested:
+            return None
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # A tuple, so it can be part of a read-coalescing key
+        return tuple(name for name in allowed if name in requested or name in always)
+
+    return dependency
+
+
+def sparse_response(rows: Any) -> JSONResponse:
+    """Serialize column rows (one Row or a list of them) from a `fields=` query."""
+    if isinstance(rows, list):
+        return JSONResponse(jsonable_encoder([row._asdict() for row in rows]))
+    return JSONResponse(jsonable_encoder(rows._asdict()))
@@ -0,0 +1,107 @@
+from typing import Iterator, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_read_db, require_superuser
+from app.core.admission import admission
+from app.core.audit import audit_log
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.tracing import exporter
+from app.db import crud
+from app.db.singleflight import reads
+from app.db.slow_queries import slow_query_log
+from app.db.user_import import UserImport
+from app.jobs.queue import enqueue
+from app.schemas.audit import AuditEventOut
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_superuser)])
+
+
+@router.get("/metrics")
+def metrics():
+    return {"singleflight": reads.stats(), "audit": audit_log.stats(), "admission": admission.stats(), "tracing": exporter.stats()}
+
+
+@router.get("/slow-queries")
+def slow_queries(limit: int = Query(20, ge=1, le=500)):
+    # Slowest statement fingerprints by total time in this worker, with their captured plans
+    return slow_query_log.report(limit)
+
+
+@router.get("/audit", response_model=list[AuditEventOut])
+def list_audit_events(
+    response: Response,
+    project_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    target_user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    # Newest first; events show up here once the background writer has flushed them
+    before_id = None
+    if cursor is not None:
+        try:
+            before_id = int(decode_cursor(cursor)["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    events = crud.list_audit_events(
+        db,
+        project_id=project_id,
+        actor_id=actor_id,
+        target_user_id=target_user_id,
+        action=action,
+        before_id=before_id,
+        limit=limit + 1,
+    )
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": events[-1].id})
+    return events
+
+
+@router.post("/counters/reconcile", status_code=202)
+def reconcile_counters(db: Session = Depends(get_db)):
+    # Recounting touches every project and user, so it runs as a background job
+    job = enqueue(db, "counters.reconcile")
+    db.commit()
+    return {"job_id": job.id}
+
+
+def _body_lines(request: Request) -> Iterator[str]:
+    """The request body as text lines, read from a threadpool thread while it uploads."""
+    stream = request.stream()
+    buffered = b""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            break
+        buffered += chunk
+        *lines, buffered = buffered.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "replace") + "\n"
+    if buffered:
+        yield buffered.decode("utf-8", "replace")
+
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """Bulk-create users from a CSV (`email,password` header) or NDJSON body, processed while it uploads."""
+    fmt = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    importer = UserImport(db, fmt)
+
+    def run() -> list:
+        return [result for chunk in importer.process(_body_lines(request)) for result in chunk]
+
+    results = await run_in_threadpool(run)
+    return {**importer.counts, "results": results}
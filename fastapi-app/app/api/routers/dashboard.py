@@ -0,0 +1,44 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_read_user, get_read_db
+from app.api.routers.projects import project_cursor
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.db import crud, models
+from app.schemas.dashboard import DashboardMember, DashboardOut, DashboardProject
+from app.schemas.project import ProjectOut
+
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardOut)
+def get_dashboard(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    members_per_project: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    # Current user, their projects and the projects' members in one response: the user comes from auth,
+    # then one query for the page of projects and one for all of their members, whatever the page size
+    projects = crud.get_projects(db, current_user_id=current_user.id, after_id=project_cursor(cursor), limit=limit + 1)
+    if len(projects) > limit:
+        projects = projects[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": projects[-1].id})
+
+    members: dict[int, list[DashboardMember]] = {project.id: [] for project in projects}
+    if projects:
+        for project_id, user_id, email, role in crud.get_members_of_projects(db, list(members), members_per_project):
+            members[project_id].append(DashboardMember(user_id=user_id, email=email, role=role))
+
+    return DashboardOut(
+        user=current_user,
+        projects=[
+            DashboardProject(**ProjectOut.model_validate(project).model_dump(), members=members[project.id])
+            for project in projects
+        ],
+    )
@@ -0,0 +1,93 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_user_from_token
+from app.core.broadcast import Subscription, broadcaster
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal
+
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# EventSource and browser WebSockets cannot send headers, so a `?token=` query parameter is accepted too
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+
+
+def _load_feed_scope(token: Optional[str]) -> Optional[tuple[int, list[int]]]:
+    # Short-lived session: a stream can stay open for hours and must not pin a pooled connection
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        if user is None:
+            return None
+        return user.id, crud.get_project_ids(db, user_id=user.id)
+    finally:
+        db.close()
+
+
+async def _subscribe(token: Optional[str]) -> Optional[Subscription]:
+    scope = await run_in_threadpool(_load_feed_scope, token)
+    if scope is None:
+        return None
+    user_id, project_ids = scope
+    return broadcaster.subscribe(user_id, project_ids)
+
+
+async def _sse_stream(request: Request, subscription: Subscription):
+    try:
+        while not subscription.finished:
+            event = await subscription.get(timeout=settings.CHANGE_FEED_KEEPALIVE_SECONDS)
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None),
+):
+    subscription = await _subscribe(header_token or token)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return StreamingResponse(
+        _sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: Optional[str] = Query(None)):
+    subscription = await _subscribe(token)
+    if subscription is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    try:
+        while not subscription.finished:
+            event = await subscription.get(timeout=settings.CHANGE_FEED_KEEPALIVE_SECONDS)
+            await websocket.send_json(event if event is not None else {"type": "keepalive"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscription)
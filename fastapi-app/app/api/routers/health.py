@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.health import readiness
+
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    # async: answered on the event loop, never queued behind DB-bound routes in the threadpool
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    ready, checks = await readiness.status()
+    return JSONResponse(
+        {"status": "ready" if ready else "not ready", "checks": checks},
+        status_code=200 if ready else 503,
+    )
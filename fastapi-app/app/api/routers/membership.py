@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_read_user, get_current_user, get_db, get_read_db
+from app.api.fields import sparse_fields, sparse_response
 from app.db import crud, models
+from app.db.singleflight import coalesced
 from app.schemas.project import ProjectOut
 from app.schemas.membership import MembershipOut, MembershipIn
 
@@ -13,12 +15,17 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.get("/{project_id}/users", response_model=list[MembershipOut])
-def list_project_members(project_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    memberships = crud.list_memberships(db, current_user_id=current_user.id, project_id=project_id)
+def list_project_members(
+    project_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(sparse_fields(MembershipOut)),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    memberships = coalesced(crud.list_memberships, db, current_user_id=current_user.id, project_id=project_id, fields=fields)
     if not memberships:
         # Member-only access, otherwise 404 to avoid leaking existence
         raise HTTPException(status_code=404, detail="Project not found")
-    return memberships
+    return memberships if fields is None else sparse_response(memberships)
 
 
 @router.post("/{project_id}/users", response_model=ProjectOut)
@@ -0,0 +1,54 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_read_user, get_read_db
+from app.core.config import settings
+from app.core.plan_renderer import MEDIA_TYPES, PlanRenderError, plan_renderer
+from app.db import crud, models
+
+
+router = APIRouter(prefix="/projects", tags=["plans"])
+
+
+async def _read_payload(request: Request) -> bytes:
+    # Refused as soon as it is known to be too large, without buffering more than the limit
+    limit = settings.PLAN_MAX_PAYLOAD_BYTES
+    too_large = HTTPException(status_code=413, detail="Plan payload too large")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post("/{project_id}/plan")
+async def render_project_plan(
+    project_id: int,
+    request: Request,
+    format: Literal["md", "html", "pdf"] = "html",
+    title: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    # Body is the plan YAML (same shape as docs/plan/example_plan.yaml)
+    project = await run_in_threadpool(crud.get_project, db, current_user_id=current_user.id, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    payload = await _read_payload(request)
+
+    try:
+        content = await plan_renderer.render_plan(payload, format, title)
+    except PlanRenderError as exc:
+        headers = {"Retry-After": "5"} if exc.status_code == 503 else None
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail, headers=headers)
+    return Response(content=content, media_type=MEDIA_TYPES[format])
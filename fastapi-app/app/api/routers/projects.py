@@ -1,19 +1,51 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_read_user, get_current_user, get_db, get_read_db
+from app.api.fields import sparse_fields, sparse_response
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.db import crud, models
-from app.schemas.project import ProjectCreate, ProjectOut, ProjectUpdate
+from app.db.singleflight import coalesced
+from app.schemas.project import ProjectCreate, ProjectOut, ProjectSearchHit, ProjectUpdate
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+project_fields = sparse_fields(ProjectOut, always=("id",))
+
 
 @router.get("/", response_model=List[ProjectOut])
-def list_projects(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return crud.get_projects(db, current_user_id=current_user.id)
+def list_projects(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(project_fields),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    after_id = project_cursor(cursor)
+    projects = coalesced(
+        crud.get_projects, db, current_user_id=current_user.id, fields=fields, after_id=after_id, limit=limit + 1
+    )
+    has_more = len(projects) > limit
+    projects = projects[:limit]
+    result = projects if fields is None else sparse_response(projects)
+    if has_more:
+        # A sparse result is a Response of its own, which does not pick up headers set on `response`
+        (response if fields is None else result).headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": projects[-1].id})
+    return result
+
+
+def project_cursor(cursor: Optional[str]) -> Optional[int]:
+    """The last project id of the previous page, from a projects list (or dashboard) cursor."""
+    if cursor is None:
+        return None
+    try:
+        return int(decode_cursor(cursor)["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.post("/", response_model=ProjectOut, status_code=201)
@@ -21,12 +53,40 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db), curren
     return crud.create_project(db, current_user_id=current_user.id, title=payload.title, description=payload.description)
 
 
+@router.get("/search", response_model=List[ProjectSearchHit])
+def search_projects(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    after = None
+    if cursor is not None:
+        try:
+            values = decode_cursor(cursor)
+            after = (float(values["score"]), int(values["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    hits = crud.search_projects(db, current_user_id=current_user.id, query=q, limit=limit + 1, after=after)
+    if len(hits) > limit:
+        hits = hits[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"score": hits[-1].score, "id": hits[-1].id})
+    return hits
+
+
 @router.get("/{project_id}", response_model=ProjectOut)
-def get_project(project_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    project = crud.get_project(db, current_user_id=current_user.id, project_id=project_id)
+def get_project(
+    project_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(project_fields),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_read_user),
+):
+    project = coalesced(crud.get_project, db, current_user_id=current_user.id, project_id=project_id, fields=fields)
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return project if fields is None else sparse_response(project)
 
 
 @router.put("/{project_id}", response_model=ProjectOut)
@@ -0,0 +1,66 @@
+"""
+Bulk user import from the command line, against the configured database (see app/db/user_import.py).
+
+Usage examples:
+  - CSV:     python -m app.cli.import_users users.csv
+  - NDJSON:  python -m app.cli.import_users users.ndjson --results import-results.ndjson
+  - Stdin:   cat users.csv | python -m app.cli.import_users -
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.user_import import FORMATS, UserImport, hash_pool
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create users in bulk from CSV or NDJSON")
+    parser.add_argument("path", help="Input file, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=None,
+        help="Input format (default: from the file extension, csv for stdin)"
+    )
+    parser.add_argument(
+        "--results",
+        default=None,
+        help="Write one JSON line per input row with its outcome to this file"
+    )
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=settings.USER_IMPORT_HASH_WORKERS,
+        help="Password hashing processes (0 hashes in this process)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    results_file = open(args.results, "w", encoding="utf-8") if args.results else None
+    db = SessionLocal()
+    importer = UserImport(db, fmt, hash_workers=args.hash_workers)
+    try:
+        for chunk in importer.process(source):
+            if results_file is not None:
+                for result in chunk:
+                    results_file.write(json.dumps(result) + "\n")
+    finally:
+        hash_pool.shutdown()
+        db.close()
+        if source is not sys.stdin:
+            source.close()
+        if results_file is not None:
+            results_file.close()
+    print(", ".join(f"{status}: {count}" for status, count in importer.counts.items()))
+    return 1 if importer.counts["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Snapshot export and restore from the command line, against the configured database (see app/db/snapshot.py).
+
+Usage examples:
+  - Export:   python -m app.cli.snapshot export backup.fasnap
+  - Restore:  python -m app.cli.snapshot restore backup.fasnap   (run it again to resume after a failure)
+  - Pipe:     python -m app.cli.snapshot export - | ssh other-host python -m app.cli.snapshot restore -
+"""
+
+import argparse
+import sys
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.snapshot import SnapshotError, export_snapshot, restore_snapshot
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export or restore users, projects and memberships")
+    parser.add_argument("command", choices=("export", "restore"))
+    parser.add_argument("path", help="Snapshot file, or - for stdout/stdin")
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=settings.SNAPSHOT_CHUNK_ROWS,
+        help="Rows per frame when exporting"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.path == "-":
+        stream = sys.stdout.buffer if args.command == "export" else sys.stdin.buffer
+    else:
+        stream = open(args.path, "wb" if args.command == "export" else "rb")
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            counts = export_snapshot(db, stream, chunk_rows=args.chunk_rows)
+        else:
+            counts = restore_snapshot(db, stream)
+    except SnapshotError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+        if args.path != "-":
+            stream.close()
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Admission control for API requests.
+
+Requests are split into classes (auth, read, write), each with its own concurrency limit, so a pile-up of
+slow writes cannot starve logins or reads. A request over the limit waits in a bounded FIFO queue; if no
+slot frees up within ADMISSION_QUEUE_TIMEOUT_SECONDS, or the queue is already full, it gets an immediate
+503 with Retry-After instead of joining the threadpool backlog. Latency therefore stays bounded by
+(queue timeout + service time) under overload, and the excess is shed.
+
+With ADMISSION_ADAPTIVE, each class limit follows AIMD on observed service time: +1/limit per request
+completed within ADMISSION_LATENCY_TARGET_SECONDS while the class is saturated, x ADMISSION_BACKOFF_RATIO
+(at most once per target interval) when a request is slower. The configured limit is the ceiling.
+
+Health checks and the change feed (long-lived streams) are not limited. State is per worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.config import settings
+
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class Rejected(Exception):
+    pass
+
+
+class Limiter:
+    def __init__(
+        self,
+        limit: int,
+        queue_size: int,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        latency_target: float = 0.5,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        self.max_limit = limit
+        self.limit = float(limit)
+        self.queue_size = queue_size
+        self.adaptive = adaptive
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _has_room(self) -> bool:
+        return self.in_flight < max(self.min_limit, int(self.limit))
+
+    async def acquire(self, timeout: float) -> None:
+        """Take a slot, waiting at most `timeout` seconds. Raises Rejected when the request must be shed."""
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Rejected("queue full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted at the deadline; keep the slot rather than leak it
+                self.admitted += 1
+                return
+            waiter.cancel()
+            self.timed_out += 1
+            raise Rejected("queue timeout") from None
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as the client went away
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+
+    def release(self, latency: Optional[float] = None) -> None:
+        self.in_flight -= 1
+        if latency is not None and self.adaptive:
+            self._adapt(latency)
+        # Hand free slots to the oldest waiters still waiting; the slot moves over without being released
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _adapt(self, latency: float) -> None:
+        now = time.monotonic()
+        if latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= int(self.limit) or self._waiters:
+            # Only grow while the limit is what holds requests back
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": sum(1 for waiter in self._waiters if not waiter.done()),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    def __init__(self, limits: Optional[dict[str, int]] = None) -> None:
+        limits = limits or settings.ADMISSION_LIMITS
+        self.limiters = {
+            name: Limiter(
+                limit,
+                settings.ADMISSION_QUEUE_SIZE,
+                adaptive=settings.ADMISSION_ADAPTIVE,
+                min_limit=settings.ADMISSION_MIN_LIMIT,
+                latency_target=settings.ADMISSION_LATENCY_TARGET_SECONDS,
+                backoff_ratio=settings.ADMISSION_BACKOFF_RATIO,
+            )
+            for name, limit in limits.items()
+        }
+
+    @staticmethod
+    def classify(method: str, path: str) -> Optional[str]:
+        api = settings.API_V1_STR
+        if not path.startswith(api + "/") or path.startswith(api + "/events/"):
+            return None
+        if path.startswith(api + "/auth/"):
+            return "auth"
+        return "write" if method in WRITE_METHODS else "read"
+
+    def stats(self) -> dict[str, dict]:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: Optional[AdmissionController] = None) -> None:
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        limiter = self.controller.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire(settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+        except Rejected:
+            await self._reject(send)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send) -> None:
+        retry_after = str(math.ceil(settings.ADMISSION_RETRY_AFTER_SECONDS)).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [(b"content-type", b"application/json"), (b"retry-after", retry_after)],
+        })
+        await send({"type": "http.response.body", "body": json.dumps({"detail": "Server is overloaded, retry later"}).encode()})
@@ -0,0 +1,233 @@
+"""
+Append-only audit log of project and membership changes.
+
+crud records an event after each committed mutation. Events go into an in-memory ring buffer, and a
+background task writes them with multi-row INSERTs (one transaction per AUDIT_BATCH_SIZE events) every
+AUDIT_FLUSH_INTERVAL_SECONDS, or sooner once a full batch is waiting. Requests never pay for an extra
+write transaction.
+
+Loss is bounded:
+- if the database stays unreachable until the buffer is full, the oldest events are dropped and counted;
+- on shutdown the buffer is flushed, and whatever cannot be written is appended to AUDIT_SPILL_PATH (JSON
+  lines), which is written to the database at the next start (claimed by one worker, see restore());
+- a hard crash loses at most the events recorded since the last flush.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+
+logger = logging.getLogger("fastapi")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditLog:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        capacity: Optional[int] = None,
+        spill_path: Optional[str] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.capacity = capacity or settings.AUDIT_BUFFER_SIZE
+        self.spill_path = pathlib.Path(spill_path or settings.AUDIT_SPILL_PATH)
+        self._buffer: deque[dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        action: str,
+        *,
+        actor_id: int,
+        project_id: Optional[int] = None,
+        target_user_id: Optional[int] = None,
+        old_role: Optional[str] = None,
+        new_role: Optional[str] = None,
+    ) -> None:
+        event = {
+            "created_at": time.time(),
+            "actor_id": actor_id,
+            "action": action,
+            "project_id": project_id,
+            "target_user_id": target_user_id,
+            "old_role": old_role,
+            "new_role": new_role,
+        }
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(event)
+            self.recorded += 1
+            backlog = len(self._buffer)
+        if backlog >= settings.AUDIT_BATCH_SIZE and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+    def _take(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            return [self._buffer.popleft() for _ in range(min(limit, len(self._buffer)))]
+
+    def _put_back(self, events: list[dict[str, Any]]) -> None:
+        # Back at the front, in order; they are the oldest, so they are what a full buffer drops
+        with self._lock:
+            for event in reversed(events):
+                if len(self._buffer) >= self.capacity:
+                    self.dropped += 1
+                else:
+                    self._buffer.appendleft(event)
+
+    def _insert(self, events: list[dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(models.AuditEvent).values(events))
+            db.commit()
+        finally:
+            db.close()
+
+    def flush(self) -> int:
+        """Write everything buffered so far. On a database error the batch is put back and the error raised."""
+        written = 0
+        while True:
+            batch = self._take(settings.AUDIT_BATCH_SIZE)
+            if not batch:
+                return written
+            try:
+                self._insert(batch)
+            except Exception:
+                self._put_back(batch)
+                raise
+            written += len(batch)
+            with self._lock:
+                self.written += len(batch)
+
+    def spill(self) -> int:
+        """Append the buffered events to the spill file (last resort on shutdown)."""
+        events = self._take(len(self._buffer))
+        if not events:
+            return 0
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.spill_path.open("a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return len(events)
+
+    def restore(self) -> int:
+        """Write previous runs' spill files to the database, then remove them."""
+        restored = 0
+        for claimed in self._claim_spills():
+            with claimed.open("r", encoding="utf-8") as f:
+                events = [json.loads(line) for line in f if line.strip()]
+            for start in range(0, len(events), settings.AUDIT_BATCH_SIZE):
+                self._insert(events[start:start + settings.AUDIT_BATCH_SIZE])
+            # A crash before this point leaves the claimed file for the next start; duplicates beat losing the trail
+            claimed.unlink()
+            restored += len(events)
+        with self._lock:
+            self.written += restored
+        return restored
+
+    def _claim_spills(self) -> list[pathlib.Path]:
+        # Every worker restores at startup: renaming is atomic, so each file is claimed by exactly one of them
+        claims = []
+        mine = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}.restoring")
+        try:
+            os.replace(self.spill_path, mine)
+            claims.append(mine)
+        except FileNotFoundError:
+            pass
+        # Claims left by a worker that died while restoring
+        for stale in self.spill_path.parent.glob(f"{self.spill_path.name}.*.restoring"):
+            pid = stale.name[len(self.spill_path.name) + 1:-len(".restoring")].split(".")[0]
+            if stale == mine or not pid.isdigit() or _alive(int(pid)):
+                continue
+            retaken = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}.{pid}.restoring")
+            try:
+                os.replace(stale, retaken)
+                claims.append(retaken)
+            except FileNotFoundError:
+                pass
+        return claims
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "buffered": len(self._buffer),
+            }
+
+    async def serve(self) -> None:
+        try:
+            restored = await asyncio.to_thread(self.restore)
+            if restored:
+                logger.info("Restored %s audit events from %s", restored, self.spill_path)
+        except Exception:
+            logger.exception("Could not restore audit events from %s", self.spill_path)
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.AUDIT_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Audit flush failed, %s events buffered", len(self._buffer))
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.serve())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception:
+            spilled = self.spill()
+            logger.exception("Final audit flush failed, spilled %s events to %s", spilled, self.spill_path)
+
+
+audit_log = AuditLog()
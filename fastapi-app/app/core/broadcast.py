@@ -0,0 +1,137 @@
+"""
+Project/membership change feed.
+
+crud mutations call `broadcaster.publish(event)` after they commit. The backend carries the event to
+every worker (the default in-memory backend only reaches the current process) and the broadcaster fans it
+out to subscriptions, each owned by one SSE/WebSocket client on an asyncio loop.
+
+Each subscription has a bounded buffer. A client that falls behind is dropped: its buffer is replaced by a
+single `{"type": "overflow"}` event and the stream ends, the client is expected to refetch and resubscribe.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import threading
+from typing import Any, Callable, Iterable, Optional, Protocol
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("fastapi")
+
+Event = dict[str, Any]
+
+OVERFLOW_EVENT: Event = {"type": "overflow"}
+
+
+class BroadcastBackend(Protocol):
+    def attach(self, deliver: Callable[[Event], None]) -> None:
+        """Register the callback that hands received events to local subscribers."""
+
+    def publish(self, event: Event) -> None:
+        """Send an event to all workers. Called from request threads, must be thread-safe."""
+
+
+class MemoryBackend:
+    """Single-process backend: publishing delivers straight to this process' subscribers."""
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Callable[[Event], None]] = None
+
+    def attach(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: Event) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+
+class Subscription:
+    def __init__(self, user_id: int, project_ids: Iterable[int], maxsize: int) -> None:
+        self.user_id = user_id
+        self.project_ids = set(project_ids)
+        self.dropped = False
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        self._loop = asyncio.get_running_loop()
+
+    def _visible(self, event: Event) -> bool:
+        project_id = event.get("project_id")
+        kind = event.get("type")
+        if kind == "project.created" and event.get("actor_id") == self.user_id:
+            self.project_ids.add(project_id)
+        elif kind in ("membership.added", "membership.updated") and event.get("user_id") == self.user_id:
+            self.project_ids.add(project_id)
+        if project_id not in self.project_ids:
+            return False
+        if kind == "project.deleted" or (kind == "membership.removed" and event.get("user_id") == self.user_id):
+            # Deliver the removal itself, then stop following the project
+            self.project_ids.discard(project_id)
+        return True
+
+    def _offer(self, event: Event) -> None:
+        # Runs on the subscriber's loop, so visibility bookkeeping needs no locking
+        if self.dropped or not self._visible(event):
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(OVERFLOW_EVENT)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, `None` on timeout. After an overflow event the subscription is finished."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    @property
+    def finished(self) -> bool:
+        return self.dropped and self._queue.empty()
+
+
+class Broadcaster:
+    def __init__(self, backend: BroadcastBackend) -> None:
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.backend = backend
+        self.backend.attach(self._dispatch)
+
+    def publish(self, event: Event) -> None:
+        try:
+            self.backend.publish(event)
+        except Exception:  # the feed is best-effort, never fail the mutation that produced the event
+            logger.exception("Failed to publish change event %s", event.get("type"))
+
+    def subscribe(self, user_id: int, project_ids: Iterable[int], maxsize: Optional[int] = None) -> Subscription:
+        subscription = Subscription(user_id, project_ids, maxsize or settings.CHANGE_FEED_BUFFER_SIZE)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _dispatch(self, event: Event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+
+def _load_backend(path: str) -> BroadcastBackend:
+    module_name, _, attr = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+broadcaster = Broadcaster(_load_backend(settings.CHANGE_FEED_BACKEND))
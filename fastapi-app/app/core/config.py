@@ -1,9 +1,14 @@
+import pathlib
 from functools import lru_cache
 from typing import Optional
 
 from pydantic_settings import BaseSettings
 
 
+# fastapi-app/app/core/config.py -> repository root
+_REPO_ROOT = pathlib.Path(__file__).resolve().parents[3]
+
+
 class Settings(BaseSettings):
     ENV: str = "development"
     DEBUG: bool = True
@@ -17,6 +22,104 @@ class Settings(BaseSettings):
 
     # Database
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./app.db"
+    # Read replicas for GET routes, e.g. '["sqlite:///./replica.db"]'. Empty means reads use the primary.
+    SQLALCHEMY_REPLICA_URIS: list[str] = []
+    # After a user commits, their reads stay on the primary for this many seconds (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # PostgreSQL text search configuration for project search ("simple" does no language-specific stemming)
+    SEARCH_TEXT_CONFIG: str = "simple"
+
+    # /readyz reuses its database check for this long, so frequent probes do not each hit the database
+    READINESS_CACHE_SECONDS: float = 2.0
+    READINESS_DB_TIMEOUT_SECONDS: float = 2.0
+
+    # Projects with more members than this are deleted by a background purge instead of in the request
+    PROJECT_DELETE_INLINE_MEMBERS: int = 1000
+    # Memberships deleted per transaction by the purge
+    PROJECT_PURGE_CHUNK_SIZE: int = 1000
+
+    # Change feed (SSE / WebSocket)
+    CHANGE_FEED_BACKEND: str = "app.core.broadcast.MemoryBackend"
+    # Events buffered per client before it is dropped as a slow consumer
+    CHANGE_FEED_BUFFER_SIZE: int = 100
+    CHANGE_FEED_KEEPALIVE_SECONDS: float = 15.0
+
+    # Idempotency-Key replay store (per worker)
+    IDEMPOTENCY_TTL_SECONDS: float = 60 * 60 * 24
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000
+
+    # Admission control (per worker): concurrent requests per route class; the rest queue, then get 503
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMITS: dict[str, int] = {"auth": 4, "read": 24, "write": 12}
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: float = 1.0
+    # AIMD: shrink a class limit when service time exceeds the target, grow it back while it is met
+    ADMISSION_ADAPTIVE: bool = False
+    ADMISSION_LATENCY_TARGET_SECONDS: float = 0.5
+    ADMISSION_BACKOFF_RATIO: float = 0.9
+    ADMISSION_MIN_LIMIT: int = 1
+
+    # Slow-query log (per worker): statements over the threshold are logged, aggregated and EXPLAINed
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_PER_MINUTE: int = 10
+    # A fingerprint's plan is captured again after this long
+    SLOW_QUERY_EXPLAIN_TTL_SECONDS: float = 60 * 60
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+    SLOW_QUERY_TOP_N: int = 20
+
+    # Tracing: a span per request, crud call, SQL statement and password hash, for sampled requests
+    TRACING_ENABLED: bool = False
+    # Share of requests traced when the caller sent no traceparent header
+    TRACING_SAMPLE_RATE: float = 0.01
+    # "file" (OTLP/JSON lines in TRACING_FILE_PATH) or "otlp" (POST to an OTLP/HTTP collector)
+    TRACING_EXPORTER: str = "file"
+    TRACING_FILE_PATH: str = "traces.ndjson"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACING_EXPORT_TIMEOUT_SECONDS: float = 2.0
+    # Finished traces waiting for export; more are dropped
+    TRACING_QUEUE_SIZE: int = 1000
+    TRACING_SERVICE_NAME: str = "fastapi-app"
+
+    # Audit log: buffered in memory (per worker) and written in batches by a background task
+    AUDIT_BUFFER_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Events that could not be written at shutdown; written to the database at the next start
+    AUDIT_SPILL_PATH: str = "audit-spill.jsonl"
+
+    # Background jobs
+    JOBS_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 4
+    # Process pool for CPU-bound handlers, created on first use
+    JOBS_PROCESS_WORKERS: int = 2
+    JOBS_POLL_INTERVAL: float = 1.0
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_BACKOFF_SECONDS: float = 2.0
+    # A running job whose lease expires (worker died) is picked up again
+    JOBS_LEASE_SECONDS: float = 300.0
+    JOBS_SHUTDOWN_GRACE_SECONDS: float = 10.0
+
+    # Bulk user import: rows per IN query / INSERT / commit, and password hashing processes
+    USER_IMPORT_CHUNK_SIZE: int = 1000
+    USER_IMPORT_HASH_WORKERS: int = 4
+
+    # Snapshot export/restore: rows per compressed frame (also the yield_per batch and the restore commit)
+    SNAPSHOT_CHUNK_ROWS: int = 5000
+
+    # Rows per transaction when the counters.reconcile job recounts membership counters
+    COUNTERS_RECONCILE_BATCH_SIZE: int = 1000
+
+    # Plan rendering (reuses docs/plan/render.py from the repository)
+    PLAN_RENDERER_PATH: str = str(_REPO_ROOT / "docs" / "plan" / "render.py")
+    PLAN_TEMPLATE_PATH: str = str(_REPO_ROOT / "docs" / "plan" / "plan.md.j2")
+    # PDF worker processes, and how many PDF renders may wait for them before new ones get 503
+    PLAN_RENDER_WORKERS: int = 2
+    PLAN_RENDER_MAX_PENDING: int = 8
+    PLAN_RENDER_CACHE_ENTRIES: int = 128
+    PLAN_MAX_PAYLOAD_BYTES: int = 1024 * 1024
+    # YAML nodes a plan may have once anchors are expanded (each alias counts its whole anchored subtree)
+    PLAN_MAX_YAML_NODES: int = 100_000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,92 @@
+"""
+Liveness and readiness.
+
+`/healthz` does no I/O: it only shows that the process is serving requests. `/readyz` stays not-ready until
+the lifespan has warmed the worker (`warm_up`) and afterwards reports whether the databases answer. The
+database result is reused for READINESS_CACHE_SECONDS, so frequent probes cost at most one query per
+interval per worker.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+from app.db import session
+
+
+logger = logging.getLogger("fastapi")
+
+
+def _engines():
+    return (session.engine, *session.replica_engines)
+
+
+def warm_up() -> None:
+    """Fill the connection pools and load the password hasher, so the first requests do not pay for them."""
+    for engine in _engines():
+        size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+        connections = []
+        try:
+            # Hold them all at once, otherwise the pool would hand back the same connection each time
+            for _ in range(size):
+                connection = engine.connect()
+                connections.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+    # The first bcrypt call loads the backend and runs passlib's self-test
+    verify_password("warm-up", get_password_hash("warm-up"))
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self.warmed = False
+        self._checked_at = float("-inf")
+        self._database_error: Optional[str] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _ping(self) -> None:
+        for engine in _engines():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+    def _fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < settings.READINESS_CACHE_SECONDS
+
+    async def database_error(self) -> Optional[str]:
+        if self._fresh():
+            return self._database_error
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Concurrent probes wait for the check already running instead of starting their own
+            if self._fresh():
+                return self._database_error
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self._ping), settings.READINESS_DB_TIMEOUT_SECONDS)
+                error = None
+            except asyncio.TimeoutError:
+                error = "timed out"
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            if error is not None and error != self._database_error:
+                logger.warning("Readiness database check failed: %s", error)
+            self._database_error = error
+            self._checked_at = time.monotonic()
+        return self._database_error
+
+    async def status(self) -> tuple[bool, dict[str, Any]]:
+        if not self.warmed:
+            return False, {"warmup": "pending"}
+        error = await self.database_error()
+        return error is None, {"warmup": "ok", "database": error or "ok"}
+
+
+readiness = Readiness()
@@ -0,0 +1,171 @@
+"""
+`Idempotency-Key` support for write requests.
+
+A client that retries a POST/PUT/PATCH/DELETE with the same `Idempotency-Key` gets the response of the
+first execution replayed instead of running the handler (and its inserts/commits) again. Retries that
+arrive while the first execution is still running wait for it and share its response.
+
+Keys are scoped to the caller's `Authorization` header and bound to a fingerprint of method, path, query
+and body; reusing a key for a different request is rejected with 422. 5xx responses are not stored so
+the client can retry them. The store lives in process memory, per worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "expires_at", "done", "status", "headers", "body")
+
+    def __init__(self, fingerprint: bytes, expires_at: float) -> None:
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.done = asyncio.Event()
+        self.status = 0
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.body = b""
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Insertion order == expiry order, since every entry gets the same TTL
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            expired = entry.expires_at <= now
+            if not (expired or len(self._entries) > self.max_entries) or not entry.done.is_set():
+                break
+            del self._entries[key]
+
+    def begin(self, key: bytes, fingerprint: bytes) -> tuple[str, Optional[_Entry]]:
+        """Returns ("new", entry) when the caller should execute, else "pending", "done" or "mismatch"."""
+        now = time.monotonic()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now and entry.done.is_set():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            entry = _Entry(fingerprint, now + self.ttl_seconds)
+            self._entries[key] = entry
+            return "new", entry
+        if entry.fingerprint != fingerprint:
+            return "mismatch", None
+        return ("done" if entry.done.is_set() else "pending"), entry
+
+    def complete(self, key: bytes, status: int, headers: list[tuple[bytes, bytes]], body: bytes) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.status, entry.headers, entry.body = status, headers, body
+        entry.done.set()
+
+    def abandon(self, key: bytes) -> None:
+        # Forget a failed execution; waiters wake up and one of them runs the request again
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store: Optional[IdempotencyStore] = None) -> None:
+        self.app = app
+        self.store = store or IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_ENTRIES)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = _header(scope, b"idempotency-key")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        key = hashlib.sha256((_header(scope, b"authorization") or b"") + b"\0" + idempotency_key).digest()
+        fingerprint = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body])
+        ).digest()
+
+        while True:
+            state, entry = self.store.begin(key, fingerprint)
+            if state == "mismatch":
+                await self._send(send, 422, [(b"content-type", b"application/json")], json.dumps(
+                    {"detail": "Idempotency-Key was already used for a different request"}
+                ).encode())
+                return
+            if state == "done":
+                await self._send(send, entry.status, entry.headers + [(b"idempotent-replayed", b"true")], entry.body)
+                return
+            if state == "pending":
+                await entry.done.wait()
+                continue
+            break
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+
+        async def capture_send(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            self.store.abandon(key)
+            raise
+        if status >= 500:
+            self.store.abandon(key)
+        else:
+            self.store.complete(key, status, headers, b"".join(chunks))
+
+    @staticmethod
+    async def _send(send, status: int, headers: list[tuple[bytes, bytes]], body: bytes) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,31 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row of a page, as URL-safe base64 JSON. List endpoints return the
+cursor for the next page in the `X-Next-Cursor` header and accept it back as `?cursor=`.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Raises ValueError for anything that is not a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
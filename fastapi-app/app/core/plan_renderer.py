@@ -0,0 +1,253 @@
+"""
+On-demand plan rendering for the API, reusing the offline renderer in docs/plan/render.py.
+
+- Markdown and HTML are rendered in the threadpool, each thread with its own warm RenderContext
+  (Python-Markdown converters are not thread-safe).
+- PDFs are rendered in a bounded process pool; each worker keeps one WeasyPrint FontConfiguration for
+  every job it runs. When PLAN_RENDER_MAX_PENDING PDFs are already queued, new ones are refused, so a
+  burst of slow PDFs cannot tie up the API.
+- Results are cached by a hash of (format, title, templates, YAML payload), and identical renders that
+  are already running are shared. The templates' fingerprint is computed once, in the threadpool.
+- YAML anchors and aliases are allowed, but a payload whose expanded size exceeds PLAN_MAX_YAML_NODES is
+  refused before anything is built from it (alias bombs).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib.util
+import os
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from types import ModuleType
+from typing import Any, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.processes import process_pool
+
+
+MEDIA_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+
+class PlanRenderError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@functools.lru_cache()
+def load_render_module(path: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("plan_render", path)
+    if spec is None or spec.loader is None:
+        raise PlanRenderError(501, "Plan renderer is not available")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# PDF worker process state
+_worker_context: Any = None
+
+
+def _init_pdf_worker(renderer_path: str, template_path: str) -> None:
+    global _worker_context
+    render = load_render_module(renderer_path)
+    _worker_context = render.RenderContext(pathlib.Path(template_path))
+    try:
+        _worker_context.font_config  # set up fonts once, before the first job
+    except SystemExit:
+        pass  # weasyprint missing; reported per job
+
+
+def _render_pdf(renderer_path: str, html_text: str, base_url: str) -> bytes:
+    render = load_render_module(renderer_path)
+    fd, tmp_name = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        render.write_pdf_from_html(
+            html_text, pathlib.Path(tmp_name), base_url=base_url, font_config=_worker_context.font_config
+        )
+        return pathlib.Path(tmp_name).read_bytes()
+    except SystemExit as exc:
+        # render.py reports missing dependencies with SystemExit, which must not cross the pool boundary
+        raise RuntimeError(str(exc)) from None
+    finally:
+        os.unlink(tmp_name)
+
+
+def _children(node: Any) -> list:
+    if node.id == "mapping":
+        return [part for pair in node.value for part in pair]
+    return node.value if node.id == "sequence" else []
+
+
+def _expanded_size(root: Any, limit: int) -> int:
+    """Nodes in the YAML graph counting every alias as a copy of its anchor, as the template walks it."""
+    sizes: dict[int, int] = {}
+    in_progress: set[int] = set()
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        children = _children(node)
+        if children_done:
+            in_progress.discard(id(node))
+            sizes[id(node)] = 1 + sum(sizes[id(child)] for child in children)
+            if sizes[id(node)] > limit:
+                raise PlanRenderError(422, f"Plan YAML is too large once aliases are expanded (over {limit} nodes)")
+            continue
+        if id(node) in sizes:
+            continue
+        if id(node) in in_progress:
+            raise PlanRenderError(422, "Plan YAML must not contain recursive aliases")
+        in_progress.add(id(node))
+        stack.append((node, True))
+        stack.extend((child, False) for child in children if id(child) not in sizes)
+    return sizes[id(root)]
+
+
+def load_plan_yaml(yaml_bytes: bytes) -> Any:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)(yaml_bytes)
+    try:
+        # Composed first: the node graph shares anchored nodes, so checking it costs no more than the payload
+        node = loader.get_single_node()
+        if node is None:
+            return None
+        _expanded_size(node, settings.PLAN_MAX_YAML_NODES)
+        return loader.construct_document(node)
+    except yaml.YAMLError as exc:
+        raise PlanRenderError(422, f"Invalid YAML: {exc}") from None
+    finally:
+        loader.dispose()
+
+
+class PlanRenderer:
+    def __init__(self) -> None:
+        self.renderer_path = settings.PLAN_RENDERER_PATH
+        self.template_path = pathlib.Path(settings.PLAN_TEMPLATE_PATH)
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._local = threading.local()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending_pdfs = 0
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def render(self) -> ModuleType:
+        try:
+            return load_render_module(self.renderer_path)
+        except (FileNotFoundError, ImportError) as exc:
+            raise PlanRenderError(501, f"Plan renderer is not available: {exc}") from None
+
+    def _context(self):
+        # One RenderContext per threadpool thread
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = self.render.RenderContext(self.template_path)
+        return context
+
+    def template_fingerprint(self) -> str:
+        # The templates ship with the app, so they are read once per process
+        if self._fingerprint is None:
+            self._fingerprint = self.render.template_fingerprint(self.template_path)
+        return self._fingerprint
+
+    def cache_key(self, yaml_bytes: bytes, fmt: str, title: Optional[str]) -> str:
+        return self.render.content_hash(fmt, title or "", self.template_fingerprint(), yaml_bytes)
+
+    def _render_text(self, yaml_bytes: bytes, fmt: str, title: Optional[str]) -> str:
+        data = load_plan_yaml(yaml_bytes)
+        if not isinstance(data, dict):
+            raise PlanRenderError(422, "Plan YAML must be a mapping")
+        context = self._context()
+        try:
+            markdown_text = self.render.render_markdown_from_template(self.template_path, data, env=context.env)
+            if fmt == "md":
+                return markdown_text
+            meta = data.get("meta") or {}
+            page_title = title or (meta.get("title") if isinstance(meta, dict) else None) or "Business Plan"
+            return self.render.convert_markdown_to_html(markdown_text, page_title, converter=context.converter)
+        except SystemExit as exc:
+            raise PlanRenderError(501, str(exc)) from None
+        except Exception as exc:  # template errors caused by the payload's shape
+            raise PlanRenderError(422, f"Plan could not be rendered: {type(exc).__name__}: {exc}") from None
+
+    async def _render_pdf(self, html_text: str) -> bytes:
+        if self._pending_pdfs >= settings.PLAN_RENDER_MAX_PENDING:
+            raise PlanRenderError(503, "Too many plan renders in progress, retry later")
+        if self._pool is None:
+            self._pool = process_pool(
+                settings.PLAN_RENDER_WORKERS,
+                initializer=_init_pdf_worker,
+                initargs=(self.renderer_path, str(self.template_path)),
+            )
+        self._pending_pdfs += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool, _render_pdf, self.renderer_path, html_text, str(self.template_path.parent)
+            )
+        except RuntimeError as exc:
+            raise PlanRenderError(501, str(exc)) from None
+        finally:
+            self._pending_pdfs -= 1
+
+    async def _produce(self, yaml_bytes: bytes, fmt: str, title: Optional[str]) -> bytes:
+        text = await run_in_threadpool(self._render_text, yaml_bytes, "md" if fmt == "md" else "html", title)
+        if fmt == "pdf":
+            return await self._render_pdf(text)
+        return text.encode("utf-8")
+
+    async def render_plan(self, yaml_bytes: bytes, fmt: str, title: Optional[str] = None) -> bytes:
+        if self._fingerprint is None:
+            # Loads the renderer and reads every template: not on the event loop
+            await run_in_threadpool(self.template_fingerprint)
+        key = self.cache_key(yaml_bytes, fmt, title)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._produce(yaml_bytes, fmt, title)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(result)
+
+        self._cache[key] = result
+        while len(self._cache) > settings.PLAN_RENDER_CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+        return result
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+plan_renderer = PlanRenderer()
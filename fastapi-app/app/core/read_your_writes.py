@@ -0,0 +1,64 @@
+"""
+Read-your-writes across workers.
+
+Reads go to replicas unless the client committed a write in the last READ_YOUR_WRITES_SECONDS. The time of
+that write travels with the client, in the `last_write` cookie set on the response of the request that
+committed, so whichever worker (or host) serves its next request reads from the primary.
+
+The cookie only routes the client's own reads: a forged or replayed one can at most send them to the primary.
+"""
+
+import contextvars
+import math
+import time
+from typing import Optional
+
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+
+
+LAST_WRITE_COOKIE = "last_write"
+
+# Commit times of the current request; a list, so commits in threadpool copies of the context are seen here
+_request_writes: contextvars.ContextVar[Optional[list[float]]] = contextvars.ContextVar("request_writes", default=None)
+
+
+def note_write() -> None:
+    """Record that the current request committed on the primary (a no-op outside a request)."""
+    writes = _request_writes.get()
+    if writes is not None:
+        writes.append(time.time())
+
+
+def last_write(connection: HTTPConnection) -> Optional[float]:
+    try:
+        return float(connection.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        writes: list[float] = []
+
+        async def send_with_cookie(message) -> None:
+            if message["type"] == "http.response.start" and writes:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={writes[-1]:.3f}; Max-Age={math.ceil(settings.READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        token = _request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_writes.reset(token)
@@ -5,6 +5,7 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.tracing import traced
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -19,10 +20,12 @@ def create_access_token(subject: str | int, expires_delta_minutes: Optional[int]
     return encoded_jwt
 
 
+@traced()
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+@traced()
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
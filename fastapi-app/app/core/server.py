@@ -0,0 +1,33 @@
+"""
+Production server pieces, used by gunicorn.conf.py.
+
+`Worker` is the Uvicorn worker with uvloop and httptools required rather than auto-detected, so a missing
+accelerator fails the boot instead of silently falling back to asyncio and h11.
+"""
+
+import os
+import pathlib
+from typing import Optional
+
+from uvicorn_worker import UvicornWorker
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
+def available_cpus(cpu_max_path: Optional[pathlib.Path] = None) -> int:
+    """CPUs this process may use: the affinity mask, capped by a cgroup v2 CPU quota (container limits)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        cpus = os.cpu_count() or 1
+    path = cpu_max_path or pathlib.Path("/sys/fs/cgroup/cpu.max")
+    try:
+        quota, period = path.read_text().split()[:2]
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    # e.g. "150000 100000" (docker --cpus=1.5) -> 2 workers
+    return max(1, min(cpus, -(-int(quota) // int(period))))
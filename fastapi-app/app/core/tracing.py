@@ -0,0 +1,326 @@
+"""
+Request tracing.
+
+With TRACING_ENABLED, `TracingMiddleware` opens a root span per HTTP request and the code it calls adds
+child spans: every crud function (`@traced`), password hashing and verification, and every SQL statement
+(engine hooks installed in app/db/session.py, statement text normalized so no literals are recorded).
+
+The current span lives in a ContextVar, which asyncio tasks, `run_in_threadpool` and `asyncio.to_thread`
+copy into the code they run, so spans started in sync routes and dependencies have the request as parent.
+Use `propagate(fn)` when handing work to a plain thread.
+
+Sampling is decided once per request (head sampling): an incoming W3C `traceparent` header is followed,
+otherwise TRACING_SAMPLE_RATE applies. Unsampled requests and disabled tracing create no spans; each
+instrumented call then costs one ContextVar lookup.
+
+Finished traces are exported in OTLP/JSON by a background thread, either appended to TRACING_FILE_PATH
+(one `resourceSpans` document per line, the format of the collector's otlpjsonfile receiver) or POSTed
+to `TRACING_OTLP_ENDPOINT/v1/traces`. Traces are dropped, and counted, when the export queue is full.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("fastapi")
+
+T = TypeVar("T")
+
+# OTLP span kinds and status codes
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+TRACE_ID_HEADER = "X-Trace-Id"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str], kind: int = KIND_INTERNAL) -> None:
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        self.end(exc)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL) -> Optional[Span]:
+    """A child of the current span, or None outside a sampled trace. Not made current: use `with`."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind)
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Run the function in a child span of the current one (named `module.function` by default)."""
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            parent = _current.get()
+            if parent is None:
+                return fn(*args, **kwargs)
+            with Span(parent.trace, span_name, parent.span_id):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """Bind fn to the caller's context (and so its current span), for running it on another thread."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def _root_span(name: str, traceparent: Optional[str]) -> Optional[Span]:
+    match = _TRACEPARENT.match(traceparent or "")
+    if match is not None:
+        trace_id, parent_id, flags = match.groups()
+        # Parent-based: the caller already made the sampling decision for the whole trace
+        if not int(flags, 16) & 1:
+            return None
+        return Span(_Trace(trace_id), name, parent_id, KIND_SERVER)
+    if random.random() >= settings.TRACING_SAMPLE_RATE:
+        return None
+    return Span(_Trace(f"{random.getrandbits(128):032x}"), name, None, KIND_SERVER)
+
+
+def route_template(scope) -> Optional[str]:
+    """The matched route's path template, with the prefixes of included routers (/api/projects/{project_id})."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return None
+    params = scope.get("path_params", {})
+    concrete = _PATH_PARAM.sub(lambda match: str(params.get(match.group(1), match.group(0))), template)
+    # Routers included with a prefix may report their path relative to it
+    if scope["path"].endswith(concrete):
+        return scope["path"][: len(scope["path"]) - len(concrete)] + template
+    return template
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def to_otlp(spans: list[Span]) -> dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", settings.TRACING_SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": span.kind,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+                        "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+class Exporter:
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.TRACING_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, spans: list[Span]) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            # Started lazily, and again in a forked worker (threads do not survive fork)
+            self._worker = threading.Thread(target=self._export_forever, name="trace-export", daemon=True)
+            self._worker.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _export_forever(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self.export(json.dumps(to_otlp(spans), separators=(",", ":")))
+                self.exported += 1
+            except Exception:
+                self.failed += 1
+                logger.warning("Could not export trace %s", spans[0].trace_id, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def export(document: str) -> None:
+        if settings.TRACING_EXPORTER == "otlp":
+            request = urllib.request.Request(
+                settings.TRACING_OTLP_ENDPOINT.rstrip("/") + "/v1/traces",
+                data=document.encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=settings.TRACING_EXPORT_TIMEOUT_SECONDS):
+                pass
+        else:
+            with open(settings.TRACING_FILE_PATH, "a", encoding="utf-8") as out:
+                out.write(document + "\n")
+
+    def flush(self) -> None:
+        """Wait for the queued traces to be exported."""
+        self._queue.join()
+
+    def stats(self) -> dict[str, int]:
+        return {"exported": self.exported, "dropped": self.dropped, "failed": self.failed, "queued": self._queue.qsize()}
+
+
+exporter = Exporter()
+
+
+def install(engine) -> None:
+    """Trace every statement run through the engine (a no-op outside a sampled trace)."""
+    from sqlalchemy import event
+
+    from app.db.slow_queries import normalize
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = start_span("db.query", KIND_CLIENT)
+        conn.info.setdefault("trace_spans", []).append(span)
+        if span is not None:
+            span.set("db.system", conn.engine.dialect.name)
+            span.set("db.statement", normalize(statement))
+            if executemany:
+                span.set("db.executemany", len(parameters))
+
+    def after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set("db.rows", cursor.rowcount)
+            span.end()
+
+    def on_error(context) -> None:
+        # after_cursor_execute does not fire for a failed statement
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if spans and context.execution_context is not None:
+            span = spans.pop()
+            if span is not None:
+                span.end(context.original_exception)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    event.listen(engine, "after_cursor_execute", after_execute)
+    event.listen(engine, "handle_error", on_error)
+
+
+class TracingMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        traceparent = headers.get(b"traceparent")
+        span = _root_span(f"{scope['method']} {scope['path']}", traceparent.decode("latin-1") if traceparent else None)
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+        span.set("http.method", scope["method"])
+        span.set("http.target", scope["path"])
+
+        async def send_traced(message) -> None:
+            if message["type"] == "http.response.start":
+                span.set("http.status_code", message["status"])
+                message["headers"] = [*message.get("headers", []), (TRACE_ID_HEADER.lower().encode(), span.trace_id.encode())]
+            await send(message)
+
+        error = None
+        token = _current.set(span)
+        try:
+            await self.app(scope, receive, send_traced)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            if route is not None:
+                # The route template groups /projects/1 and /projects/2 under one name
+                span.name = f"{scope['method']} {route}"
+                span.set("http.route", route)
+            if error is None and span.attributes.get("http.status_code", 500) >= 500:
+                span.error = f"HTTP {span.attributes.get('http.status_code', 500)}"
+            span.end(error)
+            exporter.submit(list(span.trace.spans))
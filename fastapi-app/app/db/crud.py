@@ -1,20 +1,30 @@
-from typing import Iterable, Optional
+import time
+from typing import Iterable, Optional, Sequence
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.audit import audit_log
+from app.core.broadcast import broadcaster
+from app.core.config import settings
+from app.core.tracing import traced
 from app.core.security import get_password_hash, verify_password
-from app.db import models
+from app.db import models, search
+from app.jobs.queue import enqueue
 
 
 # Users
+@traced()
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
+@traced()
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.email == email).first()
 
 
+@traced()
 def create_user(db: Session, email: str, password: str, is_superuser: bool = False) -> models.User:
     user = models.User(email=email, hashed_password=get_password_hash(password), is_superuser=is_superuser)
     db.add(user)
@@ -23,6 +33,7 @@ def create_user(db: Session, email: str, password: str, is_superuser: bool = Fal
     return user
 
 
+@traced()
 def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
     user = get_user_by_email(db, email=email)
     if not user:
@@ -33,37 +44,120 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[models
 
 
 # Projects
-def get_projects(db: Session, current_user_id: int, skip: int = 0, limit: int = 100) -> list[models.Project]:
-    return (
-        db.query(models.Project)
+def _membership(
+    db: Session, user_id: int, project_id: int, roles: Optional[Iterable[str]] = None
+) -> Optional[models.ProjectMembership]:
+    # Joined to projects so memberships of a deleted project (awaiting purge) grant nothing
+    query = (
+        db.query(models.ProjectMembership)
+        .join(models.ProjectMembership.project)
+        .filter(
+            models.ProjectMembership.user_id == user_id,
+            models.ProjectMembership.project_id == project_id,
+            models.Project.deleted_at.is_(None),
+        )
+    )
+    if roles is not None:
+        query = query.filter(models.ProjectMembership.role.in_(list(roles)))
+    return query.first()
+
+
+def _count_membership(db: Session, project_id: int, user_id: int, role: str, delta: int) -> None:
+    # Counters move in the membership's transaction as `n = n + delta`, so concurrent writers never lose updates
+    project, role_count = models.Project, _role_count(role)
+    db.query(project).filter(project.id == project_id).update(
+        {project.member_count: project.member_count + delta, role_count: role_count + delta}, synchronize_session=False
+    )
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.project_count: models.User.project_count + delta}, synchronize_session=False
+    )
+
+
+def _count_role_change(db: Session, project_id: int, old_role: str, new_role: str) -> None:
+    if old_role == new_role:
+        return
+    old_count, new_count = _role_count(old_role), _role_count(new_role)
+    db.query(models.Project).filter(models.Project.id == project_id).update(
+        {old_count: old_count - 1, new_count: new_count + 1}, synchronize_session=False
+    )
+
+
+def _role_count(role: str):
+    return getattr(models.Project, f"{role}_count")
+
+
+def _entity(model, fields: Optional[Sequence[str]]):
+    # The whole entity, or only the named columns (rows instead of objects) for sparse fieldsets
+    if fields is None:
+        return (model,)
+    return tuple(getattr(model, name) for name in fields)
+
+
+@traced()
+def get_projects(
+    db: Session,
+    current_user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
+    after_id: Optional[int] = None,
+) -> list[models.Project]:
+    # Ordered by id, the keyset for cursor pagination (after_id)
+    query = (
+        db.query(*_entity(models.Project, fields))
         .join(models.Project.memberships)
-        .filter(models.ProjectMembership.user_id == current_user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .filter(models.ProjectMembership.user_id == current_user_id, models.Project.deleted_at.is_(None))
     )
+    if after_id is not None:
+        query = query.filter(models.Project.id > after_id)
+    return query.order_by(models.Project.id).offset(skip).limit(limit).all()
 
 
-def get_project(db: Session, current_user_id: int, project_id: int) -> Optional[models.Project]:
+@traced()
+def get_project(
+    db: Session, current_user_id: int, project_id: int, fields: Optional[Sequence[str]] = None
+) -> Optional[models.Project]:
     return (
-        db.query(models.Project)
+        db.query(*_entity(models.Project, fields))
         .join(models.Project.memberships)
-        .filter(models.ProjectMembership.user_id == current_user_id, models.Project.id == project_id)
+        .filter(
+            models.ProjectMembership.user_id == current_user_id,
+            models.Project.id == project_id,
+            models.Project.deleted_at.is_(None),
+        )
         .first()
     )
 
 
+@traced()
+def search_projects(
+    db: Session, current_user_id: int, query: str, *, limit: int = 20, after: Optional[tuple[float, int]] = None
+) -> list[search.SearchHit]:
+    return search.search(db, current_user_id, query, limit=limit, after=after)
+
+
+@traced()
 def create_project(db: Session, current_user_id: int, title: str, description: Optional[str]) -> models.Project:
-    project = models.Project(title=title, description=description)
+    project = models.Project(title=title, description=description, member_count=1, owner_count=1)
     db.add(project)
     # add owner membership
     membership = models.ProjectMembership(user_id=current_user_id, project=project, role="owner")
     db.add(membership)
+    db.flush()
+    db.query(models.User).filter(models.User.id == current_user_id).update(
+        {models.User.project_count: models.User.project_count + 1}, synchronize_session=False
+    )
+    search.index_project(db, project)
     db.commit()
     db.refresh(project)
+    broadcaster.publish({"type": "project.created", "project_id": project.id, "actor_id": current_user_id})
+    audit_log.record(
+        "project.created", actor_id=current_user_id, project_id=project.id, target_user_id=current_user_id, new_role="owner"
+    )
     return project
 
 
+@traced()
 def update_project(
     db: Session,
     current_user_id: int,
@@ -76,14 +170,7 @@ def update_project(
     if project is None:
         return None
     # Require editor or owner role to update project
-    membership = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-        )
-        .first()
-    )
+    membership = _membership(db, user_id=current_user_id, project_id=project_id)
     if membership is None or membership.role not in ("owner", "editor"):
         return None
     if title is not None:
@@ -91,47 +178,49 @@ def update_project(
     if description is not None:
         project.description = description
     db.add(project)
+    db.flush()
+    search.index_project(db, project)
     db.commit()
     db.refresh(project)
+    broadcaster.publish({"type": "project.updated", "project_id": project_id, "actor_id": current_user_id})
+    audit_log.record("project.updated", actor_id=current_user_id, project_id=project_id)
     return project
 
 
+@traced()
 def delete_project(db: Session, current_user_id: int, project_id: int) -> bool:
     # Require owner role to delete the project
-    owner_membership = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-            models.ProjectMembership.role == "owner",
-        )
-        .first()
-    )
+    owner_membership = _membership(db, user_id=current_user_id, project_id=project_id, roles=("owner",))
     if owner_membership is None:
         return False
-    project = (
-        db.query(models.Project)
-        .filter(models.Project.id == project_id)
-        .first()
-    )
-    if project is None:
+    # Set-based deletes: nothing is loaded into the session, memberships go through ON DELETE CASCADE
+    project_query = db.query(models.Project).filter(models.Project.id == project_id)
+    # The stored counter, not a COUNT(*) over a membership list that may be huge
+    member_count = db.scalar(select(models.Project.member_count).where(models.Project.id == project_id)) or 0
+    if member_count <= settings.PROJECT_DELETE_INLINE_MEMBERS:
+        member_ids = select(models.ProjectMembership.user_id).where(models.ProjectMembership.project_id == project_id)
+        db.query(models.User).filter(models.User.id.in_(member_ids)).update(
+            {models.User.project_count: models.User.project_count - 1}, synchronize_session=False
+        )
+        deleted = project_query.delete(synchronize_session=False)
+    else:
+        # Too many rows for one request: hide the project now, purge it (and fix the members' project
+        # counts) in chunks in the background
+        deleted = project_query.update({models.Project.deleted_at: time.time()}, synchronize_session=False)
+        enqueue(db, "projects.purge_memberships", {"project_id": project_id})
+    if not deleted:
         return False
-    db.delete(project)
+    search.remove_project(db, project_id)
     db.commit()
+    broadcaster.publish({"type": "project.deleted", "project_id": project_id, "actor_id": current_user_id})
+    audit_log.record("project.deleted", actor_id=current_user_id, project_id=project_id)
     return True
 
 
+@traced()
 def add_user_to_project(db: Session, current_user_id: int, project_id: int, user_id: int) -> Optional[models.Project]:
     # Only allow if current_user_id is a member with owner role
-    membership = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-            models.ProjectMembership.role.in_(["owner"]),
-        )
-        .first()
-    )
+    membership = _membership(db, user_id=current_user_id, project_id=project_id, roles=("owner",))
     if membership is None:
         return None
     existing = (
@@ -141,21 +230,21 @@ def add_user_to_project(db: Session, current_user_id: int, project_id: int, user
     )
     if existing is None:
         db.add(models.ProjectMembership(user_id=user_id, project_id=project_id, role="viewer"))
+        _count_membership(db, project_id, user_id, "viewer", 1)
         db.commit()
+        broadcaster.publish(
+            {"type": "membership.added", "project_id": project_id, "actor_id": current_user_id, "user_id": user_id, "role": "viewer"}
+        )
+        audit_log.record(
+            "membership.added", actor_id=current_user_id, project_id=project_id, target_user_id=user_id, new_role="viewer"
+        )
     return get_project(db, current_user_id=current_user_id, project_id=project_id)
 
 
+@traced()
 def update_user_role(db: Session, current_user_id: int, project_id: int, user_id: int, role: str) -> Optional[models.ProjectMembership]:
     # Only owners can update roles
-    owner_membership = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-            models.ProjectMembership.role == "owner",
-        )
-        .first()
-    )
+    owner_membership = _membership(db, user_id=current_user_id, project_id=project_id, roles=("owner",))
     if owner_membership is None:
         return None
     membership = (
@@ -165,24 +254,30 @@ def update_user_role(db: Session, current_user_id: int, project_id: int, user_id
     )
     if membership is None:
         return None
+    old_role = membership.role
     membership.role = role
     db.add(membership)
+    _count_role_change(db, project_id, old_role, role)
     db.commit()
     db.refresh(membership)
+    broadcaster.publish(
+        {"type": "membership.updated", "project_id": project_id, "actor_id": current_user_id, "user_id": user_id, "role": role}
+    )
+    audit_log.record(
+        "membership.updated",
+        actor_id=current_user_id,
+        project_id=project_id,
+        target_user_id=user_id,
+        old_role=old_role,
+        new_role=role,
+    )
     return membership
 
 
+@traced()
 def remove_user_from_project(db: Session, current_user_id: int, project_id: int, user_id: int) -> bool:
     # Only owners can remove users
-    owner_membership = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-            models.ProjectMembership.role == "owner",
-        )
-        .first()
-    )
+    owner_membership = _membership(db, user_id=current_user_id, project_id=project_id, roles=("owner",))
     if owner_membership is None:
         return False
     membership = (
@@ -195,28 +290,86 @@ def remove_user_from_project(db: Session, current_user_id: int, project_id: int,
     )
     if membership is None:
         return False
+    old_role = membership.role
     db.delete(membership)
+    _count_membership(db, project_id, user_id, old_role, -1)
     db.commit()
+    broadcaster.publish({"type": "membership.removed", "project_id": project_id, "actor_id": current_user_id, "user_id": user_id})
+    audit_log.record(
+        "membership.removed", actor_id=current_user_id, project_id=project_id, target_user_id=user_id, old_role=old_role
+    )
     return True
 
 
-def list_memberships(db: Session, current_user_id: int, project_id: int) -> list[models.ProjectMembership]:
-    # Any member can list memberships for the project
-    is_member = (
-        db.query(models.ProjectMembership)
-        .filter(
-            models.ProjectMembership.user_id == current_user_id,
-            models.ProjectMembership.project_id == project_id,
-        )
-        .first()
+@traced()
+def get_project_ids(db: Session, user_id: int) -> list[int]:
+    rows = (
+        db.query(models.ProjectMembership.project_id)
+        .join(models.ProjectMembership.project)
+        .filter(models.ProjectMembership.user_id == user_id, models.Project.deleted_at.is_(None))
+        .all()
     )
+    return [project_id for (project_id,) in rows]
+
+
+@traced()
+def list_memberships(
+    db: Session, current_user_id: int, project_id: int, fields: Optional[Sequence[str]] = None
+) -> list[models.ProjectMembership]:
+    # Any member can list memberships for the project
+    is_member = _membership(db, user_id=current_user_id, project_id=project_id)
     if not is_member:
         return []
     return (
-        db.query(models.ProjectMembership)
+        db.query(*_entity(models.ProjectMembership, fields))
         .filter(models.ProjectMembership.project_id == project_id)
         .all()
     )
 
 
+@traced()
+def get_members_of_projects(db: Session, project_ids: Sequence[int], per_project: int) -> list:
+    """(project_id, user_id, email, role) rows for several projects in one query, at most `per_project` each."""
+    membership = models.ProjectMembership
+    ranked = (
+        select(
+            membership.project_id,
+            membership.user_id,
+            membership.role,
+            func.row_number().over(partition_by=membership.project_id, order_by=membership.user_id).label("position"),
+        )
+        .where(membership.project_id.in_(project_ids))
+        .subquery()
+    )
+    return db.execute(
+        select(ranked.c.project_id, ranked.c.user_id, models.User.email, ranked.c.role)
+        .join(models.User, models.User.id == ranked.c.user_id)
+        .where(ranked.c.position <= per_project)
+        .order_by(ranked.c.project_id, ranked.c.user_id)
+    ).all()
+
 
+# Audit
+@traced()
+def list_audit_events(
+    db: Session,
+    *,
+    project_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    target_user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50,
+) -> list[models.AuditEvent]:
+    query = db.query(models.AuditEvent)
+    if project_id is not None:
+        query = query.filter(models.AuditEvent.project_id == project_id)
+    if actor_id is not None:
+        query = query.filter(models.AuditEvent.actor_id == actor_id)
+    if target_user_id is not None:
+        query = query.filter(models.AuditEvent.target_user_id == target_user_id)
+    if action is not None:
+        query = query.filter(models.AuditEvent.action == action)
+    if before_id is not None:
+        query = query.filter(models.AuditEvent.id < before_id)
+    return query.order_by(models.AuditEvent.id.desc()).limit(limit).all()
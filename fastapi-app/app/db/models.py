@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, Boolean, Column, Float, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -12,8 +12,13 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=False)
+    # Memberships held (including projects awaiting purge); maintained by crud, repaired by counters.reconcile
+    project_count = Column(Integer, default=0, server_default="0", nullable=False)
 
-    project_memberships = relationship("ProjectMembership", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes: deleting a user leaves its memberships to ON DELETE CASCADE instead of loading them
+    project_memberships = relationship(
+        "ProjectMembership", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
     projects = relationship("Project", secondary="project_memberships", back_populates="users", viewonly=True)
 
 
@@ -23,11 +28,42 @@ class Project(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    # Unix timestamp; set while a large project waits for its background purge (hidden from every query)
+    deleted_at = Column(Float, nullable=True)
+    # Membership counters, maintained by crud in the membership's transaction, repaired by counters.reconcile
+    member_count = Column(Integer, default=0, server_default="0", nullable=False)
+    owner_count = Column(Integer, default=0, server_default="0", nullable=False)
+    editor_count = Column(Integer, default=0, server_default="0", nullable=False)
+    viewer_count = Column(Integer, default=0, server_default="0", nullable=False)
 
-    memberships = relationship("ProjectMembership", back_populates="project", cascade="all, delete-orphan")
+    memberships = relationship(
+        "ProjectMembership", back_populates="project", cascade="all, delete-orphan", passive_deletes=True
+    )
     users = relationship("User", secondary="project_memberships", back_populates="projects", viewonly=True)
 
 
+# Full-text index over title/description, kept in sync by crud (see app/db/search.py). These are not ORM
+# tables: an FTS5 virtual table on SQLite, a tsvector column with a GIN index on PostgreSQL. Every
+# statement is idempotent, so search.ensure_schema can run them against an existing database.
+SEARCH_SCHEMA = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+        "title, description, tokenize = 'unicode61 remove_diacritics 2')",
+    ),
+    "postgresql": (
+        "CREATE TABLE IF NOT EXISTS project_search ("
+        "project_id INTEGER PRIMARY KEY REFERENCES projects (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_project_search_document ON project_search USING GIN (document)",
+    ),
+}
+for _dialect, _statements in SEARCH_SCHEMA.items():
+    for _statement in _statements:
+        event.listen(Project.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Project.__table__, "before_drop", DDL("DROP TABLE IF EXISTS projects_fts").execute_if(dialect="sqlite"))
+event.listen(Project.__table__, "before_drop", DDL("DROP TABLE IF EXISTS project_search").execute_if(dialect="postgresql"))
+
+
 class ProjectMembership(Base):
     __tablename__ = "project_memberships"
 
@@ -38,6 +74,57 @@ class ProjectMembership(Base):
 
     user = relationship("User", back_populates="project_memberships")
     project = relationship("Project", back_populates="memberships")
-    
 
 
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    # JSON-encoded keyword arguments for the handler
+    payload = Column(Text, nullable=False, default="{}")
+    # statuses: queued, running, failed (finished jobs are deleted)
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    # Unix timestamps: earliest next run, and lease expiry while running (a crashed worker's job is retried)
+    run_at = Column(Float, nullable=False)
+    locked_until = Column(Float, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True)
+    # Unix timestamp of the mutation (not of the batched write)
+    created_at = Column(Float, nullable=False)
+    # No foreign keys: the trail must outlive the users and projects it mentions
+    actor_id = Column(Integer, nullable=False)
+    # crud event types: project.created/updated/deleted, membership.added/updated/removed
+    action = Column(String(50), nullable=False)
+    project_id = Column(Integer, nullable=True)
+    target_user_id = Column(Integer, nullable=True)
+    old_role = Column(String(50), nullable=True)
+    new_role = Column(String(50), nullable=True)
+
+    # The admin API filters on one column and pages by id, newest first
+    __table_args__ = (
+        Index("ix_audit_events_project_id_id", "project_id", "id"),
+        Index("ix_audit_events_actor_id_id", "actor_id", "id"),
+        Index("ix_audit_events_target_user_id_id", "target_user_id", "id"),
+        Index("ix_audit_events_action_id", "action", "id"),
+    )
+
+
+class SnapshotRestore(Base):
+    __tablename__ = "snapshot_restores"
+
+    # The snapshot's id, from its header frame
+    id = Column(String(36), primary_key=True)
+    # Data frames committed so far; a restore of the same snapshot resumes after them
+    frames_done = Column(Integer, nullable=False, default=0)
+    # Unix timestamp; set once indexes and search are rebuilt
+    finished_at = Column(Float, nullable=True)
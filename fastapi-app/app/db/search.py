@@ -0,0 +1,245 @@
+"""
+Full-text search over project titles and descriptions.
+
+The index is a side table written by crud in the same transaction as the project change (schema in
+app/db/models.py):
+
+- SQLite: FTS5 table `projects_fts` (rowid = project id), ranked with bm25;
+- PostgreSQL: `project_search` holding a weighted tsvector with a GIN index, ranked with ts_rank_cd;
+- other databases: no index, a LIKE scan of the caller's projects (title matches rank above description ones).
+
+`ensure_schema` creates the index tables of a database that predates them (run at startup); `reindex` fills them.
+Every query word is matched as a prefix and all words must match. Results are limited to the caller's
+projects and ordered by (score desc, id), which is also the keyset for pagination.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from sqlalchemy import Float, and_, case, cast, func, literal, or_, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+
+_WORD = re.compile(r"\w+")
+MAX_TERMS = 16
+
+
+@dataclass
+class SearchHit:
+    id: int
+    title: str
+    description: Optional[str]
+    member_count: int
+    owner_count: int
+    editor_count: int
+    viewer_count: int
+    score: float
+
+
+def query_terms(query: str) -> list[str]:
+    # Only word characters reach the engines, so user input can never use (or break) their query syntax
+    return _WORD.findall(query.lower())[:MAX_TERMS]
+
+
+class SqliteSearch:
+    # bm25 column weights: a title match counts ten times a description match
+    TITLE_WEIGHT = 10.0
+
+    def index(self, db: Session, project: models.Project) -> None:
+        self.remove(db, project.id)
+        db.execute(
+            text("INSERT INTO projects_fts (rowid, title, description) VALUES (:id, :title, :description)"),
+            {"id": project.id, "title": project.title, "description": project.description or ""},
+        )
+
+    def remove(self, db: Session, project_id: int) -> None:
+        db.execute(text("DELETE FROM projects_fts WHERE rowid = :id"), {"id": project_id})
+
+    def search(
+        self, db: Session, user_id: int, terms: list[str], limit: int, after: Optional[tuple[float, int]]
+    ) -> list[SearchHit]:
+        after_score, after_id = after if after is not None else (None, None)
+        rows = db.execute(
+            text(
+                """
+                SELECT id, title, description, member_count, owner_count, editor_count, viewer_count, score FROM (
+                    SELECT p.id AS id, p.title AS title, p.description AS description,
+                           p.member_count AS member_count, p.owner_count AS owner_count,
+                           p.editor_count AS editor_count, p.viewer_count AS viewer_count,
+                           -bm25(projects_fts, :title_weight, 1.0) AS score
+                    FROM projects_fts
+                    JOIN projects p ON p.id = projects_fts.rowid
+                    JOIN project_memberships m ON m.project_id = p.id
+                    WHERE projects_fts MATCH :match AND m.user_id = :user_id
+                )
+                WHERE :after_score IS NULL OR score < :after_score OR (score = :after_score AND id > :after_id)
+                ORDER BY score DESC, id
+                LIMIT :limit
+                """
+            ),
+            {
+                "title_weight": self.TITLE_WEIGHT,
+                "match": " ".join(f'"{term}"*' for term in terms),
+                "user_id": user_id,
+                "after_score": after_score,
+                "after_id": after_id,
+                "limit": limit,
+            },
+        )
+        return [SearchHit(*row) for row in rows]
+
+
+class PostgresSearch:
+    _DOCUMENT = (
+        "setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') || "
+        "setweight(to_tsvector(CAST(:config AS regconfig), :description), 'B')"
+    )
+
+    def index(self, db: Session, project: models.Project) -> None:
+        db.execute(
+            text(
+                f"INSERT INTO project_search (project_id, document) VALUES (:id, {self._DOCUMENT}) "
+                "ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            {
+                "id": project.id,
+                "title": project.title,
+                "description": project.description or "",
+                "config": settings.SEARCH_TEXT_CONFIG,
+            },
+        )
+
+    def remove(self, db: Session, project_id: int) -> None:
+        db.execute(text("DELETE FROM project_search WHERE project_id = :id"), {"id": project_id})
+
+    def search(
+        self, db: Session, user_id: int, terms: list[str], limit: int, after: Optional[tuple[float, int]]
+    ) -> list[SearchHit]:
+        after_score, after_id = after if after is not None else (None, None)
+        rows = db.execute(
+            text(
+                """
+                SELECT id, title, description, member_count, owner_count, editor_count, viewer_count, score FROM (
+                    SELECT p.id AS id, p.title AS title, p.description AS description,
+                           p.member_count AS member_count, p.owner_count AS owner_count,
+                           p.editor_count AS editor_count, p.viewer_count AS viewer_count,
+                           CAST(ts_rank_cd(s.document, q.query) AS DOUBLE PRECISION) AS score
+                    FROM project_search s
+                    JOIN projects p ON p.id = s.project_id
+                    JOIN project_memberships m ON m.project_id = p.id
+                    CROSS JOIN to_tsquery(CAST(:config AS regconfig), :match) AS q(query)
+                    WHERE s.document @@ q.query AND m.user_id = :user_id
+                ) ranked
+                WHERE CAST(:after_score AS DOUBLE PRECISION) IS NULL
+                   OR score < :after_score OR (score = :after_score AND id > :after_id)
+                ORDER BY score DESC, id
+                LIMIT :limit
+                """
+            ),
+            {
+                "config": settings.SEARCH_TEXT_CONFIG,
+                "match": " & ".join(f"{term}:*" for term in terms),
+                "user_id": user_id,
+                "after_score": after_score,
+                "after_id": after_id,
+                "limit": limit,
+            },
+        )
+        return [SearchHit(*row) for row in rows]
+
+
+class LikeSearch:
+    """Fallback without an index: scans the caller's projects, so only fit for small databases."""
+
+    TITLE_WEIGHT = 10.0
+
+    def index(self, db: Session, project: models.Project) -> None:
+        pass
+
+    def remove(self, db: Session, project_id: int) -> None:
+        pass
+
+    def search(
+        self, db: Session, user_id: int, terms: list[str], limit: int, after: Optional[tuple[float, int]]
+    ) -> list[SearchHit]:
+        project, membership = models.Project, models.ProjectMembership
+        title = func.lower(project.title)
+        description = func.lower(func.coalesce(project.description, ""))
+        matches, score = [], literal(0.0)
+        for term in terms:
+            # Terms are word characters, of which only "_" is a LIKE wildcard
+            pattern = "%" + term.replace("_", "\\_") + "%"
+            in_title, in_description = title.like(pattern, escape="\\"), description.like(pattern, escape="\\")
+            matches.append(or_(in_title, in_description))
+            score = score + case((in_title, self.TITLE_WEIGHT), else_=0.0) + case((in_description, 1.0), else_=0.0)
+        ranked = (
+            select(
+                project.id, project.title, project.description, project.member_count, project.owner_count,
+                project.editor_count, project.viewer_count, cast(score, Float).label("score"),
+            )
+            .join(membership, membership.project_id == project.id)
+            .where(membership.user_id == user_id, project.deleted_at.is_(None), *matches)
+            .subquery()
+        )
+        query = select(ranked).order_by(ranked.c.score.desc(), ranked.c.id).limit(limit)
+        if after is not None:
+            after_score, after_id = after
+            query = query.where(
+                or_(ranked.c.score < after_score, and_(ranked.c.score == after_score, ranked.c.id > after_id))
+            )
+        return [SearchHit(*row) for row in db.execute(query)]
+
+
+_backends = {"sqlite": SqliteSearch(), "postgresql": PostgresSearch()}
+_fallback = LikeSearch()
+
+
+def backend_for(db: Session):
+    return _backends.get(db.get_bind().dialect.name, _fallback)
+
+
+def ensure_schema(bind: Union[Connection, Engine]) -> None:
+    """Create the index tables if they are missing (a database created before search existed)."""
+    statements = models.SEARCH_SCHEMA.get(bind.dialect.name, ())
+    if not statements:
+        return
+    if isinstance(bind, Engine):
+        with bind.begin() as connection:
+            ensure_schema(connection)
+        return
+    for statement in statements:
+        bind.exec_driver_sql(statement)
+
+
+def index_project(db: Session, project: models.Project) -> None:
+    backend_for(db).index(db, project)
+
+
+def remove_project(db: Session, project_id: int) -> None:
+    backend_for(db).remove(db, project_id)
+
+
+def search(
+    db: Session, user_id: int, query: str, *, limit: int, after: Optional[tuple[float, int]] = None
+) -> list[SearchHit]:
+    backend = backend_for(db)
+    terms = query_terms(query)
+    if not terms:
+        return []
+    return backend.search(db, user_id, terms, limit, after)
+
+
+def reindex(db: Session) -> int:
+    """Rebuild the index from the projects table (backfill after enabling search on existing data)."""
+    ensure_schema(db.connection())
+    count = 0
+    for project in db.query(models.Project).yield_per(500):
+        index_project(db, project)
+        count += 1
+    db.commit()
+    return count
@@ -1,14 +1,69 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core import read_your_writes, tracing
 from app.core.config import settings
+from app.db.slow_queries import slow_query_log
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    # SQLite ignores foreign keys (and so ON DELETE CASCADE) unless enabled on every connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_engine(uri: str) -> Engine:
+    new_engine = create_engine(
+        uri,
+        connect_args={"check_same_thread": False} if uri.startswith("sqlite") else {},
+    )
+    if uri.startswith("sqlite"):
+        event.listen(new_engine, "connect", _enable_sqlite_foreign_keys)
+    slow_query_log.install(new_engine)
+    tracing.install(new_engine)
+    return new_engine
+
+
+# Primary (read/write) engine
+engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI)
 
+# Read replicas; reads fall back to the primary when none are configured
+replica_engines: list[Engine] = [_create_engine(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS]
+
+
+def dispose_engines() -> None:
+    """Forget pooled connections inherited from a parent process. Call in each worker right after fork."""
+    for each in (engine, *replica_engines):
+        # close=False: the sockets still belong to the parent, closing them here would break its connections
+        each.dispose(close=False)
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    connect_args={"check_same_thread": False} if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite") else {},
-)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessions for read-only dependencies; the engine is chosen per request via get_read_engine()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+_replica_cycle = itertools.count()
+
+
+def get_read_engine(last_write: Optional[float] = None) -> Engine:
+    """A replica, round-robin, or the primary when the client's last write (a unix time) is recent."""
+    if not replica_engines:
+        return engine
+    if last_write is not None and 0 <= time.time() - last_write < settings.READ_YOUR_WRITES_SECONDS:
+        # Replicas may lag behind the client's own mutation, stick to the primary
+        return engine
+    return replica_engines[next(_replica_cycle) % len(replica_engines)]
+
 
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_write(session) -> None:
+    # Sent back to the client as the last_write cookie (app/core/read_your_writes.py)
+    read_your_writes.note_write()
@@ -0,0 +1,84 @@
+"""
+Single-flight for read crud calls.
+
+Concurrent identical reads in one worker share a single DB execution: the first caller runs the query,
+callers that arrive while it is in flight wait and receive the same result. Nothing is cached once the
+call returns.
+
+The key is the crud function, its keyword arguments (which carry the caller, e.g. `current_user_id`, so
+visibility checks are never shared between users) and the engine the session is bound to (so a user
+pinned to the primary for read-your-writes never receives a replica result).
+
+Results are ORM instances loaded by the leader's session. Followers only read their loaded columns, so
+they must not be mutated or used for lazy loads.
+"""
+
+import threading
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.executions = 0
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            calls, executions = self.calls, self.executions
+        coalesced = calls - executions
+        return {
+            "calls": calls,
+            "executions": executions,
+            "coalesced": coalesced,
+            "coalescing_ratio": coalesced / calls if calls else 0.0,
+        }
+
+
+reads = SingleFlight()
+
+
+def coalesced(fn: Callable[..., T], db: Session, **kwargs: Any) -> T:
+    key = (fn.__module__, fn.__qualname__, id(db.get_bind()), tuple(sorted(kwargs.items())))
+    return reads.do(key, fn, db, **kwargs)
@@ -0,0 +1,210 @@
+"""
+Slow-query log.
+
+Engine event hooks time every statement. Statements slower than SLOW_QUERY_THRESHOLD_MS are:
+
+- logged (`fastapi` logger, WARNING) with their parameters redacted to type names;
+- aggregated by fingerprint (the statement with literals and IN lists normalized) into a bounded table
+  behind `GET /api/admin/slow-queries`, the top-N by total time;
+- EXPLAINed once per fingerprint (again after SLOW_QUERY_EXPLAIN_TTL_SECONDS) on a background thread, at
+  most SLOW_QUERY_EXPLAIN_PER_MINUTE times a minute, so the request that was slow never waits for it.
+
+The EXPLAIN reuses the slow statement's parameters on a separate connection; it only plans the statement
+(EXPLAIN QUERY PLAN on SQLite, plain EXPLAIN elsewhere), it never runs it. State is per worker.
+"""
+
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("fastapi")
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    text = _STRING.sub("?", statement)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    # IN (?, ?, ?) and IN (?) are the same query whatever the list length
+    text = _IN_LIST.sub("(?)", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize(statement).encode("utf-8")).hexdigest()[:16]
+
+
+def redact(parameters: Any) -> Any:
+    """Parameter values replaced by their type names; keys and shape are kept."""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+class _Stats:
+    __slots__ = ("statement", "calls", "total", "max", "last_seen", "plan", "explained_at")
+
+    def __init__(self, statement: str) -> None:
+        self.statement = statement
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last_seen = 0.0
+        self.plan: Optional[str] = None
+        self.explained_at = float("-inf")
+
+
+class SlowQueryLog:
+    def __init__(self, max_fingerprints: Optional[int] = None) -> None:
+        self.max_fingerprints = max_fingerprints or settings.SLOW_QUERY_MAX_FINGERPRINTS
+        self._stats: dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+        self._explains: queue.Queue = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+        self._tokens = float(settings.SLOW_QUERY_EXPLAIN_PER_MINUTE)
+        self._refilled_at = time.monotonic()
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @staticmethod
+    def _on_error(context) -> None:
+        # after_cursor_execute does not fire for a failed statement
+        if context.connection is not None and context.execution_context is not None:
+            started = context.connection.info.get("query_started_at")
+            if started:
+                started.pop()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["query_started_at"].pop()) * 1000
+        if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS or not conn.get_execution_options().get("slow_query_log", True):
+            return
+        self.record(conn.engine, statement, parameters, elapsed_ms, executemany)
+
+    def record(self, engine: Engine, statement: str, parameters: Any, elapsed_ms: float, executemany: bool = False) -> None:
+        key = fingerprint(statement)
+        shown = f"<{len(parameters)} parameter sets>" if executemany else redact(parameters)
+        logger.warning("Slow query %.1f ms [%s]: %s params=%s", elapsed_ms, key, _SPACE.sub(" ", statement).strip(), shown)
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Forget the fingerprint that has cost the least so far
+                    del self._stats[min(self._stats, key=lambda k: self._stats[k].total)]
+                stats = self._stats[key] = _Stats(normalize(statement))
+            stats.calls += 1
+            stats.total += elapsed_ms
+            stats.max = max(stats.max, elapsed_ms)
+            stats.last_seen = now
+            due = now - stats.explained_at >= settings.SLOW_QUERY_EXPLAIN_TTL_SECONDS
+            explain = (
+                due
+                and not executemany
+                and engine.dialect.name in EXPLAIN_PREFIXES
+                and _EXPLAINABLE.match(statement) is not None
+                and self._take_token()
+            )
+            if explain:
+                # Marked now, so concurrent slow runs of the same statement do not queue it again
+                stats.explained_at = now
+        if explain:
+            self._submit(engine, key, statement, parameters)
+
+    def _take_token(self) -> bool:
+        rate = settings.SLOW_QUERY_EXPLAIN_PER_MINUTE
+        now = time.monotonic()
+        self._tokens = min(float(rate), self._tokens + (now - self._refilled_at) * rate / 60)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _submit(self, engine: Engine, key: str, statement: str, parameters: Any) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            # Started lazily, and again in a forked worker (threads do not survive fork)
+            self._worker = threading.Thread(target=self._explain_forever, name="slow-query-explain", daemon=True)
+            self._worker.start()
+        try:
+            self._explains.put_nowait((engine, key, statement, parameters))
+        except queue.Full:
+            pass
+
+    def _explain_forever(self) -> None:
+        while True:
+            engine, key, statement, parameters = self._explains.get()
+            try:
+                plan = self.explain(engine, statement, parameters)
+                with self._lock:
+                    if key in self._stats:
+                        self._stats[key].plan = plan
+            except Exception:
+                logger.warning("Could not EXPLAIN slow query [%s]", key, exc_info=True)
+            finally:
+                self._explains.task_done()
+
+    @staticmethod
+    def explain(engine: Engine, statement: str, parameters: Any) -> str:
+        dialect = engine.dialect.name
+        with engine.connect().execution_options(slow_query_log=False) as conn:
+            rows = conn.exec_driver_sql(EXPLAIN_PREFIXES[dialect] + statement, parameters).all()
+            conn.rollback()
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            return "\n".join(str(row[-1]) for row in rows)
+        return "\n".join(" ".join(str(column) for column in row) for row in rows)
+
+    def join(self) -> None:
+        """Wait for the queued EXPLAINs to finish."""
+        self._explains.join()
+
+    def report(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: -item[1].total)[: limit or settings.SLOW_QUERY_TOP_N]
+            return [
+                {
+                    "fingerprint": key,
+                    "statement": stats.statement,
+                    "calls": stats.calls,
+                    "total_ms": round(stats.total, 1),
+                    "mean_ms": round(stats.total / stats.calls, 1),
+                    "max_ms": round(stats.max, 1),
+                    "last_seen": stats.last_seen,
+                    "plan": stats.plan,
+                }
+                for key, stats in items
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_log = SlowQueryLog()
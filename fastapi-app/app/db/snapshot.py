@@ -0,0 +1,190 @@
+"""
+Snapshots of users, projects and memberships, to move them between databases (backup, staging copies).
+
+File format: the magic line `FASNAP1\n`, then frames, each a 4-byte big-endian length followed by a
+zlib-compressed NDJSON block. The first line of a block describes it, the rest are rows as JSON arrays:
+
+- frame 0: `{"kind": "header", "id", "created_at", "tables": {table: [columns]}}`
+- data:    `{"kind": "rows", "table", "rows": n}` + n rows, at most SNAPSHOT_CHUNK_ROWS per frame
+- last:    `{"kind": "end", "counts": {table: rows}}` (a snapshot without it is truncated)
+
+Export streams each table in primary key order with `yield_per` (a server-side cursor where the driver
+has one), so neither side holds more than one chunk in memory. Projects awaiting purge are left out, and
+users' project_count is recounted without them. On PostgreSQL the export runs in one REPEATABLE READ
+transaction, so the three tables are read from the same snapshot (SQLite transactions already are).
+
+Restore needs empty tables. It drops the tables' secondary indexes, bulk-inserts every chunk in its own
+transaction together with its frame number in `snapshot_restores`, then recreates the indexes and rebuilds
+the search index. Restoring the same file again after a failure resumes after the last committed frame.
+"""
+
+import json
+import struct
+import time
+import uuid
+import zlib
+from typing import Any, BinaryIO, Optional
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models, search
+
+
+MAGIC = b"FASNAP1\n"
+_LENGTH = struct.Struct(">I")
+
+# Parents before children, so foreign keys hold at every commit
+TABLES: tuple[Table, ...] = (
+    models.User.__table__,
+    models.Project.__table__,
+    models.ProjectMembership.__table__,
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _write_frame(out: BinaryIO, meta: dict[str, Any], rows: Optional[list] = None) -> None:
+    lines = [json.dumps(meta, separators=(",", ":"))]
+    lines.extend(json.dumps(list(row), separators=(",", ":")) for row in rows or ())
+    payload = zlib.compress("\n".join(lines).encode("utf-8"), 6)
+    out.write(_LENGTH.pack(len(payload)))
+    out.write(payload)
+
+
+def _read_payload(src: BinaryIO) -> Optional[bytes]:
+    prefix = src.read(_LENGTH.size)
+    if not prefix:
+        return None
+    (length,) = _LENGTH.unpack(prefix) if len(prefix) == _LENGTH.size else (-1,)
+    payload = src.read(length) if length >= 0 else b""
+    if length < 0 or len(payload) < length:
+        raise SnapshotError("Snapshot is truncated")
+    return payload
+
+
+def _decode(payload: bytes) -> tuple[dict[str, Any], list[list]]:
+    meta_line, *row_lines = zlib.decompress(payload).decode("utf-8").split("\n")
+    return json.loads(meta_line), [json.loads(line) for line in row_lines]
+
+
+def _export_query(table: Table):
+    projects, memberships = models.Project.__table__, models.ProjectMembership.__table__
+    live_projects = select(projects.c.id).where(projects.c.deleted_at.is_(None))
+    query = select(table).order_by(*table.primary_key.columns)
+    # Memberships of projects awaiting purge would be restored without their project
+    if table is projects:
+        query = query.where(table.c.deleted_at.is_(None))
+    elif table is memberships:
+        query = query.where(table.c.project_id.in_(live_projects))
+    elif table is models.User.__table__:
+        # Recounted from the exported memberships: the stored count still includes projects awaiting purge,
+        # and no purge job runs for them after a restore
+        project_count = (
+            select(func.count())
+            .select_from(memberships)
+            .where(memberships.c.user_id == table.c.id, memberships.c.project_id.in_(live_projects))
+            .scalar_subquery()
+        )
+        columns = [project_count.label(column.name) if column.name == "project_count" else column for column in table.columns]
+        query = select(*columns).order_by(*table.primary_key.columns)
+    return query
+
+
+def export_snapshot(db: Session, out: BinaryIO, chunk_rows: Optional[int] = None) -> dict[str, int]:
+    chunk_rows = chunk_rows or settings.SNAPSHOT_CHUNK_ROWS
+    if db.get_bind().dialect.name == "postgresql":
+        # The tables are read by separate statements: one REPEATABLE READ transaction gives them all the same
+        # snapshot, so no membership refers to a project or user committed after its table was read
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+    out.write(MAGIC)
+    _write_frame(out, {
+        "kind": "header",
+        "id": str(uuid.uuid4()),
+        "created_at": time.time(),
+        "tables": {table.name: [column.name for column in table.columns] for table in TABLES},
+    })
+    counts = {}
+    for table in TABLES:
+        counts[table.name] = 0
+        result = db.execute(_export_query(table), execution_options={"yield_per": chunk_rows})
+        for rows in result.partitions():
+            _write_frame(out, {"kind": "rows", "table": table.name, "rows": len(rows)}, rows)
+            counts[table.name] += len(rows)
+    _write_frame(out, {"kind": "end", "counts": counts})
+    return counts
+
+
+def _check_empty(db: Session) -> None:
+    for table in TABLES:
+        if db.execute(select(func.count()).select_from(table)).scalar():
+            raise SnapshotError(f"Table {table.name} is not empty; snapshots restore into an empty database")
+
+
+def _reset_sequences(db: Session) -> None:
+    # Rows keep their ids, so serial sequences must continue after the highest one
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in (models.User.__table__, models.Project.__table__):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def restore_snapshot(db: Session, src: BinaryIO) -> dict[str, int]:
+    """Restore into empty tables, or resume an interrupted restore of the same snapshot; returns rows inserted."""
+    if src.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not a snapshot file")
+    payload = _read_payload(src)
+    header = _decode(payload)[0] if payload is not None else {}
+    if header.get("kind") != "header":
+        raise SnapshotError("Snapshot has no header")
+    tables = {table.name: table for table in TABLES}
+    for name, columns in header["tables"].items():
+        if name not in tables or not set(columns) <= set(tables[name].columns.keys()):
+            raise SnapshotError(f"Snapshot table {name} does not match this schema")
+
+    progress = db.get(models.SnapshotRestore, header["id"])
+    if progress is not None and progress.finished_at is not None:
+        raise SnapshotError(f"Snapshot {header['id']} was already restored")
+    if progress is None:
+        _check_empty(db)
+        progress = models.SnapshotRestore(id=header["id"], frames_done=0)
+        db.add(progress)
+        # Indexes are built once at the end instead of updated row by row
+        for table in TABLES:
+            for index in table.indexes:
+                index.drop(bind=db.connection(), checkfirst=True)
+        db.commit()
+
+    counts = {table.name: 0 for table in TABLES}
+    number = 0
+    while True:
+        payload = _read_payload(src)
+        if payload is None:
+            raise SnapshotError("Snapshot is truncated; restore the complete file again to resume")
+        number += 1
+        if number <= progress.frames_done:
+            continue  # restored before the interruption; not even decompressed
+        meta, rows = _decode(payload)
+        if meta["kind"] == "end":
+            break
+        table = tables[meta["table"]]
+        columns = header["tables"][table.name]
+        db.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+        # Committed with its rows, so a resume never inserts a chunk twice
+        progress.frames_done = number
+        db.commit()
+        counts[table.name] += len(rows)
+
+    for table in TABLES:
+        for index in table.indexes:
+            index.create(bind=db.connection(), checkfirst=True)
+    _reset_sequences(db)
+    search.reindex(db)
+    progress.finished_at = time.time()
+    db.commit()
+    return counts
@@ -0,0 +1,220 @@
+"""
+Bulk user import (admin endpoint `POST /api/admin/users/import` and `python -m app.cli.import_users`).
+
+Input is CSV with a header (`email,password`, other columns ignored; quoted fields may contain newlines)
+or NDJSON (`{"email", "password"}` per line), read from an iterable of lines so it can come from a stream.
+Rows are processed in chunks of USER_IMPORT_CHUNK_SIZE:
+
+1. validated like signup (EmailStr, non-empty password);
+2. deduplicated within the import, then against the database with one `IN` query per chunk;
+3. hashed across a process pool of USER_IMPORT_HASH_WORKERS (bcrypt is CPU-bound and holds the GIL),
+   created once per server process and shut down with the app;
+4. inserted with one multi-row INSERT ... ON CONFLICT (email) DO NOTHING RETURNING id per chunk and
+   committed, so a concurrent signup of the same email is reported as existing instead of failing the chunk.
+   Databases without ON CONFLICT (or multi-row RETURNING) insert row by row, each under a SAVEPOINT.
+
+Every data line gets a result: created (with id), exists, duplicate or invalid (with error). `process`
+yields them per chunk; the admin endpoint collects them into its response, so its size grows with the input.
+"""
+
+import csv
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.processes import process_pool
+from app.core.security import get_password_hash
+from app.db import models
+
+
+FORMATS = ("csv", "ndjson")
+
+_email = TypeAdapter(EmailStr)
+_upsert_dialects = {"sqlite": sqlite, "postgresql": postgresql}
+
+
+class _HashPool:
+    """One process pool per server process, shared by every import (created on first use)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = process_pool(workers)
+                self._workers = workers
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+hash_pool = _HashPool()
+
+
+class UserImport:
+    def __init__(
+        self,
+        db: Session,
+        fmt: str,
+        chunk_size: Optional[int] = None,
+        hash_workers: Optional[int] = None,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.db = db
+        self.chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+        # 0 workers: hash in the calling thread
+        self.hash_workers = settings.USER_IMPORT_HASH_WORKERS if hash_workers is None else hash_workers
+        self._pending: list[dict[str, Any]] = []
+        self._seen: set[str] = set()
+        self.counts = {"created": 0, "exists": 0, "duplicate": 0, "invalid": 0}
+
+    def process(self, lines: Iterable[str]) -> Iterator[list[dict[str, Any]]]:
+        """Import every row of the input; yields the results of each chunk once it is committed."""
+        for line_number, record in self._records(lines):
+            row = self._row(line_number, record)
+            if "error" in row:
+                yield [self._result(row, "invalid", error=row["error"])]
+                continue
+            if row["email"] in self._seen:
+                yield [self._result(row, "duplicate")]
+                continue
+            self._seen.add(row["email"])
+            self._pending.append(row)
+            if len(self._pending) >= self.chunk_size:
+                yield self._flush()
+        yield self._flush()
+
+    def _records(self, lines: Iterable[str]) -> Iterator[tuple[int, Union[dict[str, Any], str]]]:
+        """(line number, record or error message) per data row; a CSV row may span lines (quoted newlines)."""
+        if self.fmt == "ndjson":
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, f"Invalid JSON: {exc.msg}"
+                    continue
+                yield line_number, record if isinstance(record, dict) else "Expected a JSON object"
+            return
+
+        reader = csv.reader(lines)
+        columns: Optional[list[str]] = None
+        line_number = 1
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as exc:
+                yield line_number, f"Invalid CSV: {exc}"
+                line_number = reader.line_num + 1
+                continue
+            # line_num counts physical lines read so far, so a row starts right after the previous one
+            row_line, line_number = line_number, reader.line_num + 1
+            if not any(value.strip() for value in values):
+                continue
+            if columns is None:
+                columns = [column.strip().lower() for column in values]
+                continue
+            yield row_line, dict(zip(columns, values))
+        if columns is None:
+            yield 1, "Missing CSV header"
+
+    @staticmethod
+    def _row(line_number: int, record: Union[dict[str, Any], str]) -> dict[str, Any]:
+        row: dict[str, Any] = {"line": line_number}
+        if isinstance(record, str):
+            return {**row, "error": record}
+        email, password = record.get("email"), record.get("password")
+        try:
+            row["email"] = _email.validate_python((email or "").strip())
+        except ValidationError:
+            return {**row, "email": email, "error": "Invalid email"}
+        if not isinstance(password, str) or not password:
+            return {**row, "error": "Missing password"}
+        row["password"] = password
+        return row
+
+    def _hash(self, passwords: list[str]) -> list[str]:
+        if self.hash_workers <= 0:
+            return [get_password_hash(password) for password in passwords]
+        # A few tasks per worker, so the pool stays busy without one pickle per password
+        chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+        return list(hash_pool.get(self.hash_workers).map(get_password_hash, passwords, chunksize=chunksize))
+
+    def _flush(self) -> list[dict[str, Any]]:
+        rows, self._pending = self._pending, []
+        if not rows:
+            return []
+        db = self.db
+        try:
+            existing = set(db.scalars(select(models.User.email).where(models.User.email.in_([row["email"] for row in rows]))))
+            results = [self._result(row, "exists") for row in rows if row["email"] in existing]
+            new_rows = [row for row in rows if row["email"] not in existing]
+            if new_rows:
+                hashes = self._hash([row["password"] for row in new_rows])
+                values = [
+                    {"email": row["email"], "hashed_password": hashed, "is_active": True, "is_superuser": False, "project_count": 0}
+                    for row, hashed in zip(new_rows, hashes)
+                ]
+                created = self._insert(db, values)
+                db.commit()
+                for row in new_rows:
+                    user_id = created.get(row["email"])
+                    if user_id is None:
+                        results.append(self._result(row, "exists"))  # signed up since the IN query
+                    else:
+                        results.append(self._result(row, "created", id=user_id))
+        except Exception:
+            db.rollback()
+            raise
+        return sorted(results, key=lambda result: result["line"])
+
+    @staticmethod
+    def _insert(db: Session, values: list[dict[str, Any]]) -> dict[str, int]:
+        dialect = _upsert_dialects.get(db.get_bind().dialect.name)
+        if dialect is None:
+            return UserImport._insert_each(db, values)
+        statement = dialect.insert(models.User).values(values).on_conflict_do_nothing(index_elements=["email"])
+        rows = db.execute(statement.returning(models.User.id, models.User.email))
+        return {email: user_id for user_id, email in rows}
+
+    @staticmethod
+    def _insert_each(db: Session, values: list[dict[str, Any]]) -> dict[str, int]:
+        # No portable ON CONFLICT: a row whose email was signed up since the IN query only rolls back its
+        # own savepoint, not the chunk
+        created = {}
+        for value in values:
+            try:
+                with db.begin_nested():
+                    result = db.execute(insert(models.User).values(value))
+            except IntegrityError:
+                continue
+            created[value["email"]] = result.inserted_primary_key[0]
+        return created
+
+    def _result(self, row: dict[str, Any], status: str, **extra: Any) -> dict[str, Any]:
+        self.counts[status] += 1
+        result = {"line": row["line"], "email": row.get("email"), "status": status}
+        result.update(extra)
+        return result
@@ -0,0 +1,94 @@
+"""
+Durable job queue stored in the application database (`jobs` table).
+
+`enqueue` only adds the row to the caller's session, so the job is committed atomically with the
+mutation that produced it. Workers claim due jobs with a conditional UPDATE, so several workers (or
+processes) can poll the same table without running a job twice. The runner renews the lease of a job
+while its handler runs, so only a job whose worker died is claimed again.
+"""
+
+import json
+import random
+import time
+from typing import Any, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+
+def enqueue(
+    db: Session,
+    name: str,
+    payload: Optional[dict[str, Any]] = None,
+    *,
+    delay: float = 0.0,
+    max_attempts: Optional[int] = None,
+) -> models.Job:
+    job = models.Job(
+        name=name,
+        payload=json.dumps(payload or {}),
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_at=time.time() + delay,
+    )
+    db.add(job)
+    return job
+
+
+def _claimable(now: float):
+    return or_(
+        and_(models.Job.status == "queued", models.Job.run_at <= now),
+        # Lease expired: the worker that claimed it died mid-run
+        and_(models.Job.status == "running", models.Job.locked_until < now),
+    )
+
+
+def claim_due(db: Session, limit: int) -> list[models.Job]:
+    now = time.time()
+    candidate_ids = db.scalars(
+        select(models.Job.id).where(_claimable(now)).order_by(models.Job.run_at).limit(limit)
+    ).all()
+    claimed = []
+    for job_id in candidate_ids:
+        result = db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, _claimable(now))
+            .values(status="running", attempts=models.Job.attempts + 1, locked_until=now + settings.JOBS_LEASE_SECONDS)
+        )
+        if result.rowcount == 1:
+            claimed.append(job_id)
+    db.commit()
+    if not claimed:
+        return []
+    return list(db.scalars(select(models.Job).where(models.Job.id.in_(claimed)).order_by(models.Job.run_at)))
+
+
+def renew_lease(db: Session, job_id: int, attempts: int) -> bool:
+    """Extend the lease of a job still held by this attempt; False once another worker took it over."""
+    result = db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id, models.Job.status == "running", models.Job.attempts == attempts)
+        .values(locked_until=time.time() + settings.JOBS_LEASE_SECONDS)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def mark_done(db: Session, job_id: int) -> None:
+    db.execute(delete(models.Job).where(models.Job.id == job_id))
+    db.commit()
+
+
+def mark_failed(db: Session, job: models.Job, error: str) -> None:
+    if job.attempts >= job.max_attempts:
+        values: dict[str, Any] = {"status": "failed"}
+    else:
+        # Exponential backoff with jitter: base, 2*base, 4*base, ...
+        backoff = settings.JOBS_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        values = {"status": "queued", "run_at": time.time() + backoff * random.uniform(0.8, 1.2)}
+    db.execute(update(models.Job).where(models.Job.id == job.id).values(locked_until=None, last_error=error[:2000], **values))
+    db.commit()
@@ -0,0 +1,205 @@
+"""
+Background job runner.
+
+Handlers are registered with `@job(name)` and dispatched by how they are defined:
+
+- `async def handler(**payload)` runs on the event loop;
+- `def handler(db, **payload)` runs in a worker thread with a fresh session (DB-bound work);
+- `@job(name, process=True) def handler(**payload)` runs in a process pool (CPU-bound work, no DB session).
+
+`JobRunner.serve()` polls the queue and runs due jobs with a global concurrency limit, plus an optional
+per-handler limit. A running job's lease is renewed every third of JOBS_LEASE_SECONDS. Failed jobs are
+retried with exponential backoff until `max_attempts`.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.jobs import queue
+
+
+logger = logging.getLogger("fastapi")
+
+
+@dataclass
+class JobSpec:
+    name: str
+    handler: Callable
+    process: bool = False
+    concurrency: Optional[int] = None
+
+
+_registry: dict[str, JobSpec] = {}
+
+
+def job(name: str, *, process: bool = False, concurrency: Optional[int] = None):
+    def decorator(fn: Callable) -> Callable:
+        _registry[name] = JobSpec(name=name, handler=fn, process=process, concurrency=concurrency)
+        return fn
+
+    return decorator
+
+
+class JobRunner:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        concurrency: Optional[int] = None,
+        process_workers: Optional[int] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.JOBS_CONCURRENCY
+        self.process_workers = process_workers or settings.JOBS_PROCESS_WORKERS
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._handler_limits: dict[str, asyncio.Semaphore] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._running: set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def _claim(self, limit: int) -> list[tuple[int, str, str, int, int]]:
+        db: Session = self.session_factory()
+        try:
+            jobs = queue.claim_due(db, limit=limit)
+            return [(j.id, j.name, j.payload, j.attempts, j.max_attempts) for j in jobs]
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, error: Optional[str]) -> None:
+        db: Session = self.session_factory()
+        try:
+            if error is None:
+                queue.mark_done(db, job_id)
+                return
+            record = db.get(models.Job, job_id)
+            if record is not None:
+                queue.mark_failed(db, record, error)
+        finally:
+            db.close()
+
+    def _run_with_session(self, handler: Callable, payload: dict) -> None:
+        db: Session = self.session_factory()
+        try:
+            handler(db, **payload)
+        finally:
+            db.close()
+
+    async def _execute(self, spec: JobSpec, payload: dict) -> None:
+        if inspect.iscoroutinefunction(spec.handler):
+            await spec.handler(**payload)
+        elif spec.process:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._process_pool, _call_with_kwargs, spec.handler, payload)
+        else:
+            await asyncio.to_thread(self._run_with_session, spec.handler, payload)
+
+    def _renew(self, job_id: int, attempts: int) -> bool:
+        db: Session = self.session_factory()
+        try:
+            return queue.renew_lease(db, job_id, attempts)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job_id: int, attempts: int) -> None:
+        # Renewed well before it expires, so a slow job is never mistaken for one whose worker died
+        while True:
+            await asyncio.sleep(settings.JOBS_LEASE_SECONDS / 3)
+            try:
+                renewed = await asyncio.to_thread(self._renew, job_id, attempts)
+            except Exception:
+                logger.warning("Could not renew the lease of job %s", job_id, exc_info=True)
+                continue
+            if not renewed:
+                logger.warning("Job %s lost its lease; another worker may run it again", job_id)
+                return
+
+    async def _run_job(self, job_id: int, name: str, raw_payload: str, attempts: int, max_attempts: int) -> None:
+        error: Optional[str] = None
+        spec = _registry.get(name)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, attempts))
+        try:
+            if spec is None:
+                raise LookupError(f"No handler registered for job {name!r}")
+            if spec.concurrency:
+                limit = self._handler_limits.setdefault(name, asyncio.Semaphore(spec.concurrency))
+                async with limit:
+                    await self._execute(spec, json.loads(raw_payload))
+            else:
+                await self._execute(spec, json.loads(raw_payload))
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("Job %s (%s) failed, attempt %s/%s", job_id, name, attempts, max_attempts)
+        finally:
+            heartbeat.cancel()
+            self._semaphore.release()
+        await asyncio.to_thread(self._finish, job_id, error)
+
+    async def run_once(self) -> int:
+        """Claim the jobs that are due right now (up to the free concurrency) and wait for them to finish."""
+        tasks = await self._dispatch()
+        if tasks:
+            await asyncio.gather(*tasks)
+        return len(tasks)
+
+    async def _dispatch(self) -> list[asyncio.Task]:
+        await self._semaphore.acquire()
+        free = 1
+        while not self._semaphore.locked() and free < self.concurrency:
+            await self._semaphore.acquire()
+            free += 1
+        claimed = []
+        try:
+            claimed = await asyncio.to_thread(self._claim, free)
+        finally:
+            # Give back the slots no job was claimed for
+            for _ in range(free - len(claimed)):
+                self._semaphore.release()
+        tasks = []
+        for job_row in claimed:
+            task = asyncio.create_task(self._run_job(*job_row))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            tasks.append(task)
+        return tasks
+
+    async def serve(self) -> None:
+        while True:
+            try:
+                claimed = await self._dispatch()
+            except Exception:
+                logger.exception("Job queue polling failed")
+                claimed = []
+            if not claimed:
+                await asyncio.sleep(settings.JOBS_POLL_INTERVAL)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.serve())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # Let in-flight jobs finish; anything not finished is retried after its lease expires
+        if self._running:
+            await asyncio.wait(self._running, timeout=settings.JOBS_SHUTDOWN_GRACE_SECONDS)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_with_kwargs(handler: Callable, payload: dict):
+    return handler(**payload)
@@ -0,0 +1,129 @@
+import logging
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.jobs.runner import job
+
+
+logger = logging.getLogger("fastapi")
+
+
+@job("projects.purge_memberships")
+def purge_project_memberships(db: Session, project_id: int) -> None:
+    # The project was hidden by crud.delete_project; delete its memberships a chunk per transaction, so no
+    # single statement holds locks (or builds undo) for every row, then the project itself
+    membership = models.ProjectMembership
+    while True:
+        chunk = (
+            select(membership.user_id)
+            .where(membership.project_id == project_id)
+            .limit(settings.PROJECT_PURGE_CHUNK_SIZE)
+            .scalar_subquery()
+        )
+        # Only the rows this statement deleted are released, so a chunk that another run of the job (a
+        # retry after a lost lease) purged concurrently is never counted twice
+        user_ids = db.scalars(
+            delete(membership)
+            .where(membership.project_id == project_id, membership.user_id.in_(chunk))
+            .returning(membership.user_id)
+        ).all()
+        if user_ids:
+            db.execute(
+                update(models.User)
+                .where(models.User.id.in_(user_ids))
+                .values(project_count=models.User.project_count - 1)
+            )
+        db.commit()
+        if len(user_ids) < settings.PROJECT_PURGE_CHUNK_SIZE:
+            break
+    db.execute(delete(models.Project).where(models.Project.id == project_id, models.Project.deleted_at.isnot(None)))
+    db.commit()
+
+
+def _count_members(*conditions):
+    return (
+        select(func.count())
+        .select_from(models.ProjectMembership)
+        .where(*conditions)
+        .scalar_subquery()
+    )
+
+
+@job("counters.reconcile")
+def reconcile_counters(db: Session) -> dict[str, int]:
+    """Recount the membership counters that drifted (manual SQL, restores, bugs), a batch of rows per transaction."""
+    membership, project, user = models.ProjectMembership, models.Project, models.User
+    roles = ("owner", "editor", "viewer")
+    batch_size = settings.COUNTERS_RECONCILE_BATCH_SIZE
+    repaired = {"projects": 0, "users": 0}
+
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(project.id, project.member_count, *(getattr(project, f"{role}_count") for role in roles))
+            .where(project.id > last_id)
+            .order_by(project.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        actual = {}
+        for project_id, role, count in db.execute(
+            select(membership.project_id, membership.role, func.count())
+            .where(membership.project_id.in_([row[0] for row in rows]))
+            .group_by(membership.project_id, membership.role)
+        ):
+            actual.setdefault(project_id, {})[role] = count
+        drifted = []
+        for project_id, *stored in rows:
+            counts = actual.get(project_id, {})
+            if tuple(stored) != (sum(counts.values()), *(counts.get(role, 0) for role in roles)):
+                drifted.append(project_id)
+        if drifted:
+            # Recounted inside the UPDATE, so writes that landed since the read above are not lost
+            db.execute(
+                update(project)
+                .where(project.id.in_(drifted))
+                .values(
+                    member_count=_count_members(membership.project_id == project.id),
+                    **{
+                        f"{role}_count": _count_members(membership.project_id == project.id, membership.role == role)
+                        for role in roles
+                    },
+                )
+            )
+            repaired["projects"] += len(drifted)
+        db.commit()
+
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(user.id, user.project_count).where(user.id > last_id).order_by(user.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        actual = dict(
+            db.execute(
+                select(membership.user_id, func.count())
+                .where(membership.user_id.in_([row[0] for row in rows]))
+                .group_by(membership.user_id)
+            ).all()
+        )
+        drifted = [user_id for user_id, count in rows if count != actual.get(user_id, 0)]
+        if drifted:
+            db.execute(
+                update(user)
+                .where(user.id.in_(drifted))
+                .values(project_count=_count_members(membership.user_id == user.id))
+            )
+            repaired["users"] += len(drifted)
+        db.commit()
+
+    if repaired["projects"] or repaired["users"]:
+        logger.warning("Repaired drifted membership counters: %s", repaired)
+    return repaired
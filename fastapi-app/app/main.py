@@ -1,15 +1,25 @@
 from fastapi import FastAPI
 
-from app.api.routers import auth, projects, membership
+from app.api.routers import admin, auth, dashboard, events, health, plans, projects, membership
+from app.core.admission import AdmissionMiddleware
+from app.core.audit import audit_log
 from app.core.config import settings
+from app.core.health import readiness, warm_up
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.plan_renderer import plan_renderer
+from app.core.read_your_writes import ReadYourWritesMiddleware
+from app.core.tracing import TracingMiddleware
+from app.db import search
 from app.db.base import Base
 from app.db.session import engine
+from app.db.user_import import hash_pool
 
 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 
+import asyncio
 import os
 import logging
 
@@ -34,15 +44,38 @@ async def lifespan(app: FastAPI):
     # 1: For demo/dev: create tables automatically. Prefer Alembic in production.
     if os.getenv("ENV") == "development":
         Base.metadata.create_all(bind=engine)
+    # The search index tables are missing from databases created before search existed
+    search.ensure_schema(engine)
 
     # 2: Ensure first superuser is created
     ensure_first_superuser()
 
+    # 3: Audit log writer (batches buffered audit events into the database)
+    audit_log.start()
+
+    # 4: Background jobs (deferred work such as membership purges)
+    job_runner = None
+    if settings.JOBS_ENABLED:
+        from app.jobs import tasks as _tasks  # noqa: F401  (registers job handlers)
+        from app.jobs.runner import JobRunner
+
+        job_runner = JobRunner()
+        job_runner.start()
+
+    # 5: Warm the connection pools and password hasher before reporting ready
+    await asyncio.to_thread(warm_up)
+    readiness.warmed = True
+
     # running app
     yield
 
     # shutdown
-    pass
+    readiness.warmed = False
+    if job_runner is not None:
+        await job_runner.stop()
+    await audit_log.stop()
+    plan_renderer.shutdown()
+    hash_pool.shutdown()
 
 
 def ensure_first_superuser():
@@ -52,9 +85,6 @@ def ensure_first_superuser():
 
     db: Session = SessionLocal()
 
-    if get_user_by_email(db, email):
-        return
-
     # Создаём сессию вручную или используем get_db()
     try:
         email = os.getenv("SUPER_EMAIL")
@@ -63,18 +93,34 @@ def ensure_first_superuser():
         if not (email and password):
             return  # пропускаем, если не задано (или логируем предупреждение)
 
+        if get_user_by_email(db, email):
+            return
+
         create_user(db, email=email, password=password, is_superuser=True)
     finally:
         db.close()
 
 
 def create_app() -> FastAPI:
-    application = FastAPI(title=settings.PROJECT_NAME, version="0.1.0", debug=settings.DEBUG)
+    application = FastAPI(title=settings.PROJECT_NAME, version="0.1.0", debug=settings.DEBUG, lifespan=lifespan)
 
     # Routers
+    application.include_router(health.router)
     application.include_router(auth.router, prefix=settings.API_V1_STR)
     application.include_router(projects.router, prefix=settings.API_V1_STR)
     application.include_router(membership.router, prefix=settings.API_V1_STR)
+    application.include_router(plans.router, prefix=settings.API_V1_STR)
+    application.include_router(events.router, prefix=settings.API_V1_STR)
+    application.include_router(dashboard.router, prefix=settings.API_V1_STR)
+    application.include_router(admin.router, prefix=settings.API_V1_STR)
+
+    # Middleware (the last one added runs first): idempotent replays skip admission control, and 503s
+    # from admission control are not stored as the key's response; the request span covers both. The
+    # last_write cookie is only set for the route's own commits, not the idempotency store's
+    application.add_middleware(ReadYourWritesMiddleware)
+    application.add_middleware(AdmissionMiddleware)
+    application.add_middleware(IdempotencyMiddleware)
+    application.add_middleware(TracingMiddleware)
 
     return application
 
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class AuditEventOut(BaseModel):
+    id: int
+    created_at: float
+    actor_id: int
+    action: str
+    project_id: Optional[int] = None
+    target_user_id: Optional[int] = None
+    old_role: Optional[str] = None
+    new_role: Optional[str] = None
+
+    class Config:
+        from_attributes = True
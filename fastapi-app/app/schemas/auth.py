@@ -23,6 +23,7 @@ class UserCreate(UserBase):
 class UserOut(UserBase):
     id: int
     is_active: bool
+    project_count: int
 
     class Config:
         from_attributes = True
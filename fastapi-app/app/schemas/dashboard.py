@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel, EmailStr
+
+from app.schemas.auth import UserOut
+from app.schemas.project import ProjectOut
+
+
+class DashboardMember(BaseModel):
+    user_id: int
+    email: EmailStr
+    role: Literal["owner", "editor", "viewer"]
+
+
+class DashboardProject(ProjectOut):
+    # The first members by user id; member_count has the total
+    members: list[DashboardMember]
+
+
+class DashboardOut(BaseModel):
+    user: UserOut
+    projects: list[DashboardProject]
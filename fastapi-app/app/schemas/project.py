@@ -19,8 +19,17 @@ class ProjectUpdate(BaseModel):
 
 class ProjectOut(ProjectBase):
     id: int
+    member_count: int
+    owner_count: int
+    editor_count: int
+    viewer_count: int
 
     class Config:
         from_attributes = True
 
 
+
+
+class ProjectSearchHit(ProjectOut):
+    # Relevance, higher is better; only comparable within one search
+    score: float
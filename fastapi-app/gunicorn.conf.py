@@ -0,0 +1,43 @@
+"""
+Production launcher: `gunicorn -c gunicorn.conf.py app.main:app`.
+
+One Uvicorn worker per available CPU, with the app imported once in the master and forked. The master
+disables the garbage collector and freezes everything it imported before forking, so the workers'
+collections never touch (and copy) those pages and they stay shared. Each worker drops the database
+connections it inherited and recycles itself after MAX_REQUESTS requests.
+"""
+
+import gc
+import os
+
+from app.core.server import available_cpus
+
+
+# Until the workers are forked, a collection would only dirty pages that we want to share
+gc.disable()
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+worker_class = "app.core.server.Worker"
+preload_app = True
+
+# Recycle workers to cap slow leaks; jitter keeps them from all restarting at once
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far into the permanent generation, which the collector never scans
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.db.session import dispose_engines
+
+    gc.enable()
+    dispose_engines()
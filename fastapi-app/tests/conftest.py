@@ -1,5 +1,10 @@
+import itertools
 import os
+import shutil
 import sys
+import tempfile
+from typing import Callable, Optional
+
 import pytest
 
 
@@ -8,8 +13,11 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-# Force a local SQLite database for tests to avoid picking up external DSNs
-os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///./test.db"
+# One throwaway SQLite file per test process (each pytest-xdist worker imports this module itself), so
+# parallel runs never share a database and external DSNs are never picked up
+TEST_DIR = tempfile.mkdtemp(prefix=f"fastapi-tests-{os.environ.get('PYTEST_XDIST_WORKER', 'main')}-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["AUDIT_SPILL_PATH"] = os.path.join(TEST_DIR, "audit-spill.jsonl")
 
 # Ensure the API prefix used by the app matches the tests
 os.environ.setdefault("API_V1_STR", "/api")
@@ -18,6 +26,22 @@ os.environ.setdefault("API_V1_STR", "/api")
 os.environ.setdefault("ENV", "test")
 os.environ.setdefault("DEBUG", "True")
 
+# Tests run the job queue explicitly (JobRunner.run_once), never from the lifespan
+os.environ["JOBS_ENABLED"] = "False"
+
+
+def _enable_savepoints(engine) -> None:
+    # pysqlite opens transactions lazily and breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def _no_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
 
 @pytest.fixture(scope="session", autouse=True)
 def _create_test_db():
@@ -25,12 +49,88 @@ def _create_test_db():
     from app.db.base import Base  # noqa: WPS433
     from app.db.session import engine  # noqa: WPS433
 
-    # Ensure a clean slate in case a prior run left incompatible tables
-    Base.metadata.drop_all(bind=engine)
+    _enable_savepoints(engine)
     Base.metadata.create_all(bind=engine)
     yield
-    # Optional cleanup
-    # Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _cheap_password_hashing():
+    # Full-cost bcrypt dominates the suite; the minimum cost still exercises the real hashing code
+    from passlib.context import CryptContext
+    from app.core import security
+
+    original = security.pwd_context
+    security.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    yield
+    security.pwd_context = original
+
+
+def _reset_process_state() -> None:
+    # In-process state that refers to rows of the finished test
+    from app.core.audit import audit_log
+
+    audit_log._buffer.clear()
+
+
+@pytest.fixture(autouse=True)
+def db_connection(request, monkeypatch):
+    """
+    Run each test inside one transaction that is rolled back afterwards.
+
+    Every session the app opens (SessionLocal, and ReadSessionLocal when reads go to the primary) is bound
+    to the same connection and joins that transaction through a SAVEPOINT, so its commits are visible to
+    the rest of the test and gone after it. Savepoints nest: a session that commits while another one is in
+    a transaction (the request's get_db session after auth) is undone when that one closes, so routes should
+    write through the request's session.
+
+    Sessions sharing one connection see each other's uncommitted work, which is not how production
+    behaves: tests about visibility across sessions, threads or workers use `committed_db` instead.
+    """
+    if "committed_db" in request.fixturenames:
+        yield None
+        return
+
+    from app.api import deps
+    from app.db import session
+
+    connection = session.engine.connect()
+    transaction = connection.begin()
+    saved = {factory: dict(factory.kw) for factory in (session.SessionLocal, session.ReadSessionLocal)}
+    session.SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    session.ReadSessionLocal.configure(join_transaction_mode="create_savepoint")
+
+    def read_bind(last_write: Optional[float] = None):
+        bind = session.get_read_engine(last_write)
+        return connection if bind is session.engine else bind
+
+    monkeypatch.setattr(deps, "get_read_engine", read_bind)
+    yield connection
+    _reset_process_state()
+    for factory, kw in saved.items():
+        factory.kw = kw
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def committed_db():
+    """
+    The real test database, without the per-test transaction: every session has its own connection and
+    every commit is durable, as in production. Every table is emptied afterwards.
+    """
+    from app.db.base import Base
+    from app.db.session import engine
+
+    yield engine
+    _reset_process_state()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("DELETE FROM projects_fts")
 
 
 from fastapi.testclient import TestClient
@@ -43,12 +143,46 @@ def client() -> TestClient:
     client.close()
 
 
+_emails = itertools.count(1)
+
+
+@pytest.fixture
+def make_user() -> Callable:
+    """Create a user directly in the database: `make_user()`, `make_user("a@example.com", is_superuser=True)`."""
+    from app.db import crud
+    from app.db.session import SessionLocal
+
+    def factory(email: Optional[str] = None, *, password: str = "password123", is_superuser: bool = False):
+        db = SessionLocal()
+        try:
+            return crud.create_user(
+                db, email=email or f"user{next(_emails)}@example.com", password=password, is_superuser=is_superuser
+            )
+        finally:
+            db.close()
+
+    return factory
+
+
+@pytest.fixture
+def auth_headers(make_user) -> Callable:
+    """Authorization headers for a user (or a new one), minted without the signup/login round-trip."""
+    from app.core.security import create_access_token
+
+    def factory(user=None, **user_kwargs) -> dict:
+        if user is None:
+            user = make_user(**user_kwargs)
+        return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+    return factory
+
+
 def signup_and_login(client: TestClient, email: str, password: str) -> str:
     res = client.post("/api/auth/signup", json={"email": email, "password": password})
-    if not res.status_code == 409: 
+    if not res.status_code == 409:
         assert res.status_code == 200, res.text
 
     res = client.post("/api/auth/login", data={"username": email, "password": password})
     assert res.status_code == 200, res.text
     token = res.json()["access_token"]
-    return token
\ No newline at end of file
+    return token
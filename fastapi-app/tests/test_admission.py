@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_limiter_queues_then_sheds():
+    from app.core.admission import Limiter, Rejected
+
+    async def scenario():
+        limiter = Limiter(limit=1, queue_size=1)
+        await limiter.acquire(timeout=1)
+
+        # Second request waits for the slot and gets it when the first one finishes
+        waiting = asyncio.create_task(limiter.acquire(timeout=1))
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 1
+
+        # The queue is full: shed immediately
+        with pytest.raises(Rejected):
+            await limiter.acquire(timeout=1)
+
+        limiter.release()
+        await waiting
+        assert limiter.stats()["in_flight"] == 1
+
+        # Nobody releases within the budget: shed after the timeout
+        with pytest.raises(Rejected):
+            await limiter.acquire(timeout=0.05)
+        limiter.release()
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats == {"limit": 1, "in_flight": 0, "queued": 0, "admitted": 2, "rejected": 1, "timed_out": 1}
+
+
+def test_adaptive_limit_backs_off_on_slow_requests_and_recovers():
+    from app.core.admission import Limiter
+
+    limiter = Limiter(limit=10, queue_size=10, adaptive=True, min_limit=2, latency_target=60)
+    limiter.in_flight = 1
+    limiter.release(latency=120)
+    assert limiter.limit == 9
+    # At most one decrease per target interval, so one slow burst does not collapse the limit
+    limiter.in_flight = 1
+    limiter.release(latency=120)
+    assert limiter.limit == 9
+
+    # Fast completions while saturated grow it back, up to the configured ceiling
+    for _ in range(200):
+        limiter.in_flight = int(limiter.limit)
+        limiter.release(latency=0.01)
+    assert limiter.limit == 10
+
+
+def test_overloaded_route_class_gets_fast_503(client: TestClient, auth_headers, monkeypatch):
+    from app.core.admission import Limiter, admission
+    from app.core.config import settings
+
+    headers = auth_headers()
+    saturated = Limiter(limit=1, queue_size=0)
+    saturated.in_flight = 1
+    monkeypatch.setitem(admission.limiters, "read", saturated)
+
+    res = client.get("/api/projects/", headers=headers)
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == str(int(settings.ADMISSION_RETRY_AFTER_SECONDS))
+
+    # Other classes and health checks are unaffected
+    assert client.post("/api/projects/", json={"title": "Still writable"}, headers=headers).status_code == 201
+    assert client.get("/healthz").status_code == 200
+    assert saturated.stats()["rejected"] == 1
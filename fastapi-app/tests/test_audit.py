@@ -0,0 +1,116 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from conftest import signup_and_login
+
+
+def test_mutations_are_audited_and_queryable_by_admins(client: TestClient, auth_headers):
+    from app.core.audit import audit_log
+
+    owner = {"Authorization": f"Bearer {signup_and_login(client, 'auditowner@example.com', 'password123')}"}
+    signup_and_login(client, "auditmember@example.com", "password123")
+    project_id = client.post("/api/projects/", json={"title": "Audited"}, headers=owner).json()["id"]
+    res = client.post(f"/api/projects/{project_id}/users", json={"principal": "auditmember@example.com"}, headers=owner)
+    assert res.status_code == 200, res.text
+    member_id = next(m["user_id"] for m in client.get(f"/api/projects/{project_id}/users", headers=owner).json() if m["role"] == "viewer")
+    res = client.put(
+        f"/api/projects/{project_id}/users", json={"principal": "auditmember@example.com", "role": "editor"}, headers=owner
+    )
+    assert res.status_code == 200, res.text
+
+    # Nothing is written by the request itself
+    assert audit_log.stats()["buffered"] >= 3
+    audit_log.flush()
+    assert audit_log.stats()["buffered"] == 0
+
+    admin = auth_headers(is_superuser=True)
+    assert client.get("/api/admin/audit", headers=owner).status_code == 403
+
+    res = client.get("/api/admin/audit", params={"project_id": project_id}, headers=admin)
+    assert res.status_code == 200, res.text
+    events = res.json()
+    assert [e["action"] for e in events] == ["membership.updated", "membership.added", "project.created"]
+    assert events[0]["target_user_id"] == member_id
+    assert (events[0]["old_role"], events[0]["new_role"]) == ("viewer", "editor")
+
+    # Paged newest first
+    res = client.get("/api/admin/audit", params={"project_id": project_id, "limit": 2}, headers=admin)
+    assert len(res.json()) == 2
+    res = client.get(
+        "/api/admin/audit",
+        params={"project_id": project_id, "limit": 2, "cursor": res.headers["X-Next-Cursor"]},
+        headers=admin,
+    )
+    assert [e["action"] for e in res.json()] == ["project.created"]
+    assert "X-Next-Cursor" not in res.headers
+
+
+def test_full_buffer_drops_oldest_events():
+    from app.core.audit import AuditLog
+
+    log = AuditLog(capacity=3)
+    for project_id in range(5):
+        log.record("project.updated", actor_id=1, project_id=project_id)
+    assert log.stats() == {"recorded": 5, "written": 0, "dropped": 2, "buffered": 3}
+    assert [event["project_id"] for event in log._take(3)] == [2, 3, 4]
+
+
+def test_unwritable_events_are_spilled_on_shutdown_and_restored(tmp_path):
+    from app.core.audit import AuditLog
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    spill_path = tmp_path / "spill.jsonl"
+    broken = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}"))
+    log = AuditLog(session_factory=broken, spill_path=str(spill_path))
+
+    async def run_until_shutdown():
+        log.start()
+        log.record("project.deleted", actor_id=1, project_id=424242)
+        log.record("project.deleted", actor_id=1, project_id=424243)
+        await log.stop()
+
+    asyncio.run(run_until_shutdown())
+    assert len(spill_path.read_text().splitlines()) == 2
+
+    restored = AuditLog(spill_path=str(spill_path)).restore()
+    assert restored == 2
+    assert not spill_path.exists()
+    db = SessionLocal()
+    try:
+        assert db.query(models.AuditEvent).filter(models.AuditEvent.project_id.in_([424242, 424243])).count() == 2
+    finally:
+        db.close()
+
+
+def test_concurrent_restores_write_a_spill_file_once(tmp_path):
+    import json
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.audit import AuditLog
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    spill_path = tmp_path / "spill.jsonl"
+    event = {"created_at": 1.0, "actor_id": 1, "action": "project.deleted", "target_user_id": None, "old_role": None, "new_role": None}
+    spill_path.write_text("".join(json.dumps({**event, "project_id": 525250 + i}) + "\n" for i in range(3)))
+    # Left behind by a worker that died while restoring
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    (tmp_path / f"spill.jsonl.{dead.pid}.restoring").write_text(json.dumps({**event, "project_id": 525259}) + "\n")
+
+    logs = [AuditLog(spill_path=str(spill_path)) for _ in range(4)]
+    with ThreadPoolExecutor(len(logs)) as pool:
+        restored = list(pool.map(lambda log: log.restore(), logs))
+
+    assert sum(restored) == 4
+    assert list(tmp_path.iterdir()) == []
+    db = SessionLocal()
+    try:
+        assert db.query(models.AuditEvent).filter(models.AuditEvent.project_id.between(525250, 525259)).count() == 4
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+from fastapi.testclient import TestClient
+
+
+def _counts(project: dict) -> tuple:
+    return project["member_count"], project["owner_count"], project["editor_count"], project["viewer_count"]
+
+
+def test_counters_follow_membership_changes(client: TestClient, make_user, auth_headers):
+    owner = make_user()
+    member = make_user()
+    headers = auth_headers(owner)
+
+    project = client.post("/api/projects/", json={"title": "Counted"}, headers=headers).json()
+    assert _counts(project) == (1, 1, 0, 0)
+    project_id = project["id"]
+
+    res = client.post(f"/api/projects/{project_id}/users", json={"principal": member.email, "role": "editor"}, headers=headers)
+    assert res.status_code == 200, res.text
+    project = client.get(f"/api/projects/{project_id}", headers=headers).json()
+    assert _counts(project) == (2, 1, 1, 0)
+
+    client.put(f"/api/projects/{project_id}/users", json={"principal": member.email, "role": "viewer"}, headers=headers)
+    assert _counts(client.get(f"/api/projects/{project_id}", headers=headers).json()) == (2, 1, 0, 1)
+    # Listing needs no per-project COUNT
+    assert [_counts(p) for p in client.get("/api/projects/", headers=headers).json()] == [(2, 1, 0, 1)]
+
+    res = client.request("DELETE", f"/api/projects/{project_id}/users", json={"principal": member.email}, headers=headers)
+    assert res.status_code == 204, res.text
+    assert _counts(client.get(f"/api/projects/{project_id}", headers=headers).json()) == (1, 1, 0, 0)
+
+
+def test_user_project_counts_follow_project_deletion(client: TestClient, make_user, auth_headers):
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    owner = make_user()
+    member = make_user()
+    headers = auth_headers(owner)
+    project_id = client.post("/api/projects/", json={"title": "Gone"}, headers=headers).json()["id"]
+    client.post("/api/projects/", json={"title": "Kept"}, headers=headers)
+    client.post(f"/api/projects/{project_id}/users", json={"principal": member.email}, headers=headers)
+
+    db = SessionLocal()
+    try:
+        assert (db.get(models.User, owner.id).project_count, db.get(models.User, member.id).project_count) == (2, 1)
+        db.expire_all()
+        assert client.delete(f"/api/projects/{project_id}", headers=headers).status_code == 204
+        assert (db.get(models.User, owner.id).project_count, db.get(models.User, member.id).project_count) == (1, 0)
+    finally:
+        db.close()
+
+
+def test_reconcile_job_repairs_drift(client: TestClient, make_user, auth_headers):
+    from sqlalchemy import update
+
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.jobs.tasks import reconcile_counters
+
+    owner = make_user()
+    headers = auth_headers(owner)
+    project_id = client.post("/api/projects/", json={"title": "Drifted"}, headers=headers).json()["id"]
+    healthy_id = client.post("/api/projects/", json={"title": "Healthy"}, headers=headers).json()["id"]
+
+    db = SessionLocal()
+    try:
+        db.execute(update(models.Project).where(models.Project.id == project_id).values(member_count=7, viewer_count=3))
+        db.execute(update(models.User).where(models.User.id == owner.id).values(project_count=0))
+        db.commit()
+
+        assert reconcile_counters(db) == {"projects": 1, "users": 1}
+        assert reconcile_counters(db) == {"projects": 0, "users": 0}
+        assert db.get(models.User, owner.id).project_count == 2
+    finally:
+        db.close()
+    for each in (project_id, healthy_id):
+        assert _counts(client.get(f"/api/projects/{each}", headers=headers).json()) == (1, 1, 0, 0)
+
+    # Admins can queue a run
+    res = client.post("/api/admin/counters/reconcile", headers=auth_headers(is_superuser=True))
+    assert res.status_code == 202
+    assert "job_id" in res.json()
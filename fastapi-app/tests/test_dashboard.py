@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+def test_dashboard_returns_user_projects_and_members(client: TestClient, make_user, auth_headers):
+    owner = make_user("dashowner@example.com")
+    editor = make_user("dasheditor@example.com")
+    headers = auth_headers(owner)
+    first = client.post("/api/projects/", json={"title": "First"}, headers=headers).json()["id"]
+    second = client.post("/api/projects/", json={"title": "Second"}, headers=headers).json()["id"]
+    client.post(f"/api/projects/{second}/users", json={"principal": editor.email, "role": "editor"}, headers=headers)
+
+    res = client.get("/api/dashboard", headers=headers)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["user"]["email"] == "dashowner@example.com"
+    assert body["user"]["project_count"] == 2
+    assert [(p["id"], p["title"], p["member_count"]) for p in body["projects"]] == [(first, "First", 1), (second, "Second", 2)]
+    assert body["projects"][1]["members"] == [
+        {"user_id": owner.id, "email": "dashowner@example.com", "role": "owner"},
+        {"user_id": editor.id, "email": "dasheditor@example.com", "role": "editor"},
+    ]
+
+    # Members are capped per project; member_count still has the total
+    res = client.get("/api/dashboard", params={"members_per_project": 1}, headers=headers)
+    assert [len(p["members"]) for p in res.json()["projects"]] == [1, 1]
+
+
+def test_dashboard_query_count_does_not_grow_with_projects(client: TestClient, make_user, auth_headers):
+    from app.db.session import engine
+
+    headers = auth_headers(make_user())
+
+    def count_queries(**params) -> int:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            assert client.get("/api/dashboard", params=params, headers=headers).status_code == 200
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        return len(statements)
+
+    client.post("/api/projects/", json={"title": "P0"}, headers=headers)
+    with_one = count_queries()
+    for i in range(1, 6):
+        client.post("/api/projects/", json={"title": f"P{i}"}, headers=headers)
+    assert count_queries() == with_one
+
+
+def test_dashboard_and_projects_list_share_cursors(client: TestClient, auth_headers):
+    headers = auth_headers()
+    ids = [client.post("/api/projects/", json={"title": f"P{i}"}, headers=headers).json()["id"] for i in range(3)]
+
+    res = client.get("/api/projects/", params={"limit": 2}, headers=headers)
+    assert [p["id"] for p in res.json()] == ids[:2]
+    cursor = res.headers["X-Next-Cursor"]
+
+    res = client.get("/api/dashboard", params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert [p["id"] for p in res.json()["projects"]] == ids[2:]
+    assert "X-Next-Cursor" not in res.headers
+
+    res = client.get("/api/dashboard", params={"limit": 2}, headers=headers)
+    res = client.get("/api/projects/", params={"limit": 2, "cursor": res.headers["X-Next-Cursor"], "fields": "title"}, headers=headers)
+    assert res.json() == [{"id": ids[2], "title": "P2"}]
+
+    assert client.get("/api/dashboard", params={"cursor": "nope"}, headers=headers).status_code == 400
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from conftest import signup_and_login
+
+
+def test_subscription_filters_to_member_projects_and_drops_slow_consumer():
+    from app.core.broadcast import OVERFLOW_EVENT, Broadcaster, MemoryBackend
+
+    async def scenario():
+        broadcaster = Broadcaster(MemoryBackend())
+        sub = broadcaster.subscribe(user_id=1, project_ids=[10], maxsize=2)
+
+        broadcaster.publish({"type": "project.updated", "project_id": 10, "actor_id": 2})
+        broadcaster.publish({"type": "project.updated", "project_id": 99, "actor_id": 2})
+        # Being added to a project makes its later events visible
+        broadcaster.publish({"type": "membership.added", "project_id": 20, "actor_id": 2, "user_id": 1, "role": "viewer"})
+        await asyncio.sleep(0)
+        assert (await sub.get(timeout=1))["project_id"] == 10
+        assert (await sub.get(timeout=1))["project_id"] == 20
+        assert sub.project_ids == {10, 20}
+
+        # Overflow the 2-slot buffer: the client gets a single overflow marker and is finished
+        for _ in range(3):
+            broadcaster.publish({"type": "project.updated", "project_id": 20, "actor_id": 2})
+        await asyncio.sleep(0)
+        assert await sub.get(timeout=1) == OVERFLOW_EVENT
+        assert sub.finished
+
+    asyncio.run(scenario())
+
+
+def test_websocket_feed_receives_own_project_events_only(client: TestClient):
+    token = signup_and_login(client, "feed@example.com", "password123")
+    other_token = signup_and_login(client, "feedother@example.com", "password123")
+
+    with client.websocket_connect(f"/api/events/ws?token={token}") as ws:
+        res = client.post("/api/projects/", json={"title": "Other"}, headers={"Authorization": f"Bearer {other_token}"})
+        assert res.status_code == 201
+        res = client.post("/api/projects/", json={"title": "Mine"}, headers={"Authorization": f"Bearer {token}"})
+        assert res.status_code == 201
+        project_id = res.json()["id"]
+
+        event = ws.receive_json()
+        assert event["type"] == "project.created"
+        assert event["project_id"] == project_id
+
+
+def test_websocket_feed_rejects_bad_token(client: TestClient):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/events/ws?token=nope") as ws:
+            ws.receive_json()
+
+
+def test_sse_feed_requires_auth(client: TestClient):
+    res = client.get("/api/events/stream")
+    assert res.status_code == 401
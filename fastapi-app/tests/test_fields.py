@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+def test_fields_limit_columns_in_sql_and_response(client: TestClient, auth_headers):
+    from app.db.session import engine
+
+    headers = auth_headers()
+    project = client.post("/api/projects/", json={"title": "Sparse", "description": "x" * 10_000}, headers=headers).json()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/api/projects/", params={"fields": "title,member_count"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert res.status_code == 200, res.text
+    # id is always included
+    assert res.json() == [{"id": project["id"], "title": "Sparse", "member_count": 1}]
+    project_queries = [s for s in statements if "FROM projects" in s]
+    assert project_queries and not any("projects.description" in s for s in project_queries)
+
+    res = client.get(f"/api/projects/{project['id']}", params={"fields": "description"}, headers=headers)
+    assert res.json() == {"id": project["id"], "description": "x" * 10_000}
+
+    res = client.get(f"/api/projects/{project['id']}/users", params={"fields": "role"}, headers=headers)
+    assert res.json() == [{"role": "owner"}]
+
+    # Without fields= the full model is returned
+    assert client.get(f"/api/projects/{project['id']}", headers=headers).json() == project
+
+
+def test_unknown_fields_are_rejected(client: TestClient, auth_headers):
+    res = client.get("/api/projects/", params={"fields": "title,hashed_password"}, headers=auth_headers())
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Unknown fields: hashed_password"
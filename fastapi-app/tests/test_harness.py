@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.parametrize("attempt", [1, 2])
+def test_each_test_starts_from_a_clean_database(client: TestClient, attempt: int):
+    # The second run would get a 409 if the first one's commit had outlived it
+    res = client.post("/api/auth/signup", json={"email": "isolated@example.com", "password": "password123"})
+    assert res.status_code == 200, res.text
+
+
+def test_token_factory_skips_login(client: TestClient, make_user, auth_headers):
+    user = make_user("factory@example.com")
+    headers = auth_headers(user)
+    res = client.post("/api/projects/", json={"title": "Mine"}, headers=headers)
+    assert res.status_code == 201, res.text
+    res = client.get(f"/api/projects/{res.json()['id']}/users", headers=headers)
+    assert [(m["user_id"], m["role"]) for m in res.json()] == [(user.id, "owner")]
+
+    # A superuser (or any user) is created on the fly when none is given
+    assert client.get("/api/admin/metrics", headers=auth_headers(is_superuser=True)).status_code == 200
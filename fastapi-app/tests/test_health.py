@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_healthz(client: TestClient):
+    res = client.get("/healthz")
+    assert res.status_code == 200
+    assert res.json() == {"status": "ok"}
+
+
+def test_readyz_waits_for_lifespan_warmup(client: TestClient):
+    # The plain client never runs the lifespan, so the worker is still cold
+    res = client.get("/readyz")
+    assert res.status_code == 503
+    assert res.json()["checks"] == {"warmup": "pending"}
+
+    with TestClient(app) as warm_client:
+        res = warm_client.get("/readyz")
+        assert res.status_code == 200, res.text
+        assert res.json() == {"status": "ready", "checks": {"warmup": "ok", "database": "ok"}}
+
+    # Shutting down takes the worker out of rotation
+    assert client.get("/readyz").status_code == 503
+
+
+def test_readyz_caches_database_check(monkeypatch):
+    from app.core.config import settings
+    from app.core.health import readiness
+
+    pings = []
+
+    def failing_ping():
+        pings.append(1)
+        raise ConnectionError("database is down")
+
+    with TestClient(app) as warm_client:
+        monkeypatch.setattr(settings, "READINESS_CACHE_SECONDS", 60.0)
+        monkeypatch.setattr(readiness, "_checked_at", float("-inf"))
+        monkeypatch.setattr(readiness, "_ping", failing_ping)
+
+        for _ in range(3):
+            res = warm_client.get("/readyz")
+            assert res.status_code == 503
+            assert res.json()["checks"]["database"] == "ConnectionError: database is down"
+        assert len(pings) == 1
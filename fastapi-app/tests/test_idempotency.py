@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from conftest import signup_and_login
+
+
+def test_retried_create_project_replays_first_response(client: TestClient):
+    token = signup_and_login(client, "idem@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "create-1"}
+
+    first = client.post("/api/projects/", json={"title": "Once"}, headers=headers)
+    assert first.status_code == 201, first.text
+    retry = client.post("/api/projects/", json={"title": "Once"}, headers=headers)
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+
+    res = client.get("/api/projects/", headers={"Authorization": f"Bearer {token}"})
+    assert [p["title"] for p in res.json()] == ["Once"]
+
+    # Same key, different payload
+    res = client.post("/api/projects/", json={"title": "Twice"}, headers=headers)
+    assert res.status_code == 422
+
+
+def test_concurrent_duplicates_coalesce_onto_one_execution():
+    from app.core.idempotency import IdempotencyMiddleware
+
+    calls = 0
+
+    async def create(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return JSONResponse({"n": calls}, status_code=201)
+
+    app = IdempotencyMiddleware(Starlette(routes=[Route("/things", create, methods=["POST"])]))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            headers = {"Idempotency-Key": "k"}
+            responses = await asyncio.gather(*[http.post("/things", json={}, headers=headers) for _ in range(5)])
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert calls == 1
+    assert {r.json()["n"] for r in responses} == {1}
+    assert all(r.status_code == 201 for r in responses)
@@ -0,0 +1,278 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from conftest import signup_and_login
+
+
+def _run_due_jobs() -> int:
+    from app.jobs import tasks  # noqa: F401
+    from app.jobs.runner import JobRunner
+
+    return asyncio.run(JobRunner().run_once())
+
+
+def test_delete_large_project_defers_purge_to_job(client: TestClient, monkeypatch, committed_db):
+    from app.core.config import settings
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    monkeypatch.setattr(settings, "PROJECT_DELETE_INLINE_MEMBERS", 2)
+    monkeypatch.setattr(settings, "PROJECT_PURGE_CHUNK_SIZE", 2)
+
+    token = signup_and_login(client, "jobowner@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post("/api/projects/", json={"title": "J"}, headers=headers)
+    project_id = res.json()["id"]
+
+    db = SessionLocal()
+    try:
+        for i in range(4):
+            user = models.User(email=f"jobmember{i}@example.com", hashed_password="x", project_count=1)
+            db.add(user)
+            db.flush()
+            db.add(models.ProjectMembership(user_id=user.id, project_id=project_id, role="viewer"))
+        db.get(models.Project, project_id).member_count += 4
+        db.commit()
+
+        res = client.delete(f"/api/projects/{project_id}", headers=headers)
+        assert res.status_code == 204
+        # Already invisible, even though its rows are still queued for purge
+        assert client.get(f"/api/projects/{project_id}", headers=headers).status_code == 404
+        assert client.get(f"/api/projects/{project_id}/users", headers=headers).status_code == 404
+        assert db.query(models.ProjectMembership).filter(models.ProjectMembership.project_id == project_id).count() == 5
+
+        job = db.query(models.Job).filter(models.Job.name == "projects.purge_memberships").one()
+        assert job.status == "queued"
+        job_id = job.id
+        db.commit()  # ends the read transaction, whose lock would keep the worker from committing
+        assert _run_due_jobs() >= 1
+        assert db.query(models.ProjectMembership).filter(models.ProjectMembership.project_id == project_id).count() == 0
+        assert db.query(models.Project).filter(models.Project.id == project_id).count() == 0
+        assert db.query(models.Job).filter(models.Job.id == job_id).count() == 0
+        # The purge also released every member's project count
+        db.expire_all()
+        assert {user.project_count for user in db.query(models.User).filter(models.User.email.like("job%"))} == {0}
+    finally:
+        db.close()
+
+
+def test_a_due_job_is_claimed_by_one_session_only(committed_db):
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.jobs import queue
+
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        queue.enqueue(first, "tests.noop")
+        first.commit()
+        # Both workers saw the job as due; only one conditional UPDATE can win it
+        assert len(first.scalars(select(models.Job.id).where(queue._claimable(time.time()))).all()) == 1
+        assert len(second.scalars(select(models.Job.id).where(queue._claimable(time.time()))).all()) == 1
+        # SQLite lets one connection write while none is reading; Postgres needs no such pause
+        first.commit()
+        second.commit()
+        claimed = queue.claim_due(first, limit=10) + queue.claim_due(second, limit=10)
+        assert len(claimed) == 1 and claimed[0].attempts == 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_failing_job_is_retried_with_backoff_then_failed():
+    from app.db.session import SessionLocal
+    from app.jobs.queue import enqueue
+    from app.jobs.runner import job
+
+    @job("tests.always_fails")
+    def always_fails(db, reason: str) -> None:
+        raise RuntimeError(reason)
+
+    db = SessionLocal()
+    try:
+        record = enqueue(db, "tests.always_fails", {"reason": "boom"}, max_attempts=2)
+        db.commit()
+
+        _run_due_jobs()
+        db.refresh(record)
+        assert record.status == "queued" and record.attempts == 1
+        assert "boom" in record.last_error
+        assert record.run_at > time.time()
+
+        # Make it due again instead of waiting out the backoff
+        record.run_at = 0
+        db.commit()
+        _run_due_jobs()
+        db.refresh(record)
+        assert record.status == "failed" and record.attempts == 2
+    finally:
+        db.close()
+
+
+def test_a_running_job_keeps_its_lease_until_it_finishes(monkeypatch, committed_db):
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.jobs import queue
+    from app.jobs.runner import job
+
+    monkeypatch.setattr(settings, "JOBS_LEASE_SECONDS", 0.3)
+    reclaimed = []
+
+    @job("tests.slow")
+    async def slow() -> None:
+        # Longer than the lease: without renewals another worker would claim it meanwhile
+        for _ in range(4):
+            await asyncio.sleep(0.2)
+            reclaimed.extend(await asyncio.to_thread(_claim_due_jobs))
+
+    db = SessionLocal()
+    try:
+        queue.enqueue(db, "tests.slow")
+        db.commit()
+    finally:
+        db.close()
+
+    assert _run_due_jobs() == 1
+    assert reclaimed == []
+
+
+def _claim_due_jobs() -> list[int]:
+    from app.db.session import SessionLocal
+    from app.jobs import queue
+
+    db = SessionLocal()
+    try:
+        return [job.id for job in queue.claim_due(db, limit=10)]
+    finally:
+        db.close()
+
+
+def test_renewing_a_lease_fails_once_the_job_was_claimed_again():
+    from app.db.session import SessionLocal
+    from app.jobs import queue
+
+    db = SessionLocal()
+    try:
+        queue.enqueue(db, "tests.noop")
+        db.commit()
+        (record,) = queue.claim_due(db, limit=10)
+        assert queue.renew_lease(db, record.id, attempts=1)
+
+        # The lease ran out and a second worker claimed the job
+        record.locked_until = 0
+        db.commit()
+        assert [job.attempts for job in queue.claim_due(db, limit=10)] == [2]
+        assert not queue.renew_lease(db, record.id, attempts=1)
+    finally:
+        db.close()
+
+
+def test_concurrent_purges_release_each_membership_once(monkeypatch, committed_db):
+    import threading
+
+    from app.core.config import settings
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.jobs.tasks import purge_project_memberships
+
+    monkeypatch.setattr(settings, "PROJECT_PURGE_CHUNK_SIZE", 3)
+    db = SessionLocal()
+    try:
+        project = models.Project(title="Purged", deleted_at=time.time())
+        db.add(project)
+        db.flush()
+        for i in range(20):
+            user = models.User(email=f"purged{i}@example.com", hashed_password="x", project_count=1)
+            db.add(user)
+            db.flush()
+            db.add(models.ProjectMembership(user_id=user.id, project_id=project.id, role="viewer"))
+        db.commit()
+        project_id = project.id
+    finally:
+        db.close()
+
+    errors = []
+
+    def purge() -> None:
+        # Two workers running the same job, e.g. a retry after a lost lease
+        session = SessionLocal()
+        try:
+            purge_project_memberships(session, project_id=project_id)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=purge) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    db = SessionLocal()
+    try:
+        assert db.query(models.ProjectMembership).count() == 0
+        assert {user.project_count for user in db.query(models.User)} == {0}
+    finally:
+        db.close()
+
+
+def test_the_app_runs_queued_purges(monkeypatch, committed_db):
+    from app.core.config import settings
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.jobs import runner
+    from app.jobs.tasks import purge_project_memberships
+    from app.main import app
+
+    monkeypatch.setattr(settings, "JOBS_ENABLED", True)
+    monkeypatch.setattr(settings, "JOBS_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "PROJECT_DELETE_INLINE_MEMBERS", 2)
+    purged = []
+
+    def recording_purge(db, project_id: int) -> None:
+        purged.append(project_id)
+        purge_project_memberships(db, project_id=project_id)
+
+    name = "projects.purge_memberships"
+    monkeypatch.setitem(runner._registry, name, runner.JobSpec(name=name, handler=recording_purge))
+
+    # Entering the client runs the lifespan, which starts the job runner
+    with TestClient(app) as client:
+        token = signup_and_login(client, "lifespanowner@example.com", "password123")
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = client.post("/api/projects/", json={"title": "L"}, headers=headers).json()["id"]
+        db = SessionLocal()
+        try:
+            for i in range(3):
+                user = models.User(email=f"lifespan{i}@example.com", hashed_password="x", project_count=1)
+                db.add(user)
+                db.flush()
+                db.add(models.ProjectMembership(user_id=user.id, project_id=project_id, role="viewer"))
+            db.get(models.Project, project_id).member_count += 3
+            db.commit()
+        finally:
+            db.close()
+
+        assert client.delete(f"/api/projects/{project_id}", headers=headers).status_code == 204
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            db = SessionLocal()
+            try:
+                if db.query(models.Project).filter(models.Project.id == project_id).count() == 0:
+                    break
+            finally:
+                db.close()
+            time.sleep(0.05)
+
+    assert purged == [project_id]
+    db = SessionLocal()
+    try:
+        assert db.query(models.Project).filter(models.Project.id == project_id).count() == 0
+        assert db.query(models.ProjectMembership).filter(models.ProjectMembership.project_id == project_id).count() == 0
+        assert {user.project_count for user in db.query(models.User).filter(models.User.email.like("lifespan%"))} == {0}
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+import pathlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import signup_and_login
+
+
+EXAMPLE_PLAN = pathlib.Path(__file__).resolve().parents[2] / "docs" / "plan" / "example_plan.yaml"
+
+
+def _project(client: TestClient, email: str) -> tuple[int, dict[str, str]]:
+    token = signup_and_login(client, email, "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post("/api/projects/", json={"title": "Plan"}, headers=headers)
+    assert res.status_code == 201, res.text
+    return res.json()["id"], headers
+
+
+def test_render_plan_markdown_and_html_are_cached(client: TestClient):
+    from app.core.plan_renderer import plan_renderer
+
+    project_id, headers = _project(client, "planner@example.com")
+    payload = EXAMPLE_PLAN.read_bytes()
+
+    res = client.post(f"/api/projects/{project_id}/plan?format=md", content=payload, headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.headers["content-type"].startswith("text/markdown")
+    assert "Acme Cloud — Business Plan" in res.text
+
+    res = client.post(f"/api/projects/{project_id}/plan?format=html&title=Custom", content=payload, headers=headers)
+    assert res.status_code == 200, res.text
+    assert "<title>Custom</title>" in res.text
+
+    key = plan_renderer.cache_key(payload, "html", "Custom")
+    assert plan_renderer._cache[key] == res.content
+
+    # The title is text, not markup
+    res = client.post(
+        f"/api/projects/{project_id}/plan", params={"format": "html", "title": "</title><script>x()</script>"},
+        content=payload, headers=headers,
+    )
+    assert res.status_code == 200, res.text
+    assert "<title>&lt;/title&gt;&lt;script&gt;x()&lt;/script&gt;</title>" in res.text
+    assert "<script>" not in res.text
+
+
+def test_render_plan_requires_membership_and_valid_yaml(client: TestClient):
+    project_id, headers = _project(client, "planowner@example.com")
+    outsider = signup_and_login(client, "planoutsider@example.com", "password123")
+
+    res = client.post(
+        f"/api/projects/{project_id}/plan", content=EXAMPLE_PLAN.read_bytes(), headers={"Authorization": f"Bearer {outsider}"}
+    )
+    assert res.status_code == 404
+
+    res = client.post(f"/api/projects/{project_id}/plan", content=b"meta: [unclosed", headers=headers)
+    assert res.status_code == 422
+
+
+def test_render_plan_refuses_oversized_payloads_and_alias_bombs(client: TestClient, monkeypatch):
+    from app.core.config import settings
+
+    project_id, headers = _project(client, "planlimits@example.com")
+    url = f"/api/projects/{project_id}/plan"
+    monkeypatch.setattr(settings, "PLAN_MAX_PAYLOAD_BYTES", 1024)
+
+    res = client.post(url, content=b"#" * 1025, headers=headers)
+    assert res.status_code == 413
+    # Without a Content-Length, the body is cut off while it streams in
+    res = client.post(url, content=iter([b"#" * 1000, b"#" * 1000]), headers=headers)
+    assert res.status_code == 413
+
+    # A few hundred bytes that expand to 10^9 nodes
+    bomb = "a: &a [x, x, x, x, x, x, x, x, x, x]\n" + "".join(
+        f"{name}: &{name} [{', '.join([f'*{previous}'] * 10)}]\n" for previous, name in zip("abcdefgh", "bcdefghi")
+    )
+    res = client.post(url, content=bomb.encode(), headers=headers)
+    assert res.status_code == 422
+    assert "aliases" in res.json()["detail"]
+    res = client.post(url, content=b"a: &a [*a]\n", headers=headers)
+    assert res.status_code == 422
+
+
+
+def test_plan_yaml_may_use_anchors_within_the_limit(monkeypatch):
+    from app.core.config import settings
+    from app.core.plan_renderer import PlanRenderError, load_plan_yaml
+
+    monkeypatch.setattr(settings, "PLAN_MAX_YAML_NODES", 9)
+    # root + 2 keys + the anchored mapping (3 nodes) counted twice
+    assert load_plan_yaml(b"a: &a {x: 1}\nb: *a\n") == {"a": {"x": 1}, "b": {"x": 1}}
+    monkeypatch.setattr(settings, "PLAN_MAX_YAML_NODES", 8)
+    with pytest.raises(PlanRenderError):
+        load_plan_yaml(b"a: &a {x: 1}\nb: *a\n")
+
+
+def test_worker_processes_are_not_forked():
+    from app.core.processes import process_pool
+
+    pool = process_pool(1)
+    try:
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        pool.shutdown()
@@ -135,3 +135,23 @@ def test_viewer_cannot_update_project(client: TestClient):
     # viewer cannot update the project (should 404 due to membership check)
     res = client.put(f"/api/projects/{project_id}", json={"title": "P3"}, headers=headers2)
     assert res.status_code == 404
+
+
+def test_delete_project_cascades_memberships_in_the_database(client: TestClient):
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    token = signup_and_login(client, "cascade@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = client.post("/api/projects/", json={"title": "Cascade"}, headers=headers).json()["id"]
+
+    res = client.delete(f"/api/projects/{project_id}", headers=headers)
+    assert res.status_code == 204
+
+    db = SessionLocal()
+    try:
+        # Removed by ON DELETE CASCADE with the project row, no purge job needed
+        assert db.query(models.ProjectMembership).filter(models.ProjectMembership.project_id == project_id).count() == 0
+        assert db.query(models.Job).filter(models.Job.payload.contains(f'"project_id": {project_id}')).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from conftest import signup_and_login
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    # A second SQLite file stands in for the replica; it never receives the primary's writes
+    from app.db import session
+    from app.db.base import Base
+
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(session, "replica_engines", [replica_engine])
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def test_reads_route_to_replica_unless_client_wrote_recently(replica, monkeypatch):
+    import time
+
+    from app.core.config import settings
+    from app.db import session
+
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 60.0)
+    assert session.get_read_engine() is replica
+    assert session.get_read_engine(last_write=time.time() - 120) is replica
+    assert session.get_read_engine(last_write=time.time() - 1) is session.engine
+    # A clock in the future is not trusted
+    assert session.get_read_engine(last_write=time.time() + 120) is replica
+
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+    assert session.get_read_engine(last_write=time.time()) is replica
+
+
+def test_get_routes_read_your_writes_then_replica(client: TestClient, replica, committed_db):
+    from sqlalchemy import event
+
+    from app.core.read_your_writes import LAST_WRITE_COOKIE
+    from app.db import models
+
+    token = signup_and_login(client, "replica@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post("/api/projects/", json={"title": "R", "description": "D"}, headers=headers)
+    assert res.status_code == 201, res.text
+    project_id = res.json()["id"]
+    # The time of the write goes back to the client, so any worker can route its next reads
+    assert LAST_WRITE_COOKIE in res.cookies
+
+    # The creator's reads stick to the primary right after the write
+    res = client.get(f"/api/projects/{project_id}", headers=headers)
+    assert res.status_code == 200
+
+    # Without the cookie (window gone), reads go to the replica, which does not know the user yet
+    client.cookies.clear()
+    res = client.get(f"/api/projects/{project_id}", headers=headers)
+    assert res.status_code == 401
+
+    # Replication caught up with the signup, not yet with the project
+    with committed_db.connect() as primary, replica.begin() as conn:
+        users = [dict(row) for row in primary.execute(models.User.__table__.select()).mappings()]
+        conn.execute(models.User.__table__.insert(), users)
+
+    checkouts = []
+
+    def on_checkout(*args) -> None:
+        checkouts.append(args)
+
+    event.listen(committed_db, "checkout", on_checkout)
+    try:
+        res = client.get(f"/api/projects/{project_id}", headers=headers)
+        assert res.status_code == 404
+        res = client.get("/api/projects/", headers=headers)
+        assert res.status_code == 200
+        assert res.json() == []
+    finally:
+        event.remove(committed_db, "checkout", on_checkout)
+    # Authentication read the replica too: the primary was not touched
+    assert checkouts == []
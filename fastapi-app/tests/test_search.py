@@ -0,0 +1,110 @@
+from fastapi.testclient import TestClient
+
+from conftest import signup_and_login
+
+
+def _create(client: TestClient, headers: dict, title: str, description: str = None) -> int:
+    res = client.post("/api/projects/", json={"title": title, "description": description}, headers=headers)
+    assert res.status_code == 201, res.text
+    return res.json()["id"]
+
+
+def test_search_is_ranked_and_limited_to_members(client: TestClient):
+    alice = {"Authorization": f"Bearer {signup_and_login(client, 'search-a@example.com', 'password123')}"}
+    bob = {"Authorization": f"Bearer {signup_and_login(client, 'search-b@example.com', 'password123')}"}
+
+    in_description = _create(client, alice, "Quarterly planning", "Migrate billing to the new ledger")
+    in_title = _create(client, alice, "Ledger migration", "Move everything")
+    _create(client, bob, "Ledger cleanup", "Bob's private ledger work")
+
+    res = client.get("/api/projects/search", params={"q": "ledger"}, headers=alice)
+    assert res.status_code == 200, res.text
+    assert [hit["id"] for hit in res.json()] == [in_title, in_description]
+    assert res.json()[0]["score"] > res.json()[1]["score"]
+
+    # Prefix match, all words required, query syntax characters ignored
+    res = client.get("/api/projects/search", params={"q": 'migr* "ledg'}, headers=alice)
+    assert {hit["id"] for hit in res.json()} == {in_title, in_description}
+    res = client.get("/api/projects/search", params={"q": "ledger quarterly"}, headers=alice)
+    assert [hit["id"] for hit in res.json()] == [in_description]
+    res = client.get("/api/projects/search", params={"q": "***"}, headers=alice)
+    assert res.json() == []
+
+
+def test_search_index_follows_updates_and_deletes(client: TestClient):
+    headers = {"Authorization": f"Bearer {signup_and_login(client, 'search-c@example.com', 'password123')}"}
+    project_id = _create(client, headers, "Zeppelin hangar")
+
+    def search(q):
+        return [hit["id"] for hit in client.get("/api/projects/search", params={"q": q}, headers=headers).json()]
+
+    assert search("zeppelin") == [project_id]
+    client.put(f"/api/projects/{project_id}", json={"title": "Airship dock"}, headers=headers)
+    assert search("zeppelin") == []
+    assert search("airship") == [project_id]
+    client.delete(f"/api/projects/{project_id}", headers=headers)
+    assert search("airship") == []
+
+
+def test_search_cursor_pagination(client: TestClient):
+    headers = {"Authorization": f"Bearer {signup_and_login(client, 'search-d@example.com', 'password123')}"}
+    created = {_create(client, headers, f"Harbor crane {i}", "crane" * (i % 2)) for i in range(7)}
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "crane", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/api/projects/search", params=params, headers=headers)
+        assert res.status_code == 200, res.text
+        seen.extend(hit["id"] for hit in res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(created)
+
+    res = client.get("/api/projects/search", params={"q": "crane", "cursor": "not-a-cursor"}, headers=headers)
+    assert res.status_code == 400
+
+
+def test_reindex_creates_a_missing_index(client: TestClient, db_connection):
+    from app.db import search
+    from app.db.session import SessionLocal
+
+    headers = {"Authorization": f"Bearer {signup_and_login(client, 'search-f@example.com', 'password123')}"}
+    project_id = _create(client, headers, "Lighthouse keeper")
+    # A database created before search existed
+    db_connection.exec_driver_sql("DROP TABLE projects_fts")
+
+    db = SessionLocal()
+    try:
+        assert search.reindex(db) >= 1
+    finally:
+        db.close()
+    res = client.get("/api/projects/search", params={"q": "lighthouse"}, headers=headers)
+    assert [hit["id"] for hit in res.json()] == [project_id]
+
+
+def test_like_fallback_ranks_and_pages_like_the_indexes(client: TestClient, make_user, auth_headers):
+    from app.db import search
+    from app.db.session import SessionLocal
+
+    user = make_user()
+    user_id, headers = user.id, auth_headers(user)
+    in_description = _create(client, headers, "Quarterly planning", "Migrate billing to the new ledger")
+    in_title = _create(client, headers, "Ledger migration", "Move everything")
+    _create(client, headers, "snake_case names", "ledger")
+
+    db = SessionLocal()
+    try:
+        backend = search.LikeSearch()
+        hits = backend.search(db, user_id, ["ledger"], limit=10, after=None)
+        assert [hit.id for hit in hits][:2] == [in_title, in_description]
+        assert [hit.id for hit in backend.search(db, user_id, ["ledger", "quarterly"], 10, None)] == [in_description]
+        # "_" is matched literally, not as a wildcard
+        assert backend.search(db, user_id, ["e_n"], 10, None) == []
+        first = backend.search(db, user_id, ["ledger"], limit=1, after=None)
+        rest = backend.search(db, user_id, ["ledger"], limit=10, after=(first[0].score, first[0].id))
+        assert [hit.id for hit in first + rest] == [hit.id for hit in hits]
+    finally:
+        db.close()
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path):
+    pytest.importorskip("uvicorn_worker")
+    from app.core.server import available_cpus
+
+    cpu_max = tmp_path / "cpu.max"
+    unlimited = available_cpus(tmp_path / "missing")
+    assert unlimited >= 1
+
+    cpu_max.write_text("max 100000\n")
+    assert available_cpus(cpu_max) == unlimited
+    cpu_max.write_text("150000 100000\n")
+    assert available_cpus(cpu_max) == min(unlimited, 2)
+    cpu_max.write_text("10000 100000\n")
+    assert available_cpus(cpu_max) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_gets_its_own_connections():
+    from app.db.session import dispose_engines, engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    parent_pool = engine.pool
+
+    pid = os.fork()
+    if pid == 0:
+        # Child: drop the inherited pool and open a fresh connection
+        status = 1
+        try:
+            dispose_engines()
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            status = 0 if engine.pool is not parent_pool else 1
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    # The parent's pooled connection is still usable
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
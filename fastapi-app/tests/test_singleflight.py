@@ -0,0 +1,116 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from conftest import signup_and_login
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    from app.db.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    executions = 0
+    release = threading.Event()
+
+    def slow_read(project_id: int) -> dict:
+        nonlocal executions
+        executions += 1
+        release.wait(timeout=5)
+        return {"id": project_id}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow_read, 7))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Let every follower register before the leader finishes
+    while flight.stats()["calls"] < 8:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert executions == 1
+    assert results == [{"id": 7}] * 8
+    stats = flight.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 7
+    assert stats["coalescing_ratio"] == 7 / 8
+
+    # Nothing is cached once the call has completed
+    release.set()
+    flight.do("key", slow_read, 7)
+    assert executions == 2
+
+
+def test_metrics_endpoint_requires_superuser(client: TestClient):
+    token = signup_and_login(client, "notadmin@example.com", "password123")
+    res = client.get("/api/admin/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 403
+
+
+def test_metrics_endpoint_reports_coalescing_ratio(client: TestClient):
+    from app.db import crud
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if crud.get_user_by_email(db, email="metricsadmin@example.com") is None:
+            crud.create_user(db, email="metricsadmin@example.com", password="password123", is_superuser=True)
+    finally:
+        db.close()
+    token = signup_and_login(client, "metricsadmin@example.com", "password123")
+
+    res = client.get("/api/admin/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    assert set(res.json()["singleflight"]) == {"calls", "executions", "coalesced", "coalescing_ratio"}
+
+
+def test_concurrent_reads_on_separate_sessions_share_one_query(committed_db, make_user):
+    from sqlalchemy import event
+
+    from app.db import crud
+    from app.db.session import SessionLocal
+    from app.db.singleflight import coalesced, reads
+
+    owner = make_user()
+    db = SessionLocal()
+    try:
+        project_id = crud.create_project(db, current_user_id=owner.id, title="Shared", description=None).id
+    finally:
+        db.close()
+
+    before = reads.stats()
+    queries = []
+
+    def hold_first_query(conn, cursor, statement, parameters, context, executemany):
+        if "FROM projects" in statement:
+            queries.append(statement)
+            # Keep the leader in flight until the follower has joined it
+            deadline = time.monotonic() + 5
+            while reads.stats()["calls"] - before["calls"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+    results = []
+
+    def read():
+        # Each caller has its own session (and connection), as concurrent requests do
+        session = SessionLocal()
+        try:
+            project = coalesced(crud.get_project, session, current_user_id=owner.id, project_id=project_id, fields=None)
+            results.append(project.title)
+        finally:
+            session.close()
+
+    event.listen(committed_db, "before_cursor_execute", hold_first_query)
+    try:
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        event.remove(committed_db, "before_cursor_execute", hold_first_query)
+
+    assert results == ["Shared", "Shared"]
+    assert len(queries) == 1
+    assert reads.stats()["executions"] - before["executions"] == 1
@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+
+
+def test_normalized_fingerprints_ignore_literals_and_list_lengths():
+    from app.db.slow_queries import fingerprint, normalize, redact
+
+    assert normalize("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == "SELECT * FROM t WHERE id IN (?) AND name = ?"
+    assert fingerprint("SELECT a FROM t WHERE id = 1") == fingerprint("SELECT a  FROM t\nWHERE id = 42")
+    assert fingerprint("SELECT a FROM t WHERE id IN (:p1)") == fingerprint("SELECT a FROM t WHERE id IN (:p1, :p2)")
+    assert redact({"email": "a@example.com", "ids": [1, 2]}) == {"email": "<str>", "ids": ["<int>", "<int>"]}
+
+
+def test_slow_statements_are_logged_aggregated_and_explained(client: TestClient, auth_headers, monkeypatch, caplog):
+    from app.core.config import settings
+    from app.db.slow_queries import slow_query_log
+
+    headers = auth_headers(email="slowquery@example.com")
+    admin = auth_headers(is_superuser=True)
+    slow_query_log.reset()
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    monkeypatch.setattr(slow_query_log, "_tokens", 100.0)
+
+    with caplog.at_level("WARNING", logger="fastapi"):
+        for _ in range(2):
+            assert client.get("/api/projects/", headers=headers).status_code == 200
+        res = client.post("/api/auth/login", data={"username": "slowquery@example.com", "password": "password123"})
+        assert res.status_code == 200
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e9)
+    slow_query_log.join()
+
+    # Parameters never reach the log
+    assert any("Slow query" in r.getMessage() for r in caplog.records)
+    assert not any("slowquery@example.com" in r.getMessage() for r in caplog.records)
+
+    report = client.get("/api/admin/slow-queries", headers=admin).json()
+    projects = next(entry for entry in report if "FROM projects" in entry["statement"])
+    assert projects["calls"] == 2
+    assert projects["plan"]  # EXPLAIN QUERY PLAN output, captured once
+    assert report == sorted(report, key=lambda entry: -entry["total_ms"])
+
+
+def test_failed_statement_raises_its_own_error():
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM no_such_table"))
+        # Its start time was discarded, so the next statement is timed from its own start
+        assert db.connection().info["query_started_at"] == []
+    finally:
+        db.close()
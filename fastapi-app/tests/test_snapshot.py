@@ -0,0 +1,164 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _seed(client: TestClient, make_user, auth_headers) -> dict:
+    from sqlalchemy import update
+
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    owner = make_user()
+    member = make_user()
+    headers = auth_headers(owner)
+    kept = client.post("/api/projects/", json={"title": "Snapshot alpha", "description": "kept"}, headers=headers).json()
+    client.post("/api/projects/", json={"title": "Snapshot beta"}, headers=headers)
+    client.post(f"/api/projects/{kept['id']}/users", json={"principal": member.email, "role": "viewer"}, headers=headers)
+    purged = client.post("/api/projects/", json={"title": "Awaiting purge"}, headers=headers).json()
+    db = SessionLocal()
+    try:
+        db.execute(update(models.Project).where(models.Project.id == purged["id"]).values(deleted_at=1.0))
+        db.commit()
+    finally:
+        db.close()
+    return {"owner": owner, "headers": headers, "project": kept}
+
+
+def _export(chunk_rows: int) -> bytes:
+    from app.db.session import SessionLocal
+    from app.db.snapshot import export_snapshot
+
+    out = io.BytesIO()
+    db = SessionLocal()
+    try:
+        counts = export_snapshot(db, out, chunk_rows=chunk_rows)
+    finally:
+        db.close()
+    # The tombstoned project and its membership are left out
+    assert counts == {"users": 2, "projects": 2, "project_memberships": 3}
+    return out.getvalue()
+
+
+def _dump() -> dict:
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.db.snapshot import TABLES
+
+    db = SessionLocal()
+    try:
+        return {table.name: sorted(map(tuple, db.execute(select(table)).all())) for table in TABLES}
+    finally:
+        db.close()
+
+
+def _live(dump: dict) -> dict:
+    # What a snapshot carries: no project awaiting purge, nor its memberships, nor their project counts
+    from app.db.snapshot import TABLES
+
+    projects = [row for row in dump["projects"] if row[3] is None]
+    project_ids = {row[0] for row in projects}
+    memberships = [row for row in dump["project_memberships"] if row[1] in project_ids]
+    count_at = list(TABLES[0].columns.keys()).index("project_count")
+    users = [
+        (*row[:count_at], sum(1 for membership in memberships if membership[0] == row[0]), *row[count_at + 1:])
+        for row in dump["users"]
+    ]
+    return {"users": users, "projects": projects, "project_memberships": memberships}
+
+
+def _wipe() -> None:
+    from app.db import search
+    from app.db.session import SessionLocal
+    from app.db.snapshot import TABLES
+
+    db = SessionLocal()
+    try:
+        for project_id in db.scalars(TABLES[1].select().with_only_columns(TABLES[1].c.id)):
+            search.remove_project(db, project_id)
+        for table in reversed(TABLES):
+            db.execute(table.delete())
+        db.commit()
+    finally:
+        db.close()
+
+
+def _restore(data: bytes) -> dict:
+    from app.db.session import SessionLocal
+    from app.db.snapshot import restore_snapshot
+
+    db = SessionLocal()
+    try:
+        return restore_snapshot(db, io.BytesIO(data))
+    finally:
+        db.close()
+
+
+def test_export_and_restore_round_trip(client: TestClient, make_user, auth_headers):
+    from sqlalchemy import inspect
+
+    from app.db.session import SessionLocal
+    from app.db.snapshot import SnapshotError
+
+    from app.db import models
+
+    seeded = _seed(client, make_user, auth_headers)
+    data = _export(chunk_rows=1)
+    before = _live(_dump())
+
+    _wipe()
+    assert _restore(data) == {"users": 2, "projects": 2, "project_memberships": 3}
+    assert _dump() == before
+
+    db = SessionLocal()
+    try:
+        # Three projects before the export, one of them awaiting purge
+        assert db.get(models.User, seeded["owner"].id).project_count == 2
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        indexes = {index["name"] for index in inspect(db.connection()).get_indexes("users")}
+    finally:
+        db.close()
+    assert "ix_users_email" in indexes
+
+    # Restored users keep their ids, and projects are searchable again
+    res = client.get("/api/projects/search", params={"q": "snapshot"}, headers=seeded["headers"])
+    assert res.status_code == 200, res.text
+    assert len(res.json()) == 2
+
+    with pytest.raises(SnapshotError, match="already restored"):
+        _restore(data)
+
+
+def test_interrupted_restore_resumes(client: TestClient, make_user, auth_headers):
+    from app.db.snapshot import SnapshotError
+
+    _seed(client, make_user, auth_headers)
+    data = _export(chunk_rows=1)
+    expected = _live(_dump())
+    _wipe()
+
+    # Cut the file in the middle of the projects: users are committed, the rest is not there yet
+    with pytest.raises(SnapshotError, match="truncated"):
+        _restore(data[: len(data) * 3 // 5])
+    partial = _dump()
+    assert 0 < sum(len(rows) for rows in partial.values()) < 7
+
+    # Frames already committed are skipped, not inserted twice
+    assert sum(_restore(data).values()) == 7 - sum(len(rows) for rows in partial.values())
+    assert _dump() == expected
+
+
+def test_restore_refuses_non_empty_tables(client: TestClient, make_user, auth_headers):
+    from app.db.snapshot import SnapshotError
+
+    _seed(client, make_user, auth_headers)
+    with pytest.raises(SnapshotError, match="not empty"):
+        _restore(_export(chunk_rows=100))
+    with pytest.raises(SnapshotError, match="Not a snapshot"):
+        _restore(b"email,password\n")
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def traces(monkeypatch, tmp_path):
+    from app.core.config import settings
+    from app.core.tracing import exporter
+
+    path = tmp_path / "traces.ndjson"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE_PATH", str(path))
+
+    def read() -> list[list[dict]]:
+        exporter.flush()
+        if not path.exists():
+            return []
+        return [
+            json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            for line in path.read_text().splitlines()
+        ]
+
+    return read
+
+
+def _attributes(span: dict) -> dict:
+    return {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]}
+
+
+def test_request_span_has_crud_and_sql_children(client: TestClient, make_user, auth_headers, traces):
+    owner = make_user()
+    member = make_user()
+    headers = auth_headers(owner)
+    project_id = client.post("/api/projects/", json={"title": "Traced"}, headers=headers).json()["id"]
+
+    res = client.post(f"/api/projects/{project_id}/users", json={"principal": member.email}, headers=headers)
+    assert res.status_code == 200, res.text
+
+    spans = traces()[-1]
+    root = next(span for span in spans if not span["parentSpanId"])
+    assert res.headers["X-Trace-Id"] == root["traceId"]
+    # Named after the route template, not the concrete path
+    assert root["name"] == "POST /api/projects/{project_id}/users"
+    assert _attributes(root)["http.status_code"] == "200"
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+
+    by_id = {span["spanId"]: span for span in spans}
+    crud_span = next(span for span in spans if span["name"] == "crud.add_user_to_project")
+    # The route runs in the threadpool, and still parents to the request span
+    assert crud_span["parentSpanId"] == root["spanId"]
+    queries = [span for span in spans if span["name"] == "db.query"]
+    assert queries
+    assert any(by_id[span["parentSpanId"]]["name"] == "crud.add_user_to_project" for span in queries)
+    statements = [_attributes(span)["db.statement"] for span in queries]
+    # Normalized: no values from the request
+    assert not any(member.email in statement for statement in statements)
+
+
+def test_password_hashing_is_traced(client: TestClient, traces):
+    res = client.post("/api/auth/signup", json={"email": "traced@example.com", "password": "secret123"})
+    assert res.status_code in (200, 201), res.text
+    res = client.post("/api/auth/login", data={"username": "traced@example.com", "password": "secret123"})
+    assert res.status_code == 200, res.text
+    names = [{span["name"] for span in trace} for trace in traces()]
+    assert "security.get_password_hash" in names[0]
+    assert "security.verify_password" in names[1]
+
+
+def test_sampling(client: TestClient, auth_headers, traces, monkeypatch):
+    from app.core.config import settings
+
+    headers = auth_headers()
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    # The caller's decision wins over the sample rate
+    res = client.get("/api/projects/", headers={**headers, "traceparent": f"00-{trace_id}-{parent_id}-01"})
+    assert res.headers["X-Trace-Id"] == trace_id
+    res = client.get("/api/projects/", headers={**headers, "traceparent": f"00-{trace_id}-{parent_id}-00"})
+    assert "X-Trace-Id" not in res.headers
+    [spans] = traces()
+    root = next(span for span in spans if span["name"] == "GET /api/projects/")
+    assert root["parentSpanId"] == parent_id
+
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    assert "X-Trace-Id" not in client.get("/api/projects/", headers=headers).headers
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    assert "X-Trace-Id" not in client.get("/api/projects/", headers=headers).headers
+    assert len(traces()) == 1
+
+
+def test_failed_statement_ends_its_span():
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from app.core import tracing
+    from app.db.session import SessionLocal
+
+    root = tracing.Span(tracing._Trace("0" * 32), "root", None, tracing.KIND_SERVER)
+    db = SessionLocal()
+    try:
+        with root:
+            with pytest.raises(OperationalError):
+                db.execute(text("SELECT * FROM no_such_table"))
+        assert db.connection().info["trace_spans"] == []
+    finally:
+        db.close()
+
+    failed = [span for span in root.trace.spans if span.error]
+    assert len(failed) == 1 and "no_such_table" in failed[0].error
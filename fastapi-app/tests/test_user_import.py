@@ -0,0 +1,112 @@
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_admin_imports_csv_with_per_row_results(client: TestClient, make_user, auth_headers, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "USER_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "USER_IMPORT_HASH_WORKERS", 0)
+    make_user("already@example.com")
+    admin = auth_headers(is_superuser=True)
+    body = "\n".join([
+        "email,password,name",
+        "new1@example.com,secret1,One",
+        "already@example.com,secret2,Two",
+        "new1@example.com,secret3,Three",
+        "not-an-email,secret4,Four",
+        "new2@example.com,,Five",
+        "new3@example.com,secret6,Six",
+    ])
+
+    res = client.post("/api/admin/users/import", content=body, headers={**admin, "Content-Type": "text/csv"})
+    assert res.status_code == 200, res.text
+    report = res.json()
+    assert {k: report[k] for k in ("created", "exists", "duplicate", "invalid")} == {
+        "created": 2, "exists": 1, "duplicate": 1, "invalid": 2
+    }
+    assert sorted((r["line"], r["status"]) for r in report["results"]) == [
+        (2, "created"), (3, "exists"), (4, "duplicate"), (5, "invalid"), (6, "invalid"), (7, "created")
+    ]
+
+    # Imported users can log in
+    res = client.post("/api/auth/login", data={"username": "new3@example.com", "password": "secret6"})
+    assert res.status_code == 200
+
+    # Admins only
+    assert client.post("/api/admin/users/import", content=body, headers=auth_headers()).status_code == 403
+
+
+def test_ndjson_import_hashes_in_a_shared_process_pool():
+    from app.core.security import verify_password
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.db.user_import import UserImport, hash_pool
+
+    lines = [json.dumps({"email": f"pooled{i}@example.com", "password": f"pw{i}"}) for i in range(6)] + ["[1]"]
+    db = SessionLocal()
+    try:
+        importer = UserImport(db, "ndjson", chunk_size=4, hash_workers=2)
+        results = [result for chunk in importer.process(lines) for result in chunk]
+        assert importer.counts == {"created": 6, "exists": 0, "duplicate": 0, "invalid": 1}
+        assert [r["status"] for r in results].count("created") == 6
+
+        user = db.query(models.User).filter(models.User.email == "pooled5@example.com").one()
+        assert verify_password("pw5", user.hashed_password)
+
+        # The next import reuses the same worker processes, which were not forked from this one
+        pool = hash_pool.get(2)
+        assert pool._mp_context.get_start_method() != "fork"
+        importer = UserImport(db, "ndjson", hash_workers=2)
+        list(importer.process([json.dumps({"email": "pooled9@example.com", "password": "pw"})]))
+        assert importer.counts["created"] == 1
+        assert hash_pool.get(2) is pool
+    finally:
+        hash_pool.shutdown()
+        db.close()
+
+
+def test_row_by_row_insert_skips_emails_taken_meanwhile(make_user):
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.db.user_import import UserImport
+
+    taken = make_user("taken-meanwhile@example.com")
+    values = [
+        {"email": email, "hashed_password": "x", "is_active": True, "is_superuser": False, "project_count": 0}
+        for email in ("fallback1@example.com", taken.email, "fallback2@example.com")
+    ]
+    db = SessionLocal()
+    try:
+        created = UserImport._insert_each(db, values)
+        db.commit()
+        assert set(created) == {"fallback1@example.com", "fallback2@example.com"}
+        assert db.get(models.User, created["fallback2@example.com"]).email == "fallback2@example.com"
+    finally:
+        db.close()
+
+
+def test_csv_quoted_fields_may_span_lines(client: TestClient, auth_headers, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "USER_IMPORT_HASH_WORKERS", 0)
+    body = 'email,password,note\nmulti1@example.com,pw1,"first\nsecond"\nmulti2@example.com,pw2,x\n'
+
+    res = client.post("/api/admin/users/import", content=body, headers={**auth_headers(is_superuser=True), "Content-Type": "text/csv"})
+    assert res.status_code == 200, res.text
+    assert [(r["line"], r["email"], r["status"]) for r in res.json()["results"]] == [
+        (2, "multi1@example.com", "created"), (4, "multi2@example.com", "created")
+    ]
+
+
+def test_cli_import(tmp_path, capsys):
+    from app.cli.import_users import main
+
+    source = tmp_path / "users.csv"
+    source.write_text("email,password\ncli1@example.com,pw\ncli2@example.com,pw\n", encoding="utf-8")
+    results = tmp_path / "results.ndjson"
+
+    assert main([str(source), "--hash-workers", "0", "--results", str(results)]) == 0
+    assert "created: 2" in capsys.readouterr().out
+    assert [json.loads(line)["status"] for line in results.read_text().splitlines()] == ["created", "created"]